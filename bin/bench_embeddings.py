@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Compare embedding throughput (chunks/s) of the huggingface and onnx providers
+on real speech chunks, and how closely the int8 ONNX vectors match the
+sentence-transformers ones. The embedding cache is bypassed.
+
+Usage:
+    uv run python bin/bench_embeddings.py --csv data/speeches_with_topkey.csv --n 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from langchain_core.documents import Document
+from langchain_text_splitters import NLTKTextSplitter
+
+from practicepreach.embeddings import get_base_embeddings
+
+
+def load_chunks(csv_path: str, n: int) -> list[str]:
+    df = pd.read_csv(csv_path)
+    docs = [Document(page_content=str(t)) for t in df["text"].dropna()]
+    splits = NLTKTextSplitter(chunk_size=500, chunk_overlap=200).split_documents(docs)
+    return [d.page_content for d in splits[:n]]
+
+
+def bench(provider: str, texts: list[str]) -> tuple[np.ndarray, float]:
+    embeddings, model_name = get_base_embeddings(provider)
+    embeddings.embed_documents(texts[:8])  # warm-up
+    started = time.perf_counter()
+    vectors = np.array(embeddings.embed_documents(texts))
+    elapsed = time.perf_counter() - started
+    print(f"{provider:12s} {model_name:45s} {len(texts) / elapsed:8.1f} chunks/s ({elapsed:.1f}s)")
+    return vectors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local embedding providers.")
+    parser.add_argument("--csv", default="data/speeches_with_topkey.csv")
+    parser.add_argument("--n", type=int, default=500, help="Number of chunks to embed.")
+    args = parser.parse_args()
+
+    texts = load_chunks(args.csv, args.n)
+    print(f"Embedding {len(texts)} chunks\n")
+    hf, hf_time = bench("huggingface", texts)
+    onnx, onnx_time = bench("onnx", texts)
+
+    hf /= np.linalg.norm(hf, axis=1, keepdims=True)
+    onnx /= np.linalg.norm(onnx, axis=1, keepdims=True)
+    cos = (hf * onnx).sum(axis=1)
+    print(f"\nSpeed-up: {hf_time / onnx_time:.2f}x")
+    print(f"Cosine(huggingface, onnx): mean {cos.mean():.4f}, min {cos.min():.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Import-time budget for the API process.
+
+Imports a module in fresh interpreters with `python -X importtime`. It prints
+the cumulative import time and the top-level packages that cost the most. It
+exits with status 1 when either of these happens:
+
+- a module that serving must not load shows up, e.g. pandas, the XML parsers,
+  or langchain's loaders and splitters. The report names the import chain that
+  pulled it in.
+- the median import time is above the recorded budget plus --tolerance.
+
+The budget is machine-specific. Record it on the machine that runs the check
+and commit the file:
+
+Usage:
+    uv run python bin/bench_import_time.py --record
+    uv run python bin/bench_import_time.py
+    uv run python bin/bench_import_time.py --module practicepreach.rag --runs 10
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "import_budget.json"
+
+# Ingestion-only or mode-specific dependencies the API must load on first use only.
+FORBIDDEN = {
+    "practicepreach.fast": [
+        "pandas", "xmltodict", "BundestagsAPy", "nltk",
+        "langchain_community", "langchain_text_splitters",
+        "practicepreach.tools", "practicepreach.updater",
+        "zstandard", "fsspec", "torch", "sentence_transformers", "onnxruntime",
+    ],
+}
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def import_times(module: str) -> list[tuple[str, int, int, int]]:
+    """(name, depth, self µs, cumulative µs) for every module imported, in -X importtime order."""
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if r.returncode != 0:
+        sys.exit(f"import {module} failed:\n{r.stderr[-3000:]}")
+    rows = []
+    for line in r.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            rows.append((m.group(4), (len(m.group(3)) - 1) // 2, int(m.group(1)), int(m.group(2))))
+    return rows
+
+
+def import_chain(rows: list, index: int) -> list[str]:
+    """Modules that led to rows[index] being imported, outermost first."""
+    # -X importtime prints children before their parent, one level less indented.
+    chain = [rows[index][0]]
+    depth = rows[index][1]
+    for name, d, _, _ in rows[index + 1:]:
+        if d < depth:
+            chain.append(name)
+            depth = d
+    return chain[::-1]
+
+
+def is_under(name: str, package: str) -> bool:
+    return name == package or name.startswith(package + ".")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cold import time of the API.")
+    parser.add_argument("--module", default="practicepreach.fast")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (median is used)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the budget")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list")
+    parser.add_argument("--record", action="store_true", help=f"Save the measured time to {BUDGET_FILE.name}")
+    args = parser.parse_args()
+
+    import_times(args.module)  # warm the bytecode and OS file caches
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [next(cum for name, _, _, cum in rows if name == args.module) for rows in runs]
+    median_ms = statistics.median(totals) / 1000
+    print(f"import {args.module}: {median_ms:.0f} ms median of {args.runs} "
+          f"(min {min(totals) / 1000:.0f}, max {max(totals) / 1000:.0f})")
+
+    rows = runs[0]
+    by_package = defaultdict(int)
+    for name, _, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    print(f"\n{'package':30s} {'self ms':>8s}")
+    for package, self_us in sorted(by_package.items(), key=lambda x: -x[1])[:args.top]:
+        print(f"{package:30s} {self_us / 1000:8.1f}")
+    print(f"{len(rows)} modules imported")
+
+    failed = False
+    for package in FORBIDDEN.get(args.module, []):
+        hits = [i for i, row in enumerate(rows) if is_under(row[0], package)]
+        if hits:
+            # The outermost hit is the one that was imported first from outside the package.
+            first = min(hits, key=lambda i: rows[i][1])
+            print(f"\nFAIL: {package} is imported: {' -> '.join(import_chain(rows, first))}")
+            failed = True
+
+    budgets = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    if args.record:
+        budgets[args.module] = {
+            "ms": round(median_ms, 1),
+            "python": f"{sys.version_info.major}.{sys.version_info.minor}",
+        }
+        BUDGET_FILE.write_text(json.dumps(budgets, indent=2) + "\n")
+        print(f"\nRecorded {median_ms:.0f} ms as the budget for {args.module} in {BUDGET_FILE}")
+    elif args.module in budgets:
+        limit = budgets[args.module]["ms"] * (1 + args.tolerance)
+        verdict = "FAIL" if median_ms > limit else "ok"
+        print(f"\n{verdict}: {median_ms:.0f} ms against a budget of {budgets[args.module]['ms']:.0f} ms "
+              f"(+{args.tolerance:.0%} = {limit:.0f} ms)")
+        failed |= median_ms > limit
+    else:
+        print(f"\nNo budget recorded for {args.module} — run with --record to set one")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Throughput of speech extraction over a directory of plenary protocol XMLs,
+e.g. a full Wahlperiode in data/xml_updates.
+
+Modes:
+- columns: iter_speech_rows -> speech_rows_to_df
+- csv:     iter_speech_rows -> write_speech_rows_csv, streaming to disk
+- both:    speech rows and TOP records in one pass per file (parse_protocol),
+           as run_update does
+- 2-pass:  the same via iter_speech_rows plus build_tops_lookup, parsing
+           every file twice
+- workers: collect_protocols on a process pool, once per --workers value,
+           with the speedup over one worker
+- cache:   collect_protocols with an empty parse cache (cold), then again
+           with every file cached (warm), and the TOPs alone from the cache
+- legacy:  the old one-row-at-a-time df.loc[len(df)] append. It is quadratic,
+           so it runs on the first --legacy-files files only, next to
+           `columns` on the same files
+
+Usage:
+    uv run python bin/bench_xml_parsing.py --xml-dir data/xml_updates
+    uv run python bin/bench_xml_parsing.py --download-since 2025-03-25   # fetch the Wahlperiode first
+    uv run python bin/bench_xml_parsing.py --workers 1,2,4,8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from practicepreach.tools import (
+    SPEECH_COLUMNS, build_tops_lookup, collect_protocols, iter_speech_rows, parse_protocol, speech_rows_to_df,
+    write_speech_rows_csv,
+)
+
+
+def all_rows(files: list[Path]):
+    for f in files:
+        yield from iter_speech_rows(str(f))
+
+
+def run_columns(files: list[Path]) -> int:
+    return len(speech_rows_to_df(all_rows(files)))
+
+
+def run_csv(files: list[Path]) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        return write_speech_rows_csv(all_rows(files), str(Path(tmp) / "speeches.csv"))
+
+
+def run_both(files: list[Path]) -> int:
+    n_rows = 0
+    for f in files:
+        rows, _ = parse_protocol(str(f))
+        n_rows += len(rows)
+    return n_rows
+
+
+def run_two_pass(files: list[Path]) -> int:
+    n_rows = 0
+    for f in files:
+        n_rows += sum(1 for _ in iter_speech_rows(str(f)))
+        build_tops_lookup(str(f))
+    return n_rows
+
+
+def run_workers(workers: int):
+    def run(files: list[Path]) -> int:
+        rows, _, failures = collect_protocols(files, workers=workers, cache_dir=None)
+        if failures:
+            print(f"{len(failures)} files failed, e.g. {next(iter(failures.items()))}")
+        return len(rows)
+    return run
+
+
+def run_cached(cache_dir: Path, with_speeches: bool = True):
+    def run(files: list[Path]) -> int:
+        rows, tops, _ = collect_protocols(files, with_speeches=with_speeches, cache_dir=cache_dir)
+        return len(rows) if with_speeches else len(tops)
+    return run
+
+
+def run_legacy(files: list[Path]) -> int:
+    df = pd.DataFrame(columns=SPEECH_COLUMNS)
+    for row in all_rows(files):
+        df.loc[len(df)] = row
+    return len(df)
+
+
+def bench(name: str, fn, files: list[Path]) -> float:
+    size_mb = sum(f.stat().st_size for f in files) / 1e6
+    started = time.perf_counter()
+    n_rows = fn(files)
+    elapsed = time.perf_counter() - started
+    print(f"{name:8s} {len(files):6d} {n_rows:9d} {elapsed:9.2f} {n_rows / elapsed:10.0f} {size_mb / elapsed:7.1f}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speech extraction from plenary protocol XMLs.")
+    parser.add_argument("--xml-dir", type=Path, default=Path("data/xml_updates"))
+    parser.add_argument("--download-since", help="Download all sessions since this date (YYYY-MM-DD) first")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts to compare")
+    parser.add_argument("--legacy-files", type=int, default=10, help="Files for the legacy comparison (0 = skip)")
+    args = parser.parse_args()
+
+    if args.download_since:
+        from practicepreach.updater import download_xmls, fetch_session_xml_urls
+        download_xmls(fetch_session_xml_urls(args.download_since), args.xml_dir)
+
+    files = sorted(args.xml_dir.glob("*.xml"))
+    if not files:
+        parser.error(f"No XML files in {args.xml_dir}")
+
+    print(f"{'mode':8s} {'files':>6s} {'rows':>9s} {'seconds':>9s} {'rows/s':>10s} {'MB/s':>7s}")
+    bench("columns", run_columns, files)
+    bench("csv", run_csv, files)
+    bench("both", run_both, files)
+    bench("2-pass", run_two_pass, files)
+
+    counts = [int(n) for n in args.workers.split(",") if n]
+    if counts:
+        print(f"\nProcess pool ({os.cpu_count()} cores):")
+        timings = {n: bench(f"{n}w", run_workers(n), files) for n in counts}
+        baseline = timings.get(1)
+        if baseline:
+            for n, elapsed in timings.items():
+                print(f"{n} workers: {baseline / elapsed:.1f}x")
+
+    print("\nParse cache:")
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = bench("cold", run_cached(Path(tmp)), files)
+        warm = bench("warm", run_cached(Path(tmp)), files)
+        bench("tops", run_cached(Path(tmp), with_speeches=False), files)
+        size_mb = sum(f.stat().st_size for f in Path(tmp).rglob("*.pkl.gz")) / 1e6
+    print(f"warm is {cold / warm:.1f}x faster; cache is {size_mb:.1f} MB for "
+          f"{sum(f.stat().st_size for f in files) / 1e6:.1f} MB of XML")
+
+    if args.legacy_files:
+        subset = files[:args.legacy_files]
+        print(f"\nLegacy append vs. columns on {len(subset)} files:")
+        legacy = bench("legacy", run_legacy, subset)
+        columns = bench("columns", run_columns, subset)
+        print(f"columns is {legacy / columns:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,8 @@ import json
 import re
 from pathlib import Path
 from langchain.chat_models import init_chat_model
-from practicepreach.tools import build_tops_lookup
+from practicepreach.rate_limiter import chat_limiter
+from practicepreach.tools import collect_protocols
 
 XML_DIR = Path("data/xml_updates")
 TOPS_JSON = Path("data/tops.json")
@@ -40,7 +41,8 @@ def classify_tops(tops: dict) -> dict:
         for k, v in to_classify.items()
     )
 
-    response = model.invoke(
+    response = chat_limiter.call(
+        model.invoke,
         "Du bekommst eine Liste von Bundestagstagesordnungspunkten mit ihren Titeln.\n"
         "Weise jedem Punkt ein kurzes, konsistentes Thema zu (2–4 Wörter auf Deutsch).\n"
         "Verwende gleiche Themen für inhaltlich verwandte Punkte.\n"
@@ -58,23 +60,28 @@ def classify_tops(tops: dict) -> dict:
     return result
 
 
-tops = {}
-for xml_file in sorted(XML_DIR.glob("*.xml")):
-    tops.update(build_tops_lookup(str(xml_file)))
+def main():
+    _, tops, failures = collect_protocols(sorted(XML_DIR.glob("*.xml")), with_speeches=False)
+    for xml_file, error in failures.items():
+        print(f"  [failed] {xml_file}: {error}")
 
-topics = classify_tops(tops)
-for key, topic in topics.items():
-    tops[key]["topic"] = topic
-    print(f"  {key}: {topic}")
+    topics = classify_tops(tops)
+    for key, topic in topics.items():
+        tops[key]["topic"] = topic
+        print(f"  {key}: {topic}")
 
-# Fallback: if Gemini still returned a generic label, use the real title instead
-for key, v in tops.items():
-    current = v.get("topic", "")
-    if not current or _generic.match(current):
-        fallback = (v.get("title") or v.get("subtitle") or "").strip()
-        if fallback and not _generic.match(fallback):
-            tops[key]["topic"] = fallback[:80]
-            print(f"  [fallback] {key}: {fallback[:80]}")
+    # Fallback: if Gemini still returned a generic label, use the real title instead
+    for key, v in tops.items():
+        current = v.get("topic", "")
+        if not current or _generic.match(current):
+            fallback = (v.get("title") or v.get("subtitle") or "").strip()
+            if fallback and not _generic.match(fallback):
+                tops[key]["topic"] = fallback[:80]
+                print(f"  [fallback] {key}: {fallback[:80]}")
 
-TOPS_JSON.write_text(json.dumps(tops, ensure_ascii=False, indent=2))
-print(f"Saved {TOPS_JSON} ({len(tops)} TOPs)")
+    TOPS_JSON.write_text(json.dumps(tops, ensure_ascii=False, indent=2))
+    print(f"Saved {TOPS_JSON} ({len(tops)} TOPs)")
+
+
+if __name__ == "__main__":
+    main()
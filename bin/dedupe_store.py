@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Find and remove duplicate chunks from ChromaDB.
+
+Chunks are duplicates when type, speech/manifesto id, party, top_key and text
+all match; the first copy is kept. Duplicates were left behind by updates that
+ran twice over the same dates before chunk IDs became deterministic.
+
+Usage:
+    uv run python bin/dedupe_store.py --dry-run
+    uv run python bin/dedupe_store.py
+"""
+
+import argparse
+import logging
+
+from practicepreach.params import USE_GCS_CHROMA
+from practicepreach.rag import Rag
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove duplicate chunks from ChromaDB.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many duplicates exist.")
+    parser.add_argument("--upload", action="store_true", help="Upload the cleaned store to GCS afterwards.")
+    args = parser.parse_args()
+
+    rag = Rag()
+    logger.info(f"Vector store has {rag.get_num_of_vectors()} chunks.")
+    n = rag.remove_duplicate_chunks(dry_run=args.dry_run)
+    logger.info(f"Done. {n} duplicates {'found' if args.dry_run else 'removed'}. Total: {rag.get_num_of_vectors()}")
+
+    if args.upload and n and not args.dry_run and USE_GCS_CHROMA:
+        rag.publish_to_gcs()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Recall vs. storage size for reduced-dimension (Matryoshka) and int8-quantized
+vectors, to pick EMBEDDING_DIM before rebuilding the store.
+
+Chunks from the speeches CSV are embedded at full precision (through the
+embedding cache, so re-runs are free); a held-out set of chunks serves as
+queries. For every dimension the report prints recall@k against the
+full-precision top-k, with and without re-ranking RERANK_OVERSAMPLE * k
+candidates at full precision (what Rag.similarity_search does), and the
+vector payload per chunk and for the current collection size.
+
+The int8 rows quantize each vector with a per-vector scale. Chroma's HNSW
+index stores float32 only, so they show what a quantized store would cost in
+recall, not something EMBEDDING_DIM can switch on.
+
+Usage:
+    uv run python bin/embedding_dim_report.py --csv data/speeches_with_topkey.csv --n 5000
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from langchain_core.documents import Document
+from langchain_text_splitters import NLTKTextSplitter
+
+from practicepreach.embeddings import get_embeddings
+from practicepreach.params import EMBEDDING_PROVIDER, RERANK_OVERSAMPLE
+
+
+def load_chunks(csv_path: str, n: int) -> list[str]:
+    df = pd.read_csv(csv_path)
+    docs = [Document(page_content=str(t)) for t in df["text"].dropna()]
+    splits = NLTKTextSplitter(chunk_size=500, chunk_overlap=200).split_documents(docs)
+    return list(dict.fromkeys(d.page_content for d in splits))[:n]
+
+
+def reduce(vectors: np.ndarray, dim: int) -> np.ndarray:
+    head = vectors[:, :dim]
+    return head / np.clip(np.linalg.norm(head, axis=1, keepdims=True), 1e-12, None)
+
+
+def quantize_int8(vectors: np.ndarray) -> np.ndarray:
+    """Round-trip through int8 with one float32 scale per vector."""
+    scale = np.abs(vectors).max(axis=1, keepdims=True) / 127
+    return np.round(vectors / scale).astype(np.int8) * scale
+
+
+def top_k(queries: np.ndarray, docs: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(queries @ docs.T), axis=1)[:, :k]
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs. size for reduced/quantized embeddings.")
+    parser.add_argument("--csv", default="data/speeches_with_topkey.csv")
+    parser.add_argument("--n", type=int, default=5000, help="Number of chunks (documents + queries)")
+    parser.add_argument("--queries", type=int, default=200, help="Chunks held out as queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dims", default="1536,1024,768,512,256")
+    parser.add_argument("--collection-size", type=int, default=0,
+                        help="Chunks in the store, for the size estimate (default: --n)")
+    args = parser.parse_args()
+
+    texts = load_chunks(args.csv, args.n)
+    embeddings = get_embeddings(EMBEDDING_PROVIDER, dim=0)
+    print(f"Embedding {len(texts)} chunks with {embeddings.model_name} ...")
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    embeddings.log_stats()
+
+    queries, docs = vectors[:args.queries], vectors[args.queries:]
+    full_dim = vectors.shape[1]
+    truth = top_k(queries, docs, args.k)
+    n_store = args.collection_size or len(texts)
+    oversample = args.k * RERANK_OVERSAMPLE
+
+    dims = [full_dim] + [int(d) for d in args.dims.split(",") if int(d) < full_dim]
+    print(f"\n{'dims':>5s} {'dtype':>7s} {'recall@' + str(args.k):>10s} {'reranked':>9s} "
+          f"{'bytes/vec':>10s} {'store MB':>9s}")
+    for dim in dims:
+        for dtype in ("float32", "int8"):
+            q = reduce(queries, dim)
+            d = reduce(docs, dim)
+            if dtype == "int8":
+                q, d = quantize_int8(q), quantize_int8(d)
+            plain = recall(top_k(q, d, args.k), truth)
+
+            candidates = top_k(q, d, oversample)
+            reranked = np.array([
+                cand[np.argsort(-(docs[cand] @ query))[:args.k]]
+                for cand, query in zip(candidates, queries)
+            ])
+            bytes_per_vec = dim * (4 if dtype == "float32" else 1) + (4 if dtype == "int8" else 0)
+            print(f"{dim:5d} {dtype:>7s} {plain:10.3f} {recall(reranked, truth):9.3f} "
+                  f"{bytes_per_vec:10d} {bytes_per_vec * n_store / 1e6:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Export intfloat/multilingual-e5-large to ONNX and quantize it to int8 for the
+"onnx" embedding provider (EMBEDDING_PROVIDER=onnx).
+
+Writes model.onnx, model_quantized.onnx and tokenizer.json to ONNX_MODEL_DIR.
+Needs the onnx dependency group on top of the default install (torch and
+transformers come with sentence-transformers):
+
+Usage:
+    uv sync --group onnx
+    uv run python bin/export_onnx_e5.py
+"""
+
+import argparse
+from pathlib import Path
+
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoModel, AutoTokenizer
+
+from practicepreach.embeddings import E5_MODEL
+from practicepreach.params import ONNX_MODEL_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export multilingual-e5 to int8 ONNX.")
+    parser.add_argument("--model", default=E5_MODEL)
+    parser.add_argument("--out", type=Path, default=Path(ONNX_MODEL_DIR))
+    args = parser.parse_args()
+    args.out.mkdir(parents=True, exist_ok=True)
+
+    print(f"Loading {args.model}...")
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModel.from_pretrained(args.model).eval()
+    tokenizer.backend_tokenizer.save(str(args.out / "tokenizer.json"))
+
+    sample = tokenizer(["Ein Beispielsatz."], return_tensors="pt")
+    fp32_path = args.out / "model.onnx"
+    print(f"Exporting to {fp32_path}...")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=17,
+        )
+
+    int8_path = args.out / "model_quantized.onnx"
+    print(f"Quantizing to {int8_path}...")
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    for path in (fp32_path, int8_path):
+        print(f"  {path.name}: {path.stat().st_size / 1e6:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
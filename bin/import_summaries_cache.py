@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""
+One-shot import of the legacy data/summaries_cache.json into the SQLite cache.
+Existing entries are kept unless --overwrite is given. Safe to re-run.
+
+Usage:
+    uv run python bin/import_summaries_cache.py
+    uv run python bin/import_summaries_cache.py --json path/to/summaries_cache.json --overwrite
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from practicepreach.summaries_cache import SummariesCache, SUMMARIES_DB, LEGACY_SUMMARIES_JSON
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import summaries_cache.json into the SQLite cache.")
+    parser.add_argument("--json", type=Path, default=LEGACY_SUMMARIES_JSON, help="Legacy JSON cache file.")
+    parser.add_argument("--db", type=Path, default=SUMMARIES_DB, help="Target SQLite database.")
+    parser.add_argument("--overwrite", action="store_true", help="Replace entries already in the database.")
+    args = parser.parse_args()
+
+    cache = SummariesCache(args.db)
+    cache.import_json(args.json, overwrite=args.overwrite)
+    cache.checkpoint()
+
+
+if __name__ == "__main__":
+    main()
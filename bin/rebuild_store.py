@@ -1,22 +1,30 @@
 """
 Download last week's Bundestag XMLs and rebuild ChromaDB from scratch.
-Usage: uv run python bin/rebuild_store.py
+Usage: uv run python bin/rebuild_store.py [--provider huggingface|onnx|google]
+
+Each provider writes its own store (STORE_DIRS), so vectors of different
+models never end up in one collection. The default provider runs locally;
+with --provider google, requests are paced by the Gemini embed limiter
+(get_embeddings puts it under the cache).
 """
+import argparse
 import os
 import sys
 import shutil
+import time
 from pathlib import Path
 from datetime import datetime
 
 import pandas as pd
 from dotenv import load_dotenv
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 from langchain_text_splitters import NLTKTextSplitter
 from langchain_community.document_loaders.csv_loader import CSVLoader
 
-sys.path.insert(0, str(Path(__file__).parent))
-from update_speeches import fetch_session_xml_urls, download_xmls, PARTY_NAME_MAP
+from practicepreach.embeddings import get_embeddings
+from practicepreach.rag import assign_chunk_ids
+from practicepreach.rate_limiter import embed_limiter
+from practicepreach.updater import fetch_session_xml_urls, download_xmls, PARTY_NAME_MAP
 
 load_dotenv()
 
@@ -24,18 +32,24 @@ SINCE_DATE = "2026-04-13"
 XML_DIR = Path("data/xml_updates")
 SPEECHES_CSV = Path("data/speeches_with_topkey.csv")
 MANIFESTO_CSV = Path("data/data_manifestos_normalized.csv")
-PERSIST_DIR = "data/chroma_store_e5_new"
-
-
-def parse_xmls(xml_files: list[Path]) -> pd.DataFrame:
-    from practicepreach.tools import process_bundestag_xml
-    df = pd.DataFrame(columns=['type', 'date', 'id', 'party', 'top_key', 'text'])
-    for xml_file in xml_files:
-        print(f"  Parsing {xml_file.name}...")
-        process_bundestag_xml(str(xml_file), df)
-    df = df.reset_index(drop=True)
+STORE_DIRS = {
+    "huggingface": "data/chroma_store_e5_new",
+    "onnx": "data/chroma_store_e5_onnx_new",
+    "google": "data/chroma_store_gemini_new",
+}
+BATCH_SIZE = 100
+
+
+def parse_xmls(xml_files: list[Path]) -> tuple[pd.DataFrame, dict]:
+    """Speech rows and TOP records of all files, parsed in parallel and merged in file order."""
+    from practicepreach.tools import collect_protocols, speech_rows_to_df
+    rows, tops, failures = collect_protocols(xml_files)
+    for xml_file, error in failures.items():
+        print(f"  Failed to parse {Path(xml_file).name}: {error}")
+
+    df = speech_rows_to_df(rows)
     df['party'] = df['party'].map(PARTY_NAME_MAP).fillna(df['party'])
-    return df
+    return df, tops
 
 
 def embed_csv(vector_store, csv_path: Path, metadata_cols: list):
@@ -50,71 +64,87 @@ def embed_csv(vector_store, csv_path: Path, metadata_cols: list):
         except ValueError:
             pass
     text_splitter = NLTKTextSplitter(chunk_size=500, chunk_overlap=200)
-    splits = text_splitter.split_documents(data)
+    add_documents(vector_store, text_splitter.split_documents(data))
+
+
+def add_documents(vector_store, splits: list, max_attempts: int = 3):
+    """Embed and store chunks in batches, retrying a failed batch before giving up."""
+    ids = assign_chunk_ids(splits)
     print(f"  Embedding {len(splits)} chunks...")
-    for i in range(0, len(splits), 500):
-        vector_store.add_documents(documents=splits[i:i + 500])
-        print(f"  Batch {i // 500 + 1} done")
-
-
-# --- Step 1: Download last week's XMLs ---
-print(f"Fetching sessions since {SINCE_DATE}...")
-session_urls = fetch_session_xml_urls(SINCE_DATE)
-if not session_urls:
-    print("No sessions found for last week. Exiting.")
-    sys.exit(0)
-xml_files = download_xmls(session_urls, XML_DIR)
-print(f"Downloaded {len(xml_files)} XML files")
-
-# --- Step 2: Parse XMLs → CSV + tops.json ---
-print("Parsing XMLs...")
-df = parse_xmls(xml_files)
-print(f"Parsed {len(df)} speech rows")
-df.to_csv(SPEECHES_CSV, index=False)
-print(f"Saved {SPEECHES_CSV}")
-
-import json
-from practicepreach.tools import build_tops_lookup
-tops = {}
-for xml_file in xml_files:
-    tops.update(build_tops_lookup(str(xml_file)))
-tops_json = Path("data/tops.json")
-tops_json.write_text(json.dumps(tops, ensure_ascii=False, indent=2))
-print(f"Saved {tops_json} ({len(tops)} TOPs)")
-
-# --- Step 3: Rebuild store ---
-if os.path.exists(PERSIST_DIR):
-    shutil.rmtree(PERSIST_DIR)
-    print(f"Deleted existing store at {PERSIST_DIR}")
-
-device = os.environ.get("TORCH_DEVICE", "cpu")
-print(f"Loading embedding model on {device}...")
-embeddings = HuggingFaceEmbeddings(
-    model_name="intfloat/multilingual-e5-large",
-    model_kwargs={"device": device},
-    encode_kwargs={"batch_size": 8},
-)
-vector_store = Chroma(
-    collection_name="political_collection",
-    persist_directory=PERSIST_DIR,
-    embedding_function=embeddings,
-)
-
-embed_csv(vector_store, SPEECHES_CSV, ['date', 'id', 'party', 'type', 'top_key'])
-
-# Manifestos: GRÜNEN only, no top_key
-print("Loading manifestos (GRÜNEN only)...")
-manifesto_loader = CSVLoader(file_path=str(MANIFESTO_CSV), metadata_columns=['date', 'id', 'party', 'type'])
-manifesto_data = [doc for doc in manifesto_loader.load() if doc.metadata.get("party") == "GRÜNEN"]
-print(f"  {len(manifesto_data)} manifesto rows")
-for doc in manifesto_data:
-    try:
-        doc.metadata["date"] = int(datetime.strptime(doc.metadata["date"], "%d.%m.%Y").strftime("%Y%m%d"))
-    except ValueError:
-        pass
-manifesto_splits = NLTKTextSplitter(chunk_size=500, chunk_overlap=200).split_documents(manifesto_data)
-print(f"  Embedding {len(manifesto_splits)} chunks...")
-for i in range(0, len(manifesto_splits), 500):
-    vector_store.add_documents(documents=manifesto_splits[i:i + 500])
-
-print(f"\nDone. Total vectors: {vector_store._collection.count()}")
+    for i in range(0, len(splits), BATCH_SIZE):
+        for attempt in range(1, max_attempts + 1):
+            try:
+                vector_store.add_documents(documents=splits[i:i + BATCH_SIZE], ids=ids[i:i + BATCH_SIZE])
+                break
+            except Exception as exc:
+                if attempt == max_attempts:
+                    raise
+                print(f"  Batch {i // BATCH_SIZE + 1} failed (attempt {attempt}/{max_attempts}): {exc}")
+                time.sleep(2 * attempt)
+        print(f"  Batch {i // BATCH_SIZE + 1} done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild ChromaDB from last week's Bundestag XMLs.")
+    parser.add_argument("--provider", choices=list(STORE_DIRS), default="huggingface",
+                        help="Embedding provider (default: huggingface, runs locally)")
+    args = parser.parse_args()
+    persist_dir = STORE_DIRS[args.provider]
+
+    # --- Step 1: Download last week's XMLs ---
+    print(f"Fetching sessions since {SINCE_DATE}...")
+    session_urls = fetch_session_xml_urls(SINCE_DATE)
+    if not session_urls:
+        print("No sessions found for last week. Exiting.")
+        sys.exit(0)
+    xml_files = download_xmls(session_urls, XML_DIR)
+    print(f"Downloaded {len(xml_files)} XML files")
+
+    # --- Step 2: Parse XMLs → CSV + tops.json ---
+    print("Parsing XMLs...")
+    df, tops = parse_xmls(xml_files)
+    print(f"Parsed {len(df)} speech rows")
+    df.to_csv(SPEECHES_CSV, index=False)
+    print(f"Saved {SPEECHES_CSV}")
+
+    import json
+    tops_json = Path("data/tops.json")
+    tops_json.write_text(json.dumps(tops, ensure_ascii=False, indent=2))
+    print(f"Saved {tops_json} ({len(tops)} TOPs)")
+
+    # --- Step 3: Rebuild store ---
+    if os.path.exists(persist_dir):
+        shutil.rmtree(persist_dir)
+        print(f"Deleted existing store at {persist_dir}")
+
+    print(f"Loading embedding provider {args.provider!r}...")
+    embeddings = get_embeddings(args.provider)
+    vector_store = Chroma(
+        collection_name="political_collection",
+        persist_directory=persist_dir,
+        embedding_function=embeddings,
+    )
+
+    embed_csv(vector_store, SPEECHES_CSV, ['date', 'id', 'party', 'type', 'top_key'])
+
+    # Manifestos: GRÜNEN only, no top_key
+    print("Loading manifestos (GRÜNEN only)...")
+    manifesto_loader = CSVLoader(file_path=str(MANIFESTO_CSV), metadata_columns=['date', 'id', 'party', 'type'])
+    manifesto_data = [doc for doc in manifesto_loader.load() if doc.metadata.get("party") == "GRÜNEN"]
+    print(f"  {len(manifesto_data)} manifesto rows")
+    for doc in manifesto_data:
+        try:
+            doc.metadata["date"] = int(datetime.strptime(doc.metadata["date"], "%d.%m.%Y").strftime("%Y%m%d"))
+        except ValueError:
+            pass
+    add_documents(vector_store, NLTKTextSplitter(chunk_size=500, chunk_overlap=200).split_documents(manifesto_data))
+
+    print(f"\nDone. Total vectors in {persist_dir}: {vector_store._collection.count()}")
+    stats = embeddings.stats()
+    print(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+    if args.provider == "google":
+        print(f"Gemini embed limiter: {embed_limiter.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from pathlib import Path
 
 from langchain.chat_models import init_chat_model
 
+from practicepreach.tools import collect_protocols
 from practicepreach.updater import _update_tops_json
 
 logging.basicConfig(
@@ -19,9 +20,17 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
-xml_dir = Path("data/xml_updates")
-xml_files = sorted(xml_dir.glob("*.xml"))
+def main():
+    xml_dir = Path("data/xml_updates")
+    xml_files = sorted(xml_dir.glob("*.xml"))
 
-model = init_chat_model("google_genai:gemini-2.5-flash", thinking_budget=0)
-_update_tops_json(xml_files, model)
-print("Done.")
+    model = init_chat_model("google_genai:gemini-2.5-flash", thinking_budget=0)
+    _, new_tops, failures = collect_protocols(xml_files, with_speeches=False)
+    for xml_file, error in failures.items():
+        print(f"Failed to parse {xml_file}: {error}")
+    _update_tops_json(new_tops, model)
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
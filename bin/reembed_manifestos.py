@@ -69,5 +69,5 @@ if __name__ == "__main__":
     delete_manifestos(rag)
 
     logger.info("Re-embedding manifestos with normalized party names...")
-    n = rag.add_to_vector_store(str(NORMALIZED_CSV))
-    logger.info(f"Done. Embedded {n} chunks. Total vectors: {rag.get_num_of_vectors()}")
+    n, failed = rag.add_to_vector_store(str(NORMALIZED_CSV))
+    logger.info(f"Done. Embedded {n} chunks ({failed} failed). Total vectors: {rag.get_num_of_vectors()}")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Push, pull or garbage-collect delta-sync versions of a Chroma store directory.
+
+The remote can be a gs:// URL or a local directory. A local directory makes it
+easy to try the sync without touching the bucket.
+
+Usage:
+    uv run python bin/sync_store.py push --local data/chroma_store --remote /tmp/fake-bucket
+    uv run python bin/sync_store.py pull --local /tmp/chroma_copy --remote /tmp/fake-bucket
+    uv run python bin/sync_store.py status --local /tmp/chroma_copy --remote /tmp/fake-bucket
+    uv run python bin/sync_store.py gc --remote gs://bucket/data/delta --keep 3
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from practicepreach.store_sync import StoreSync, BLOCK_SIZE
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta sync of a Chroma store directory.")
+    parser.add_argument("command", choices=["push", "pull", "status", "gc"])
+    parser.add_argument("--remote", required=True, help="fsspec URL or local directory acting as the bucket.")
+    parser.add_argument("--local", type=Path, help="Local store directory.")
+    parser.add_argument("--version", help="Version to push as / pull (default: timestamp / LATEST).")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--keep", type=int, default=3, help="Versions kept by gc.")
+    args = parser.parse_args()
+
+    sync = StoreSync(args.remote, block_size=args.block_size)
+    if args.command in ("push", "pull", "status") and args.local is None:
+        parser.error(f"{args.command} needs --local")
+
+    if args.command == "push":
+        print(sync.push(args.local, version=args.version))
+    elif args.command == "pull":
+        print(sync.pull(args.local, version=args.version) or "Remote has no versions yet.")
+    elif args.command == "status":
+        print(f"remote LATEST: {sync.latest_version()}")
+        print(f"local version: {StoreSync.local_version(args.local)}")
+    else:
+        sync.gc(keep=args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,16 @@ Update ChromaDB with new Bundestag speeches since a given date.
 Usage:
     uv run python bin/update_speeches.py --since 2025-11-28
     uv run python bin/update_speeches.py   # auto-detects last embedded date from ChromaDB
+    uv run python bin/update_speeches.py --shadow   # build and validate a copy, then swap it in
 """
 
 import argparse
 import logging
 
+from practicepreach.params import UPDATE_MODE
 from practicepreach.rag import Rag
-from practicepreach.updater import run_update
+from practicepreach.rate_limiter import chat_limiter, embed_limiter
+from practicepreach.updater import run_update, run_shadow_update
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,12 +36,22 @@ def main():
         default=52,
         help="Remove speeches older than this many weeks (default: 52).",
     )
+    parser.add_argument(
+        "--shadow",
+        action="store_true",
+        default=UPDATE_MODE == "shadow",
+        help="Update a staged copy of the store, validate it and swap it in (default: UPDATE_MODE).",
+    )
     args = parser.parse_args()
 
     logger.info("Initialising RAG (loads embedding model)...")
-    rag = Rag()
-    result = run_update(rag, since_date=args.since, prune_weeks=args.prune_weeks)
+    rag = Rag(versioned=args.shadow)
+    if args.shadow:
+        _, result = run_shadow_update(rag, since_date=args.since, prune_weeks=args.prune_weeks)
+    else:
+        result = run_update(rag, since_date=args.since, prune_weeks=args.prune_weeks)
     logger.info(f"Update complete: {result}")
+    logger.info(f"Gemini rate limiters: chat={chat_limiter.stats()} embed={embed_limiter.stats()}")
 
 
 if __name__ == "__main__":
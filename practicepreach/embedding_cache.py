@@ -0,0 +1,116 @@
+"""
+Persistent, content-addressed cache in front of an embedding model.
+
+Vectors are keyed by (model name, SHA-256 of the whitespace-normalized chunk
+text), so rebuilding the store or re-running ingestion only calls the
+embedding API/model for text it has not seen before. Query embeddings are
+passed through uncached: models like e5 embed queries differently from
+passages.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_CACHE_DB = Path("data/embedding_cache.db")
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, model_name: str, path: Path = EMBEDDING_CACHE_DB):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        # Ingestion embeds from several threads; sqlite3 connections are per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _lookup(self, hashes: list[str]) -> dict[str, list[float]]:
+        found = {}
+        conn = self._conn()
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings"
+                f" WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                [self.model_name, *chunk],
+            ).fetchall()
+            for h, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[h] = vector.tolist()
+        return found
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [text_hash(t) for t in texts]
+        vectors = self._lookup(hashes)
+
+        # Embed each unseen text once, even if it occurs several times in the batch.
+        missing = {h: t for h, t in zip(hashes, texts) if h not in vectors}
+        if missing:
+            new_vectors = self.embeddings.embed_documents(list(missing.values()))
+            with self._conn() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                    [(self.model_name, h, array("f", v).tobytes()) for h, v in zip(missing, new_vectors)],
+                )
+            vectors.update(zip(missing, new_vectors))
+
+        with self._stats_lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        return [vectors[h] for h in hashes]
+
+    def cached_vectors(self, texts: list[str]) -> list[list[float] | None]:
+        """Cached vectors for texts, None where the cache has none. Never calls the model."""
+        vectors = self._lookup([text_hash(t) for t in texts])
+        return [vectors.get(text_hash(t)) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def log_stats(self) -> None:
+        s = self.stats()
+        logger.info(
+            f"Embedding cache ({s['model']}): {s['hits']} hits, {s['misses']} misses "
+            f"({s['hit_rate']:.1%} hit rate)"
+        )
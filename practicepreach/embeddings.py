@@ -0,0 +1,202 @@
+"""
+Embedding providers, selected with EMBEDDING_PROVIDER:
+
+- "google"      — Gemini gemini-embedding-001 via the API (default)
+- "huggingface" — intfloat/multilingual-e5-large via sentence-transformers
+- "onnx"        — the same e5 model exported to int8-quantized ONNX
+                  (bin/export_onnx_e5.py) and run with ONNX Runtime on CPU
+
+Every provider is wrapped in CachedEmbeddings, keyed by its own model name,
+so vectors from different backends never mix in the cache. Gemini calls go
+through embed_limiter below the cache, so only misses spend quota. With EMBEDDING_DIM
+set (google only), vectors are additionally truncated to that many Matryoshka
+dimensions before they reach the vector store; the cache keeps full precision,
+which Rag.similarity_search uses to re-rank.
+"""
+import logging
+import os
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+from practicepreach.embedding_cache import CachedEmbeddings
+from practicepreach.rate_limiter import AdaptiveRateLimiter, embed_limiter
+from practicepreach.params import (
+    EMBEDDING_PROVIDER, GOOGLE_API_KEY, ONNX_MODEL_DIR, EMBED_THREADS, TORCH_DEVICE, EMBEDDING_DIM,
+)
+
+GEMINI_EMBEDDING_MODEL = "gemini-embedding-001"
+E5_MODEL = "intfloat/multilingual-e5-large"
+E5_ONNX_MODEL = f"{E5_MODEL}:onnx-int8"
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxE5Embeddings(Embeddings):
+    """
+    multilingual-e5 on ONNX Runtime: mean pooling + L2 normalization, like the
+    sentence-transformers pipeline, so vectors match the "huggingface" provider
+    up to quantization error.
+
+    Texts are tokenized up front and sorted by length; batches are then cut so
+    that batch_size * padded_length stays under max_batch_tokens. Short chunks
+    run in large batches, long ones in small batches, and almost no compute is
+    spent on padding.
+    """
+
+    def __init__(self, model_dir: str | Path = ONNX_MODEL_DIR, max_length: int = 512,
+                 max_batch_tokens: int = 16384, num_threads: int = EMBED_THREADS):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as exc:
+            raise ImportError(
+                "The onnx embedding provider needs onnxruntime and tokenizers: uv sync --group onnx"
+            ) from exc
+
+        model_dir = Path(model_dir)
+        model_path = model_dir / "model_quantized.onnx"
+        if not model_path.exists():
+            model_path = model_dir / "model.onnx"
+        if not model_path.exists():
+            raise FileNotFoundError(f"No ONNX model in {model_dir} — run bin/export_onnx_e5.py first")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or os.cpu_count()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.no_padding()
+        self.max_batch_tokens = max_batch_tokens
+        logger.info(f"Loaded ONNX embedding model {model_path} ({options.intra_op_num_threads} threads)")
+
+    def _embed(self, texts: list[str]) -> list[list[float]]:
+        import numpy as np
+
+        if not texts:
+            return []
+        encodings = self.tokenizer.encode_batch(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(encodings[i].ids))
+        vectors = [None] * len(texts)
+
+        start = 0
+        while start < len(order):
+            end = start + 1
+            # Sorted ascending, so the last item in a batch sets its padded length.
+            while end < len(order) and (end - start + 1) * len(encodings[order[end]].ids) <= self.max_batch_tokens:
+                end += 1
+            batch = order[start:end]
+            seq_len = len(encodings[batch[-1]].ids)
+
+            input_ids = np.zeros((len(batch), seq_len), dtype=np.int64)
+            attention_mask = np.zeros((len(batch), seq_len), dtype=np.int64)
+            for row, i in enumerate(batch):
+                ids = encodings[i].ids
+                input_ids[row, :len(ids)] = ids
+                attention_mask[row, :len(ids)] = 1
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            hidden = self.session.run(None, feeds)[0]
+            mask = attention_mask[..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            for row, i in enumerate(batch):
+                vectors[i] = pooled[row].tolist()
+            start = end
+
+        return vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed([text])[0]
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """Paces every call to the wrapped embeddings through an AdaptiveRateLimiter."""
+
+    def __init__(self, embeddings: Embeddings, limiter: AdaptiveRateLimiter):
+        self.embeddings = embeddings
+        self.limiter = limiter
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.limiter.call(self.embeddings.embed_documents, texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.limiter.call(self.embeddings.embed_query, text)
+
+
+def truncate_and_normalize(vector: list[float], dim: int) -> list[float]:
+    """Keep the first `dim` Matryoshka dimensions and re-normalize to unit length."""
+    head = vector[:dim]
+    norm = sum(x * x for x in head) ** 0.5 or 1.0
+    return [x / norm for x in head]
+
+
+class MatryoshkaEmbeddings(Embeddings):
+    """
+    Stores vectors at reduced dimensionality. gemini-embedding-001 is
+    Matryoshka-trained, so a prefix of its vector remains a usable embedding;
+    multilingual-e5 is not and loses quality when truncated. The
+    full-precision embeddings stay reachable as `.full` for re-ranking.
+    """
+
+    def __init__(self, full: Embeddings, dim: int):
+        self.full = full
+        self.dim = dim
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [truncate_and_normalize(v, self.dim) for v in self.full.embed_documents(texts)]
+
+    def embed_query(self, text: str) -> list[float]:
+        return truncate_and_normalize(self.full.embed_query(text), self.dim)
+
+    def stats(self) -> dict:
+        return self.full.stats()
+
+    def log_stats(self) -> None:
+        self.full.log_stats()
+
+
+def get_base_embeddings(provider: str = EMBEDDING_PROVIDER) -> tuple[Embeddings, str]:
+    """Return (uncached embeddings, model name) for a provider."""
+    if provider == "google":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        return GoogleGenerativeAIEmbeddings(
+            model=GEMINI_EMBEDDING_MODEL,
+            google_api_key=GOOGLE_API_KEY,
+        ), GEMINI_EMBEDDING_MODEL
+    if provider == "huggingface":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(
+            model_name=E5_MODEL,
+            model_kwargs={"device": TORCH_DEVICE},
+            encode_kwargs={"batch_size": 8},
+        ), E5_MODEL
+    if provider == "onnx":
+        return OnnxE5Embeddings(), E5_ONNX_MODEL
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER {provider!r} (expected google, huggingface or onnx)")
+
+
+def get_embeddings(provider: str = EMBEDDING_PROVIDER, dim: int = EMBEDDING_DIM) -> Embeddings:
+    """Embeddings for the configured provider, behind the persistent embedding cache."""
+    if dim and provider != "google":
+        raise ValueError(
+            f"EMBEDDING_DIM={dim} needs EMBEDDING_PROVIDER=google: only gemini-embedding-001 is "
+            f"Matryoshka-trained, {provider!r} vectors cannot be truncated"
+        )
+    embeddings, model_name = get_base_embeddings(provider)
+    if provider == "google":
+        embeddings = RateLimitedEmbeddings(embeddings, embed_limiter)
+    cached = CachedEmbeddings(embeddings, model_name=model_name)
+    if dim:
+        logger.info(f"Using embedding provider {provider!r} ({model_name}), stored at {dim} dimensions")
+        return MatryoshkaEmbeddings(cached, dim)
+    logger.info(f"Using embedding provider {provider!r} ({model_name})")
+    return cached
@@ -1,11 +1,15 @@
 import json
+import uuid
+import hashlib
 import logging
 import asyncio
 import threading
+import time
 from datetime import datetime, date
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -15,15 +19,22 @@ import subprocess
 from email.mime.text import MIMEText
 
 from practicepreach import constants
-from practicepreach.params import LOG_LEVEL, UPDATE_SECRET_TOKEN, GCS_CHROMA_PATH, GMAIL_USER, GMAIL_APP_PASSWORD
+from practicepreach.params import (
+    LOG_LEVEL, UPDATE_SECRET_TOKEN, GCS_CHROMA_PATH, GMAIL_USER, GMAIL_APP_PASSWORD,
+    SUMMARIES_BATCH_CONCURRENCY, STORE_RELOAD_INTERVAL, UPDATE_MODE, USE_EXTERNAL_CHROMA, RAG_INIT_MODE,
+)
+from practicepreach.llm_executor import llm_executor, LlmQueueFull
 from practicepreach.rag import Rag
-from practicepreach.updater import run_update
+from practicepreach.rate_limiter import chat_limiter, embed_limiter
+from practicepreach.singleflight import SingleFlight
+from practicepreach.summaries_cache import SummariesCache, SUMMARIES_DB, LEGACY_SUMMARIES_JSON
 
-TOPS_JSON = Path("data/tops.json")
-SUMMARIES_CACHE = Path("data/summaries_cache.json")
 FEEDBACK_FILE = Path("data/feedback.json")
-_cache_lock = threading.Lock()
 _feedback_lock = threading.Lock()
+_summaries_flight = SingleFlight()
+_batch_semaphore = asyncio.Semaphore(SUMMARIES_BATCH_CONCURRENCY)
+# Summaries cache fetched by a background Rag start-up; merged into the open cache once ready.
+STARTUP_SUMMARIES = SUMMARIES_DB.with_name("summaries_cache.startup.db")
 
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL, logging.INFO),
@@ -38,7 +49,28 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up...")
     # e.g. connect to DB, load ML model, init client, create resources
 
-    app.state.rag = Rag()
+    # None until the vector store is loaded; see /readyz.
+    app.state.rag = None
+    app.state.rag_error = None
+    # The version served before the last update or reload, kept for /admin/rollback.
+    app.state.previous_rag = None
+
+    background = RAG_INIT_MODE == "background"
+    if background:
+        # Only the small sidecars are fetched before serving, so cached
+        # summaries are available while the store loads.
+        await asyncio.to_thread(Rag.prefetch_sidecars)
+    else:
+        app.state.rag = Rag()
+
+    app.state.summaries = SummariesCache()
+    if app.state.summaries.is_empty() and LEGACY_SUMMARIES_JSON.exists():
+        app.state.summaries.import_json(LEGACY_SUMMARIES_JSON)
+
+    if background:
+        startup_task = asyncio.create_task(_init_rag_in_background())
+    else:
+        startup_task = _start_reload_poller()
 
     # Update ChromaDB with recent speeches in the background so the API is
     # immediately available while new data is being embedded.
@@ -54,7 +86,10 @@ async def lifespan(app: FastAPI):
 
     # e.g. close DB connection, free resources
     logger.info("Shutting down...")
-    app.state.rag.shutdown()
+    if startup_task is not None:
+        startup_task.cancel()
+    if app.state.rag is not None:
+        app.state.rag.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -67,10 +102,50 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+@app.exception_handler(LlmQueueFull)
+async def llm_queue_full_handler(request: Request, exc: LlmQueueFull):
+    logger.warning(f"Rejecting {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Zu viele gleichzeitige Anfragen, bitte später erneut versuchen."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 @app.get("/")
 def root():
     return {'greeting': 'PracticePreach FastAPI is running!'}
 
+RAG_RETRY_AFTER = 10
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving, whether or not the store has loaded."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 200 once the vector store is loaded, 503 while loading or after a failed start."""
+    if app.state.rag is not None:
+        return {"status": "ready", "store": app.state.rag.store_version}
+    if app.state.rag_error is not None:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": app.state.rag_error})
+    return JSONResponse(
+        status_code=503,
+        content={"status": "loading"},
+        headers={"Retry-After": str(RAG_RETRY_AFTER)},
+    )
+
+def _require_rag() -> Rag:
+    """The serving Rag, or a 503 while it is still loading in the background."""
+    rag = app.state.rag
+    if rag is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Daten werden noch geladen, bitte später erneut versuchen.",
+            headers={"Retry-After": str(RAG_RETRY_AFTER)},
+        )
+    return rag
+
 @app.get("/parameters")
 def get_parameters():
     return {
@@ -80,11 +155,6 @@ def get_parameters():
 
 MAX_REFRESHES = 5
 
-def _read_cache() -> dict:
-    if SUMMARIES_CACHE.exists():
-        return json.loads(SUMMARIES_CACHE.read_text())
-    return {}
-
 def _split_summary(text: str) -> tuple[str, str]:
     """Split LLM output into (kernposition_line, quotes_block)."""
     kernposition = ""
@@ -111,126 +181,351 @@ def _normalize_entry(entry) -> dict:
         return {"kernposition": kp, "quotes_text": qt, "count": entry.get("count", 0)}
     return entry or {}
 
+def _party_payload(entry: dict) -> dict:
+    return {
+        "summary": _combine_summary(entry.get("kernposition", ""), entry.get("quotes_text", "")),
+        "label": None,
+        "refresh_count": entry.get("count", 0),
+    }
+
 def _write_cache(top_key: str, party: str, kernposition: str, quotes_text: str, count: int):
-    with _cache_lock:
-        cache = _read_cache()
-        cache.setdefault(top_key, {})[party] = {
-            "kernposition": kernposition,
-            "quotes_text": quotes_text,
-            "count": count,
-        }
-        SUMMARIES_CACHE.write_text(json.dumps(cache, ensure_ascii=False, indent=2))
+    app.state.summaries.put(top_key, party, {
+        "kernposition": kernposition,
+        "quotes_text": quotes_text,
+        "count": count,
+    })
+
+_tops_cache: tuple[Path, int, dict] | None = None
+
+def _load_tops(tops_path: Path) -> dict | None:
+    """Parsed tops.json, re-read only when the file (or the store version's file) changes."""
+    global _tops_cache
+    try:
+        mtime = tops_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _tops_cache
+    if cached is None or cached[0] != tops_path or cached[1] != mtime:
+        cached = (tops_path, mtime, json.loads(tops_path.read_text()))
+        _tops_cache = cached
+    return cached[2]
 
 def _load_tops_with_active_keys(rag: Rag):
-    if not TOPS_JSON.exists():
+    tops = _load_tops(rag.tops_path)
+    if tops is None:
         raise HTTPException(status_code=404, detail="tops.json not found — run build_tops_json.py first")
-    tops = json.loads(TOPS_JSON.read_text())
-    col = rag.vector_store._collection
-    result = col.get(where={"type": {"$eq": "speech"}}, include=["metadatas"])
-    active_keys = {m["top_key"] for m in result["metadatas"] if m.get("top_key")}
-
-    # Derive PDF URL per session from speech IDs (format: ID{wp}{session_padded}...)
-    session_pdf_urls = {}
-    for m in result["metadatas"]:
-        sid = m.get("id", "")
-        if sid.startswith("ID") and len(sid) >= 8:
-            wp = sid[2:4]
-            session = sid[4:6].zfill(3)
-            session_pdf_urls[sid[4:6]] = f"https://dserver.bundestag.de/btp/{wp}/{wp}{session}.pdf"
-
-    return tops, active_keys, session_pdf_urls
+    index = rag.tops_index
+    return tops, index.active_keys, index.session_pdf_urls
+
+# ETags are built from in-memory change counters, so a matching If-None-Match
+# is answered without touching Chroma or the data files. The salt keeps tags
+# from different processes (restarts, other instances) from colliding.
+_ETAG_SALT = uuid.uuid4().hex
+TOPICS_CACHE_CONTROL = "public, max-age=300"
+SUMMARIES_CACHE_CONTROL = "public, max-age=60"
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(map(str, (_ETAG_SALT, *parts))).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def _not_modified(request: Request, etag: str, cache_control: str) -> Response | None:
+    """Return a 304 response if the client already holds the current version."""
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = {t.strip() for t in if_none_match.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
+
+def _topics_etag(rag: Rag, endpoint: str) -> str:
+    try:
+        tops_mtime = rag.tops_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        tops_mtime = 0
+    return _etag(endpoint, rag.store_version, rag.tops_index.version, tops_mtime)
 
 @app.get("/topics")
-def get_topics():
-    rag: Rag = app.state.rag
+def get_topics(request: Request, response: Response):
+    rag = _require_rag()
+    etag = _topics_etag(rag, "topics")
+    if (not_modified := _not_modified(request, etag, TOPICS_CACHE_CONTROL)):
+        return not_modified
     tops, active_keys, _ = _load_tops_with_active_keys(rag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = TOPICS_CACHE_CONTROL
     return sorted(
         [t for t in tops.values() if t["top_key"] in active_keys],
         key=lambda x: (x["date"], x["top_id"]),
     )
 
 @app.get("/all_topics")
-def get_all_topics():
-    rag: Rag = app.state.rag
+def get_all_topics(request: Request, response: Response):
+    rag = _require_rag()
+    etag = _topics_etag(rag, "all_topics")
+    if (not_modified := _not_modified(request, etag, TOPICS_CACHE_CONTROL)):
+        return not_modified
     tops, active_keys, session_pdf_urls = _load_tops_with_active_keys(rag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = TOPICS_CACHE_CONTROL
     result = []
     for t in sorted(tops.values(), key=lambda x: (x["date"], x["top_id"])):
         pdf_url = session_pdf_urls.get(t["session"], "")
         result.append({**t, "active": t["top_key"] in active_keys, "pdf_url": pdf_url})
     return result
 
+def _cached_general(raw_cache: dict) -> str:
+    general = raw_cache.get("general")
+    return general.get("summary", "") if isinstance(general, dict) else ""
+
+async def _generate_general(rag: Rag, top_key: str) -> str:
+    """Generate and cache the general summary; concurrent callers share one LLM call."""
+    async def generate():
+        # A previous leader may have finished between the caller's cache read and now.
+        general_text = _cached_general({"general": app.state.summaries.get_entry(top_key, "general")})
+        if general_text:
+            return general_text
+        subtitle = (_load_tops(rag.tops_path) or {}).get(top_key, {}).get("subtitle", "")
+        general_text = await llm_executor.arun(rag.asummarize_topic_general, top_key, subtitle)
+        if general_text:
+            app.state.summaries.put(top_key, "general", {"summary": general_text})
+        return general_text or ""
+
+    return await _summaries_flight.do((top_key, "general"), generate)
+
+async def _generate_party(rag: Rag, top_key: str, party: str, general_text: str) -> dict | None:
+    """Generate and cache one party summary; concurrent callers share one LLM call."""
+    async def generate():
+        entry = app.state.summaries.get_entry(top_key, party)
+        if entry is not None:
+            return _normalize_entry(entry)
+        summary = await llm_executor.arun(rag.asummarize_by_top_key, top_key, party, general_text)
+        if summary is None:
+            return None
+        kp, qt = _split_summary(summary)
+        _write_cache(top_key, party, kp, qt, 0)
+        return {"kernposition": kp, "quotes_text": qt, "count": 0}
+
+    return await _summaries_flight.do((top_key, party), generate)
+
+def _summaries_etag(rag: Rag, top_key: str) -> str:
+    return _etag("summaries", top_key, app.state.summaries.version(top_key), rag.store_version, rag.tops_index.version)
+
+def _cache_complete(raw_cache: dict) -> bool:
+    """True if the general and every party summary are cached, so no Rag is needed."""
+    return bool(_cached_general(raw_cache)) and all(p in raw_cache for p in constants.PARTIES_LIST)
+
 @app.get("/summaries")
-async def get_summaries(top_key: str):
-    rag: Rag = app.state.rag
+async def get_summaries(top_key: str, request: Request, response: Response):
+    rag: Rag | None = app.state.rag
+    if rag is None:
+        # Still loading: fully cached TOPs are answered, without an ETag since
+        # the tag depends on the store.
+        raw_cache = app.state.summaries.get(top_key)
+        if not _cache_complete(raw_cache):
+            _require_rag()
+        result, _ = await _build_summaries(None, top_key, raw_cache)
+        return result
+    if (not_modified := _not_modified(request, _summaries_etag(rag, top_key), SUMMARIES_CACHE_CONTROL)):
+        return not_modified
+    result, complete = await _build_summaries(rag, top_key, app.state.summaries.get(top_key))
+    # Only let clients cache responses where no party failed; otherwise a
+    # transient LLM error would stick until the next cache write.
+    if complete:
+        response.headers["ETag"] = _summaries_etag(rag, top_key)
+        response.headers["Cache-Control"] = SUMMARIES_CACHE_CONTROL
+    return result
 
-    raw_cache = _read_cache().get(top_key, {})
+async def _build_summaries(rag: Rag | None, top_key: str, raw_cache: dict) -> tuple[dict, bool]:
+    """
+    Assemble the /summaries response for a TOP, generating whatever raw_cache lacks.
+    rag may be None if raw_cache is complete. Returns (response, complete) where complete is False if any generation failed.
+    """
+    complete = True
     cached = {p: _normalize_entry(e) for p, e in raw_cache.items()}
 
     # General summary first — party prompts use it to avoid repetition
-    general_text = raw_cache.get("general", {}).get("summary", "") if isinstance(raw_cache.get("general"), dict) else ""
+    general_text = _cached_general(raw_cache)
     if not general_text:
-        subtitle = ""
-        if TOPS_JSON.exists():
-            tops = json.loads(TOPS_JSON.read_text())
-            subtitle = tops.get(top_key, {}).get("subtitle", "")
-        loop = asyncio.get_event_loop()
-        general_text = await loop.run_in_executor(None, rag.summarize_topic_general, top_key, subtitle)
-        if general_text:
-            with _cache_lock:
-                cache = _read_cache()
-                cache.setdefault(top_key, {})["general"] = {"summary": general_text}
-                SUMMARIES_CACHE.write_text(json.dumps(cache, ensure_ascii=False, indent=2))
+        general_text = await _generate_general(rag, top_key)
 
     parties_to_generate = [p for p in constants.PARTIES_LIST if p not in cached]
 
     if parties_to_generate:
-        async def process_party(party: str):
-            loop = asyncio.get_event_loop()
-            summary = await loop.run_in_executor(None, rag.summarize_by_top_key, top_key, party, general_text)
-            return party, summary
-
         logger.info(f"Generating summaries for top_key={top_key}: {parties_to_generate}")
         results = await asyncio.gather(
-            *[process_party(p) for p in parties_to_generate],
+            *[_generate_party(rag, top_key, p, general_text) for p in parties_to_generate],
             return_exceptions=True,
         )
 
-        for result in results:
+        for party, result in zip(parties_to_generate, results):
+            if isinstance(result, LlmQueueFull):
+                raise result
             if isinstance(result, Exception):
                 logger.error(f"Party processing failed: {result}")
+                complete = False
                 continue
-            party, summary = result
-            if summary is not None:
-                kp, qt = _split_summary(summary)
-                _write_cache(top_key, party, kp, qt, 0)
-                cached[party] = {"kernposition": kp, "quotes_text": qt, "count": 0}
+            if result is not None:
+                cached[party] = result
     else:
         logger.info(f"Serving cached summaries for top_key={top_key}")
 
-    response = {
-        p: {
-            "summary": _combine_summary(e.get("kernposition", ""), e.get("quotes_text", "")),
-            "label": None,
-            "refresh_count": e.get("count", 0),
-        }
-        for p, e in cached.items()
-    }
+    response = {p: _party_payload(e) for p, e in cached.items()}
     if general_text:
         response["general"] = {"summary": general_text}
+    return response, complete
+
+
+class BatchSummariesBody(BaseModel):
+    top_keys: list[str] = []
+    session: str = ""
+
+MAX_BATCH_TOPS = 200
+
+@app.post("/summaries/batch")
+async def batch_summaries(body: BatchSummariesBody):
+    """
+    Summaries for many TOPs in one round trip, keyed by top_key.
+    Takes explicit top_keys and/or a session number (all active TOPs of that session).
+    Cache hits are resolved in one pass; misses are generated under a concurrency
+    limit shared by all batch requests. While the store is still loading, only
+    batches that are fully cached are answered. A TOP whose generation failed is
+    returned as {"error": ...}; if the LLM queue is full the whole batch gets a
+    503 with Retry-After, like the single-TOP endpoints.
+    """
+    rag: Rag | None = app.state.rag
+
+    top_keys = list(dict.fromkeys(body.top_keys))
+    if body.session:
+        rag = _require_rag()
+        tops, active_keys, _ = _load_tops_with_active_keys(rag)
+        session_tops = sorted(
+            (t for t in tops.values() if t["session"] == body.session and t["top_key"] in active_keys),
+            key=lambda x: x["top_id"],
+        )
+        top_keys += [t["top_key"] for t in session_tops if t["top_key"] not in top_keys]
+    if not top_keys:
+        raise HTTPException(status_code=400, detail="top_keys oder session angeben.")
+    if len(top_keys) > MAX_BATCH_TOPS:
+        raise HTTPException(status_code=400, detail=f"Maximal {MAX_BATCH_TOPS} TOPs pro Anfrage.")
+
+    raw_caches = app.state.summaries.get_many(top_keys)
+    n_misses = sum(1 for k in top_keys if not _cache_complete(raw_caches[k]))
+    if n_misses and rag is None:
+        _require_rag()
+
+    async def build(top_key: str) -> dict:
+        raw_cache = raw_caches[top_key]
+        if _cache_complete(raw_cache):
+            result, _ = await _build_summaries(rag, top_key, raw_cache)
+            return result
+        async with _batch_semaphore:
+            result, _ = await _build_summaries(rag, top_key, raw_cache)
+            return result
+
+    logger.info(f"Batch summaries for {len(top_keys)} TOPs ({n_misses} need generation)")
+    results = await asyncio.gather(*[build(k) for k in top_keys], return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, LlmQueueFull):
+            raise result
+
+    response = {}
+    for top_key, result in zip(top_keys, results):
+        if isinstance(result, Exception):
+            logger.error(f"Batch summaries failed for top_key={top_key}: {result}")
+            response[top_key] = {"error": "Zusammenfassung fehlgeschlagen."}
+            continue
+        response[top_key] = result
     return response
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.get("/summaries/stream")
+async def stream_summaries(top_key: str):
+    """
+    Server-Sent Events variant of /summaries.
+    Emits cached parties immediately, then the general summary, then each
+    generated party as soon as it is ready. Every event's data has the same
+    shape as the matching entry in the /summaries response, keyed by party
+    (or "general"); a final "done" event closes the stream. If the general
+    summary cannot be generated, an "error" event ({"error", and
+    "retry_after" when the LLM queue is full}) precedes "done".
+    """
+    rag: Rag | None = app.state.rag
+    if rag is None and not _cache_complete(app.state.summaries.get(top_key)):
+        _require_rag()
+
+    async def events():
+        raw_cache = app.state.summaries.get(top_key)
+        cached = {p: _normalize_entry(e) for p, e in raw_cache.items() if p != "general"}
+        for p, e in cached.items():
+            yield _sse(p, {p: _party_payload(e)})
+
+        general_text = _cached_general(raw_cache)
+        if not general_text:
+            try:
+                general_text = await _generate_general(rag, top_key)
+            except LlmQueueFull as exc:
+                logger.warning(f"Rejecting /summaries/stream: {exc}")
+                yield _sse("error", {"error": "Zu viele gleichzeitige Anfragen, bitte später erneut versuchen.",
+                                     "retry_after": exc.retry_after})
+                yield _sse("done", {})
+                return
+            except Exception as exc:
+                logger.error(f"General summary failed: {exc}")
+                yield _sse("error", {"error": "Zusammenfassung fehlgeschlagen."})
+                yield _sse("done", {})
+                return
+        if general_text:
+            yield _sse("general", {"general": {"summary": general_text}})
+
+        async def generate(party: str):
+            return party, await _generate_party(rag, top_key, party, general_text)
+
+        parties_to_generate = [p for p in constants.PARTIES_LIST if p not in cached]
+        for next_done in asyncio.as_completed([generate(p) for p in parties_to_generate]):
+            try:
+                party, entry = await next_done
+            except Exception as exc:
+                logger.error(f"Party processing failed: {exc}")
+                continue
+            if entry is not None:
+                yield _sse(party, {party: _party_payload(entry)})
+
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _store_stats(rag: Rag | None) -> dict:
+    if rag is None:
+        return {"ready": False, "error": app.state.rag_error}
+    return {"ready": True, "version": rag.store_version, "vectors": rag.get_num_of_vectors()}
+
+@app.get("/stats")
+def get_stats():
+    return {
+        "summaries_singleflight": _summaries_flight.stats(),
+        "llm_executor": llm_executor.stats(),
+        "rate_limits": {"chat": chat_limiter.stats(), "embed": embed_limiter.stats()},
+        "store": _store_stats(app.state.rag),
+    }
+
+
 @app.post("/summaries/refresh")
 async def refresh_summary(top_key: str, party: str):
-    rag: Rag = app.state.rag
+    rag = _require_rag()
 
-    with _cache_lock:
-        entry = _normalize_entry(_read_cache().get(top_key, {}).get(party))
+    entry = _normalize_entry(app.state.summaries.get_entry(top_key, party))
 
     quotes_text = entry.get("quotes_text", "")
-    loop = asyncio.get_event_loop()
     logger.info(f"Refreshing Kernposition for top_key={top_key}, party={party}")
-    new_kernposition = await loop.run_in_executor(None, rag.regenerate_kernposition, top_key, party)
+    new_kernposition = await llm_executor.arun(rag.aregenerate_kernposition, top_key, party)
     return {
         "summary": _combine_summary(new_kernposition or entry.get("kernposition", ""), quotes_text),
         "label": None,
@@ -239,13 +534,9 @@ async def refresh_summary(top_key: str, party: str):
 
 @app.post("/summaries/refresh-general")
 async def refresh_general_summary(top_key: str):
-    rag: Rag = app.state.rag
-    subtitle = ""
-    if TOPS_JSON.exists():
-        tops = json.loads(TOPS_JSON.read_text())
-        subtitle = tops.get(top_key, {}).get("subtitle", "")
-    loop = asyncio.get_event_loop()
-    general_text = await loop.run_in_executor(None, rag.summarize_topic_general, top_key, subtitle)
+    rag = _require_rag()
+    subtitle = (_load_tops(rag.tops_path) or {}).get(top_key, {}).get("subtitle", "")
+    general_text = await llm_executor.arun(rag.asummarize_topic_general, top_key, subtitle)
     if general_text is None:
         raise HTTPException(status_code=404, detail="Keine Redebeiträge gefunden.")
     return {"summary": general_text}
@@ -303,6 +594,101 @@ def _str2date(s: str) -> date:
 
 
 _update_running = False
+_reload_lock = asyncio.Lock()
+
+
+def _check_admin_token(request: Request):
+    """Admin endpoints are protected by the UPDATE_SECRET_TOKEN env var (Bearer token)."""
+    if not UPDATE_SECRET_TOKEN:
+        raise HTTPException(status_code=503, detail="UPDATE_SECRET_TOKEN not configured")
+    auth = request.headers.get("Authorization", "")
+    if auth != f"Bearer {UPDATE_SECRET_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+async def _reload_store() -> dict:
+    """
+    Load the latest published store version next to the current one and swap
+    app.state.rag over to it. Handlers take their Rag reference once per
+    request, so in-flight requests finish on the old version; its files are
+    removed on the next reload.
+    """
+    async with _reload_lock:
+        old = _require_rag()
+        if _update_running:
+            return {"status": "update_running", "version": old.store_version}
+        new = await asyncio.to_thread(old.load_latest)
+        if new is None:
+            return {"status": "current", "version": old.store_version}
+        if new.fetched_summaries and new.fetched_summaries.exists():
+            await asyncio.to_thread(app.state.summaries.import_db, new.fetched_summaries)
+        app.state.rag, app.state.previous_rag = new, old
+        logger.info(f"Switched to store version {new.store_version} (was {old.store_version})")
+        await asyncio.to_thread(new.remove_stale_stores, [old.store_dir])
+        return {"status": "reloaded", "version": new.store_version, "previous": old.store_version}
+
+
+def _start_reload_poller() -> asyncio.Task | None:
+    if STORE_RELOAD_INTERVAL > 0 and app.state.rag.store_version is not None:
+        return asyncio.create_task(_poll_store_version(STORE_RELOAD_INTERVAL))
+    return None
+
+
+async def _init_rag_in_background():
+    """Load Rag off the event loop for RAG_INIT_MODE=background, then start the reload poller."""
+    started = time.monotonic()
+    try:
+        rag = await asyncio.to_thread(Rag, STARTUP_SUMMARIES)
+        if rag.fetched_summaries is not None:
+            await asyncio.to_thread(app.state.summaries.import_db, rag.fetched_summaries)
+            rag.fetched_summaries.unlink(missing_ok=True)
+    except Exception as exc:
+        app.state.rag_error = f"{type(exc).__name__}: {exc}"
+        logger.error(f"Loading the vector store failed: {exc}", exc_info=True)
+        return
+    app.state.rag = rag
+    logger.info(f"Vector store ready after {time.monotonic() - started:.1f}s")
+    if (poller := _start_reload_poller()) is not None:
+        await poller
+
+
+async def _poll_store_version(interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await _reload_store()
+            if result["status"] == "reloaded":
+                logger.info(f"Store reload: {result}")
+        except Exception as exc:
+            logger.error(f"Store reload failed: {exc}", exc_info=True)
+
+
+@app.post("/admin/rollback")
+async def admin_rollback(request: Request):
+    """Switch back to the store version served before the last update or reload."""
+    _check_admin_token(request)
+    async with _reload_lock:
+        previous: Rag | None = app.state.previous_rag
+        if previous is None:
+            raise HTTPException(status_code=409, detail="No previous store version to roll back to")
+        if _update_running:
+            raise HTTPException(status_code=409, detail="Update in progress")
+        current = _require_rag()
+        await asyncio.to_thread(previous.promote, False)
+        # Point GCS back at the old version so other instances reload it too.
+        await asyncio.to_thread(previous.republish)
+        app.state.rag, app.state.previous_rag = previous, current
+        logger.warning(f"Rolled back to store version {previous.store_version} (from {current.store_version})")
+        return {"status": "rolled_back", "version": previous.store_version, "previous": current.store_version}
+
+
+@app.post("/admin/reload")
+async def admin_reload(request: Request):
+    """Switch to the latest store version published to GCS without restarting."""
+    _check_admin_token(request)
+    if _require_rag().store_version is None:
+        raise HTTPException(status_code=409, detail="Hot reload needs GCS_SYNC_MODE=snapshot or delta")
+    return await _reload_store()
 
 
 @app.post("/admin/update")
@@ -315,22 +701,30 @@ async def admin_update(request: Request, since_date: str = None):
     """
     global _update_running
 
-    if not UPDATE_SECRET_TOKEN:
-        raise HTTPException(status_code=503, detail="UPDATE_SECRET_TOKEN not configured")
-    auth = request.headers.get("Authorization", "")
-    if auth != f"Bearer {UPDATE_SECRET_TOKEN}":
-        raise HTTPException(status_code=401, detail="Unauthorized")
+    _check_admin_token(request)
 
     if _update_running:
         return {"status": "already_running"}
 
-    rag: Rag = app.state.rag
+    rag = _require_rag()
+    shadow = UPDATE_MODE == "shadow"
+    if shadow and USE_EXTERNAL_CHROMA:
+        logger.warning("UPDATE_MODE=shadow needs a local store — updating the external ChromaDB in place")
+        shadow = False
 
     def _do_update():
         global _update_running
+        # The update pipeline (pandas, XML parsing) is loaded on first use only.
+        from practicepreach.updater import run_update, run_shadow_update
+
         _update_running = True
         try:
-            result = run_update(rag, since_date=since_date, prune_weeks=52)
+            if shadow:
+                # Serving continues on `rag` until the validated copy is swapped in.
+                staged, result = run_shadow_update(rag, since_date=since_date, prune_weeks=52)
+                app.state.rag, app.state.previous_rag = staged, rag
+            else:
+                result = run_update(rag, since_date=since_date, prune_weeks=52)
             logger.info(f"Update complete: {result}")
         except Exception as exc:
             logger.error(f"Update failed: {exc}", exc_info=True)
@@ -0,0 +1,136 @@
+"""
+Bounded execution layer for LLM calls.
+
+All Gemini calls from the API go through one shared executor, either as
+blocking calls on its own thread pool (run) or as native coroutines (arun).
+Both kinds share one gate and one admission count: at most LLM_MAX_IN_FLIGHT
+calls run at once in total, at most LLM_MAX_QUEUE more may wait, and anything
+beyond that is rejected with LlmQueueFull so the API can answer 503 instead
+of piling up 429s. Rag also takes a per-model slot around
+every invoke, which caps CLI scripts that bring their own thread pools.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+
+from practicepreach.params import LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_MODEL_LIMITS, LLM_RETRY_AFTER
+
+logger = logging.getLogger(__name__)
+
+
+class LlmQueueFull(Exception):
+    """Raised when too many LLM calls are already queued; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LlmExecutor:
+    def __init__(self, max_in_flight: int, max_queue: int, model_limits: dict[str, int] = None,
+                 retry_after: int = 5):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._model_limits = model_limits or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._model_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._async_model_slots: dict[str, asyncio.Semaphore] = {}
+        # Shared by run() and arun(): together they never exceed max_in_flight.
+        self._gate = asyncio.Semaphore(max_in_flight)
+        self._pending = 0
+        self._running = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _admit(self) -> float:
+        with self._lock:
+            if self._pending >= self.max_in_flight + self.max_queue:
+                self._rejected += 1
+                raise LlmQueueFull(self.retry_after)
+            self._pending += 1
+            self._submitted += 1
+        return time.monotonic()
+
+    def _started(self, enqueued: float) -> None:
+        waited = time.monotonic() - enqueued
+        with self._lock:
+            self._running += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def _finished(self) -> None:
+        with self._lock:
+            self._running -= 1
+
+    async def run(self, fn, *args):
+        """Run a blocking call on the LLM pool. Raises LlmQueueFull when the queue is full."""
+        enqueued = self._admit()
+        try:
+            async with self._gate:
+                self._started(enqueued)
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+                finally:
+                    self._finished()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def arun(self, coro_fn, *args):
+        """Await a native coroutine call under the same admission and in-flight limits as run()."""
+        enqueued = self._admit()
+        try:
+            async with self._gate:
+                self._started(enqueued)
+                try:
+                    return await coro_fn(*args)
+                finally:
+                    self._finished()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @contextmanager
+    def slot(self, model: str):
+        """Hold one of the model's concurrency slots for the duration of a call."""
+        with self._lock:
+            sem = self._model_slots.get(model)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self._model_limits.get(model, self.max_in_flight))
+                self._model_slots[model] = sem
+        with sem:
+            yield
+
+    @asynccontextmanager
+    async def aslot(self, model: str):
+        """Async counterpart of slot() for coroutine calls."""
+        sem = self._async_model_slots.get(model)
+        if sem is None:
+            sem = asyncio.Semaphore(self._model_limits.get(model, self.max_in_flight))
+            self._async_model_slots[model] = sem
+        async with sem:
+            yield
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._submitted - (self._pending - self._running)
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "queue_wait_avg_s": round(self._wait_total / started, 3) if started else 0.0,
+                "queue_wait_max_s": round(self._wait_max, 3),
+            }
+
+
+llm_executor = LlmExecutor(LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_MODEL_LIMITS, LLM_RETRY_AFTER)
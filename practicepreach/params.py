@@ -1,6 +1,9 @@
 from dotenv import load_dotenv
+import logging
 import os
 
+_logger = logging.getLogger(__name__)
+
 def require_env(*names: str):
     """Ensure required environment variables are set."""
     missing = [name for name in names if not os.environ.get(name)]
@@ -9,7 +12,6 @@ def require_env(*names: str):
 
 load_dotenv(override=True)
 
-require_env("GOOGLE_API_KEY")
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY") # langchain_google_genai
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 
@@ -26,17 +28,61 @@ CHROMADB_PORT = os.environ.get("CHROMADB_PORT", "8000")  # Default port
 PERSIST_DIR = os.environ.get("PERSIST_DIR")  # For embedded Chroma (local dev)
 DATA_CSV = os.environ.get("DATA_CSV")  # Only needed for local dev
 GCS_CHROMA_PATH = os.environ.get("GCS_CHROMA_PATH")  # e.g. gs://bucket/data/chroma_store_e5
+# How the GCS-backed store is synced: "files" (directory copy), "snapshot" (one zstd archive,
+# see practicepreach/snapshot.py) or "delta" (changed blocks only, see practicepreach/store_sync.py)
+GCS_SYNC_MODE = os.environ.get("GCS_SYNC_MODE", "files").lower()
+STORE_RELOAD_INTERVAL = int(os.environ.get("STORE_RELOAD_INTERVAL", "0"))  # Seconds between checks for a new store version, 0 = off
+# "inplace" updates the live store; "shadow" builds a staged copy, validates and swaps it (see updater.run_shadow_update)
+UPDATE_MODE = os.environ.get("UPDATE_MODE", "inplace").lower()
+SHADOW_MAX_SHRINK = float(os.environ.get("SHADOW_MAX_SHRINK", "0.5"))  # Reject staged stores that lost more than this fraction of chunks
+SUMMARIES_BATCH_CONCURRENCY = int(os.environ.get("SUMMARIES_BATCH_CONCURRENCY", "4"))  # TOPs generated at once by /summaries/batch
+
+# LLM execution limits (see practicepreach/llm_executor.py)
+LLM_MAX_IN_FLIGHT = int(os.environ.get("LLM_MAX_IN_FLIGHT", "8"))  # Concurrent Gemini calls
+LLM_MAX_QUEUE = int(os.environ.get("LLM_MAX_QUEUE", "32"))  # Calls allowed to wait before the API answers 503
+LLM_RETRY_AFTER = int(os.environ.get("LLM_RETRY_AFTER", "5"))  # Retry-After seconds on 503
+# Optional per-model caps, e.g. "gemini-2.5-flash=8,gemini-2.5-flash-lite=4"
+LLM_MODEL_LIMITS = {
+    model.strip(): int(limit)
+    for model, _, limit in (item.partition("=") for item in os.environ.get("LLM_MODEL_LIMITS", "").split(","))
+    if model.strip() and limit
+}
+
+# Adaptive Gemini rate limits (requests/s): start rate and ceiling (see practicepreach/rate_limiter.py)
+GEMINI_CHAT_RPS = float(os.environ.get("GEMINI_CHAT_RPS", "1"))
+GEMINI_CHAT_MAX_RPS = float(os.environ.get("GEMINI_CHAT_MAX_RPS", "10"))
+GEMINI_EMBED_RPS = float(os.environ.get("GEMINI_EMBED_RPS", "0.5"))  # One request embeds a whole batch
+GEMINI_EMBED_MAX_RPS = float(os.environ.get("GEMINI_EMBED_MAX_RPS", "5"))
+
+EMBED_CONCURRENCY = int(os.environ.get("EMBED_CONCURRENCY", "4"))  # Embedding batches in flight during ingestion
+XML_PARSE_WORKERS = int(os.environ.get("XML_PARSE_WORKERS", "0"))  # Processes parsing protocol XMLs, 0 = all cores
+
+# Embedding backend: google | huggingface | onnx (see practicepreach/embeddings.py)
+EMBEDDING_PROVIDER = os.environ.get("EMBEDDING_PROVIDER", "google").lower()
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", "data/models/multilingual-e5-large-onnx")
+EMBED_THREADS = int(os.environ.get("EMBED_THREADS", "0"))  # ONNX Runtime intra-op threads, 0 = all cores
+TORCH_DEVICE = os.environ.get("TORCH_DEVICE", "cpu")  # Device for the huggingface provider
+EMBEDDING_DIM = int(os.environ.get("EMBEDDING_DIM", "0"))  # Matryoshka dims stored in Chroma, 0 = full (requires a rebuild)
+RERANK_OVERSAMPLE = int(os.environ.get("RERANK_OVERSAMPLE", "4"))  # Candidates per result re-ranked at full precision
 
 USE_EXTERNAL_CHROMA = bool(CHROMADB_HOST)
 USE_GCS_CHROMA = bool(GCS_CHROMA_PATH) and not USE_EXTERNAL_CHROMA
 
-if USE_EXTERNAL_CHROMA:
-    print(f"Using external ChromaDB at {CHROMADB_HOST}:{CHROMADB_PORT}")
-elif USE_GCS_CHROMA:
-    print(f"Using GCS-backed Chroma: {GCS_CHROMA_PATH}")
-else:
-    if not PERSIST_DIR:
-        raise RuntimeError("PERSIST_DIR is required for local dev setup (embedded Chroma mode)")
-    if not DATA_CSV:
-        raise RuntimeError("DATA_CSV is required for local dev setup (embedded Chroma mode)")
-    print(f"Using embedded Chroma storage: {PERSIST_DIR}")
+# "eager" builds Rag before the API accepts requests; "background" starts serving
+# immediately (/healthz, cached summaries) and reports readiness on /readyz.
+RAG_INIT_MODE = os.environ.get("RAG_INIT_MODE", "eager").lower()
+
+
+def validate_config():
+    """Check the environment for the configured Chroma mode. Called when Rag starts, not on import."""
+    require_env("GOOGLE_API_KEY")
+    if USE_EXTERNAL_CHROMA:
+        _logger.info(f"Using external ChromaDB at {CHROMADB_HOST}:{CHROMADB_PORT}")
+    elif USE_GCS_CHROMA:
+        _logger.info(f"Using GCS-backed Chroma: {GCS_CHROMA_PATH}")
+    else:
+        if not PERSIST_DIR:
+            raise RuntimeError("PERSIST_DIR is required for local dev setup (embedded Chroma mode)")
+        if not DATA_CSV:
+            raise RuntimeError("DATA_CSV is required for local dev setup (embedded Chroma mode)")
+        _logger.info(f"Using embedded Chroma storage: {PERSIST_DIR}")
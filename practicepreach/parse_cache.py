@@ -0,0 +1,103 @@
+"""
+On-disk cache of parsed plenary protocols.
+
+An entry holds one protocol's TOP records and speech rows, keyed by the
+SHA-256 of the XML file and the parser version:
+
+    data/parse_cache/v<version>/<sha256>.pkl.gz
+
+Each entry is a gzip stream of two pickles: the TOP records, then the speech
+rows as one list per column. Callers that only need TOPs stop after the
+first. Bumping tools.PARSER_VERSION turns every existing entry into a miss,
+and entries of other versions are deleted the next time the cache is opened.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+PARSE_CACHE_DIR = Path("data/parse_cache")
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, version: int, columns: list[str], root: Path = PARSE_CACHE_DIR):
+        self.version = version
+        self.columns = list(columns)
+        self.root = Path(root)
+        self.dir = self.root / f"v{version}"
+        if self.root.exists():
+            for stale in self.root.glob("v*"):
+                if stale != self.dir and stale.is_dir():
+                    logger.info(f"Removing parse cache of parser version {stale.name}")
+                    shutil.rmtree(stale, ignore_errors=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.dir / f"{digest}.pkl.gz"
+
+    def get(self, digest: str, with_speeches: bool = True) -> tuple[list[dict], dict] | None:
+        """(rows, tops) for a file hash, or None on a miss. rows is empty unless with_speeches."""
+        path = self._path(digest)
+        try:
+            with gzip.open(path, "rb") as f:
+                tops = pickle.load(f)
+                if not with_speeches:
+                    return [], tops
+                columns = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning(f"Dropping unreadable parse cache entry {path.name}: {exc}")
+            path.unlink(missing_ok=True)
+            return None
+        rows = [dict(zip(self.columns, values)) for values in zip(*(columns[c] for c in self.columns))]
+        return rows, tops
+
+    def put(self, digest: str, rows: list[dict], tops: dict) -> None:
+        columns = {c: [row[c] for row in rows] for c in self.columns}
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            # Write under a temporary name; parallel workers may cache the same file.
+            fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                    pickle.dump(tops, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(columns, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._path(digest))
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        except OSError as exc:
+            logger.warning(f"Could not write parse cache entry for {digest[:12]}: {exc}")
+
+    def lookup(self, paths: list[str], with_speeches: bool = True) -> tuple[dict, dict]:
+        """
+        Hash every file and load the cached ones. Returns ({path: digest},
+        {path: (rows, tops)} for hits). Unreadable files are left out of both
+        so the parser reports them.
+        """
+        digests, hits = {}, {}
+        for path in paths:
+            try:
+                digests[path] = file_hash(path)
+            except OSError:
+                continue
+            hit = self.get(digests[path], with_speeches)
+            if hit is not None:
+                hits[path] = hit
+        if paths:
+            logger.info(f"Parse cache: {len(hits)} of {len(paths)} protocols unchanged")
+        return digests, hits
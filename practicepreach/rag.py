@@ -1,26 +1,65 @@
+import asyncio
+import hashlib
+import itertools
 import logging
 import os
+import tempfile
 import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import chromadb
 from langchain.chat_models import init_chat_model
 from langchain_chroma import Chroma
-from langchain_community.document_loaders.csv_loader import CSVLoader
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_text_splitters import NLTKTextSplitter
 
-from datetime import datetime
+from datetime import datetime, timezone
+from pathlib import Path
 
 from practicepreach.constants import *
 from practicepreach.params import *
+from practicepreach.embeddings import MatryoshkaEmbeddings, get_embeddings, truncate_and_normalize
+from practicepreach.summaries_cache import SummariesCache, SUMMARIES_DB, LEGACY_SUMMARIES_JSON
+from practicepreach.tops_index import TopsIndex
+from practicepreach.llm_executor import llm_executor
+from practicepreach.rate_limiter import chat_limiter
 
 GCS_LOCAL_CACHE = "/tmp/chroma_store_gemini"
+TOPS_JSON = Path("data/tops.json")
+CHAT_MODEL = "gemini-2.5-flash"
 
 logger = logging.getLogger(__name__)
 
+
+def chunk_id(source_id: str, ordinal: int, text: str) -> str:
+    """Stable chunk ID from the source speech/manifesto ID, the chunk's position in it and its content."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+    return f"{source_id}-{ordinal}-{digest}"
+
+
+def assign_chunk_ids(splits: list) -> list[str]:
+    """Deterministic IDs for split documents, numbering chunks per source ID in order."""
+    ordinals = Counter()
+    ids = []
+    for d in splits:
+        source_id = str(d.metadata.get("id") or d.metadata.get("source", "doc"))
+        ids.append(chunk_id(source_id, ordinals[source_id], d.page_content))
+        ordinals[source_id] += 1
+    return ids
+
 class Rag:
-    def __init__(self):
+    def __init__(self, summaries_path: Path = SUMMARIES_DB, versioned: bool = UPDATE_MODE == "shadow"):
+        """
+        summaries_path is where a summaries cache fetched from GCS is written.
+        Pass another path when SUMMARIES_DB is already open (background
+        startup) and merge it from self.fetched_summaries.
+
+        versioned (embedded mode) turns PERSIST_DIR into a symlink to a version
+        directory before the store is opened, which shadow updates need.
+        """
+        validate_config()
+
         # Debugging
         if GOOGLE_API_KEY:
             masked_api_key = '*' * len(GOOGLE_API_KEY)
@@ -28,15 +67,27 @@ class Rag:
         else:
             logger.info("API Key not found in environment variables.")
 
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="gemini-embedding-001",
-            google_api_key=GOOGLE_API_KEY,
-        )
+        self.embeddings = get_embeddings(EMBEDDING_PROVIDER)
         self.model = init_chat_model(
-            "google_genai:gemini-2.5-flash",
+            f"google_genai:{CHAT_MODEL}",
             thinking_budget=0,
         )
 
+        # Created lazily by _aget_chunks on the serving event loop.
+        self._async_collection = None
+        self._async_collection_lock = asyncio.Lock()
+
+        # Manifest of the snapshot, or delta-sync version, the store was restored from.
+        self.snapshot_manifest = None
+        self.delta_version = None
+        # Where this instance's store and tops.json live; versions loaded by
+        # load_latest() get their own paths next to the originals.
+        self.store_dir = self.store_base()
+        self.tops_path = TOPS_JSON
+        self.fetched_summaries = None
+        # Set on copies made by stage() for shadow updates.
+        self.staged_version = None
+
         # Initialize Chroma - either external, GCS-backed, or embedded
         if USE_EXTERNAL_CHROMA:
             logger.info(f"Connecting to external ChromaDB at {CHROMADB_HOST}:{CHROMADB_PORT}")
@@ -50,43 +101,245 @@ class Rag:
                 embedding_function=self.embeddings,
             )
         elif USE_GCS_CHROMA:
+            self._sync_from_gcs(summaries_path)
+            if summaries_path != SUMMARIES_DB and summaries_path.exists():
+                self.fetched_summaries = summaries_path
+            self._open_local_store()
+        else:
+            if versioned:
+                self._link_persist_dir()
+            # Open the real directory, never the symlink: promote() flips the
+            # symlink, and this instance must keep reading its own version.
+            self.store_dir = str(Path(PERSIST_DIR).resolve())
+            logger.info(f"Using embedded Chroma at {PERSIST_DIR} ({self.store_dir})")
+            self._open_local_store()
+
+        self._index_store()
+
+    def _open_local_store(self):
+        self.vector_store = Chroma(
+            collection_name="political_collection",
+            persist_directory=self.store_dir,
+            embedding_function=self.embeddings,
+        )
+
+    def _index_store(self):
+        num_of_stored = self.vector_store._collection.count()
+        logger.info(f"Vector store has {num_of_stored} vectores.")
+
+        self.tops_index = TopsIndex.build(self.vector_store._collection)
+
+    def _sync_from_gcs(self, summaries_path: Path = SUMMARIES_DB, seed_dir: str = None):
+        """Fetch the store into self.store_dir using GCS_SYNC_MODE, falling back to a file copy."""
+        if GCS_SYNC_MODE == "snapshot":
+            self.snapshot_manifest = self._restore_latest_snapshot(summaries_path)
+        elif GCS_SYNC_MODE == "delta":
+            self.delta_version = self._pull_delta(summaries_path, seed_dir)
+        if self.snapshot_manifest is None and self.delta_version is None:
             logger.info(f"Downloading Chroma store from GCS: {GCS_CHROMA_PATH}")
-            self._download_from_gcs(GCS_CHROMA_PATH, GCS_LOCAL_CACHE)
-            self.vector_store = Chroma(
-                collection_name="political_collection",
-                persist_directory=GCS_LOCAL_CACHE,
-                embedding_function=self.embeddings,
-            )
+            self._download_from_gcs(GCS_CHROMA_PATH, self.store_dir, summaries_path)
+
+    @staticmethod
+    def store_base() -> str:
+        """Directory the store is opened from on startup; other versions live next to it."""
+        return GCS_LOCAL_CACHE if USE_GCS_CHROMA else PERSIST_DIR
+
+    @property
+    def store_version(self) -> str | None:
+        """Version of the loaded store; None unless it came from a snapshot, delta sync or shadow update."""
+        if self.snapshot_manifest is not None:
+            return self.snapshot_manifest["version"]
+        return self.delta_version or self.staged_version
+
+    def _sibling(self, store_dir: str) -> "Rag":
+        """An unopened Rag sharing this one's models, for another store version in store_dir."""
+        new = Rag.__new__(Rag)
+        new.embeddings = self.embeddings
+        new.model = self.model
+        new._async_collection = None
+        new._async_collection_lock = asyncio.Lock()
+        new.snapshot_manifest = None
+        new.delta_version = None
+        new.staged_version = None
+        new.store_dir = store_dir
+        new.tops_path = Path(f"{store_dir}.tops.json")
+        new.fetched_summaries = None
+        return new
+
+    @staticmethod
+    def remote_store_version() -> str | None:
+        """Latest version published to GCS, for the snapshot and delta sync modes."""
+        if not USE_GCS_CHROMA:
+            return None
+        if GCS_SYNC_MODE == "snapshot":
+            from practicepreach.snapshot import latest_snapshot_uri, snapshot_version
+            uri = latest_snapshot_uri(Rag._snapshot_base())
+            return snapshot_version(uri) if uri else None
+        if GCS_SYNC_MODE == "delta":
+            from practicepreach.store_sync import StoreSync
+            return StoreSync(Rag._delta_remote()).latest_version()
+        return None
+
+    def load_latest(self) -> "Rag | None":
+        """
+        Load the latest published store version into a new Rag next to this
+        one, sharing its models, and warm it. Returns None if this instance
+        already serves that version. The caller swaps the instances; this one
+        keeps working until it is dropped.
+        """
+        version = self.remote_store_version()
+        if version is None or version == self.store_version:
+            return None
+        logger.info(f"Loading store version {version} (serving {self.store_version})")
+
+        new = self._sibling(f"{GCS_LOCAL_CACHE}-{version}")
+        new.fetched_summaries = Path(f"{new.store_dir}.summaries.db")
+        new._sync_from_gcs(new.fetched_summaries, seed_dir=self.store_dir)
+        if new.store_version != version:
+            raise RuntimeError(f"Could not load store version {version}")
+        new._open_local_store()
+        # Building the TOP index reads every chunk's metadata, which also
+        # pulls the new store's pages into memory before it takes traffic.
+        new._index_store()
+        logger.info(f"Store version {new.store_version} ready ({new.get_num_of_vectors()} vectors)")
+        return new
+
+    def stage(self) -> "Rag":
+        """
+        Copy this instance's store and tops.json into a new version directory
+        next to it and return a Rag opened on the copy. Updates can then run
+        against the copy while this instance keeps serving the old data.
+        """
+        import shutil
+        if USE_EXTERNAL_CHROMA:
+            raise RuntimeError("Shadow updates need a local store (embedded or GCS-backed)")
+        self._pin_version()
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        new = self._sibling(str(Path(f"{self.store_base()}-{version}").resolve()))
+        new.staged_version = version
+        logger.info(f"Staging store copy {new.store_dir}")
+        shutil.copytree(Path(self.store_dir).resolve(), new.store_dir)
+        if self.tops_path.exists():
+            shutil.copyfile(self.tops_path, new.tops_path)
+        new._open_local_store()
+        new._index_store()
+        return new
+
+    @staticmethod
+    def _link_persist_dir():
+        """
+        Move a plain PERSIST_DIR directory to PERSIST_DIR-initial and put a
+        symlink in its place. Runs before the store is opened, since nothing
+        may have a version open through a path that is about to move.
+        """
+        base = Path(PERSIST_DIR)
+        if base.is_symlink():
+            return
+        initial = Path(f"{base}-initial")
+        if base.exists():
+            base.rename(initial)
         else:
-            logger.info(f"Using embedded Chroma at {PERSIST_DIR}")
-            self.vector_store = Chroma(
-                collection_name="political_collection",
-                persist_directory=PERSIST_DIR,
-                embedding_function=self.embeddings,
+            initial.mkdir(parents=True, exist_ok=True)
+        base.symlink_to(initial.name)
+        logger.info(f"{base} is now a symlink to {initial.name}")
+
+    def _pin_version(self):
+        """
+        Give this instance its own copy of tops.json, so that promoting another
+        version (which replaces tops.json) leaves this one intact for in-flight
+        requests and rollback. Its store is already opened at its own directory.
+        """
+        import shutil
+        if not USE_GCS_CHROMA and not Path(PERSIST_DIR).is_symlink():
+            raise RuntimeError(
+                f"Shadow updates need {PERSIST_DIR} to be a symlink; start with UPDATE_MODE=shadow (Rag(versioned=True))"
             )
+        if self.tops_path == TOPS_JSON and TOPS_JSON.exists():
+            pinned = Path(f"{self.store_dir}.tops.json")
+            shutil.copyfile(TOPS_JSON, pinned)
+            self.tops_path = pinned
 
+    def promote(self, publish: bool = True):
+        """
+        Make this instance's store the one the next cold start opens. In
+        embedded mode PERSIST_DIR is a symlink to the current version, flipped
+        with a single rename; running instances keep their own directories. In
+        GCS mode the version is published (if `publish`). Either way tops.json
+        is replaced atomically.
+        """
+        if not USE_GCS_CHROMA:
+            base = Path(PERSIST_DIR)
+            link = base.parent / f".{base.name}.link"
+            link.unlink(missing_ok=True)
+            link.symlink_to(Path(self.store_dir).name)
+            os.replace(link, base)
+            logger.info(f"{base} now points to {self.store_dir}")
+        elif publish:
+            self.publish_to_gcs()
+        if self.tops_path != TOPS_JSON and self.tops_path.exists():
+            import shutil
+            tmp = TOPS_JSON.with_suffix(".json.tmp")
+            shutil.copyfile(self.tops_path, tmp)
+            os.replace(tmp, TOPS_JSON)
+
+    def republish(self):
+        """Point GCS back at this instance's version, e.g. after a rollback."""
+        if not USE_GCS_CHROMA:
+            return
+        if GCS_SYNC_MODE == "snapshot" and self.snapshot_manifest is not None:
+            from practicepreach.snapshot import publish_latest, snapshot_uri
+            publish_latest(self._snapshot_base(), snapshot_uri(self._snapshot_base(), self.store_version))
+        elif GCS_SYNC_MODE == "delta" and self.delta_version is not None:
+            from practicepreach.store_sync import StoreSync
+            StoreSync(self._delta_remote()).set_latest(self.delta_version)
+        else:
+            self.publish_to_gcs()
 
-        num_of_stored = self.vector_store._collection.count()
-        logger.info(f"Vector store has {num_of_stored} vectores.")
+    def remove_stale_stores(self, keep: list[str] = ()):
+        """Delete store versions and their sidecar files other than this one and `keep`."""
+        import shutil
+        base = Path(self.store_base())
+        keep_dirs = {Path(self.store_dir), *(Path(k) for k in keep)}
+        keep_names = {n for d in keep_dirs for n in (d.name, f"{d.name}.tops.json", f"{d.name}.summaries.db")}
+        for path in [base, *base.parent.glob(f"{base.name}-*")]:
+            if path.name in keep_names or path.is_symlink() or not path.exists():
+                continue
+            logger.info(f"Removing stale store {path}")
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
 
-    def _download_from_gcs(self, gcs_path: str, local_path: str):
+    def _download_from_gcs(self, gcs_path: str, local_path: str, summaries_path: Path = SUMMARIES_DB):
         """Download Chroma store + tops.json from GCS to local cache directory."""
         import subprocess
         import shutil
         if os.path.exists(local_path):
             shutil.rmtree(local_path)
+        os.makedirs(local_path)
         result = subprocess.run(
-            ["gsutil", "-m", "cp", "-r", gcs_path, os.path.dirname(local_path)],
+            ["gsutil", "-m", "rsync", "-r", gcs_path, str(local_path)],
             capture_output=True, text=True
         )
         if result.returncode != 0:
             raise RuntimeError(f"GCS download failed: {result.stderr}")
         logger.info(f"Downloaded Chroma store to {local_path}")
+        self._download_sidecars_from_gcs(gcs_path.rsplit('/', 1)[0], self.tops_path, summaries_path)
+
+    @staticmethod
+    def prefetch_sidecars():
+        """
+        In GCS mode, fetch tops.json and the summaries cache ahead of the store,
+        so cached summaries can be served while Rag is still loading.
+        """
+        if USE_GCS_CHROMA:
+            Rag._download_sidecars_from_gcs(GCS_CHROMA_PATH.rsplit('/', 1)[0])
 
-        # Download tops.json alongside the vector store
-        gcs_base = gcs_path.rsplit('/', 1)[0]
-        from pathlib import Path
-        tops_local = Path("data/tops.json")
+    @staticmethod
+    def _download_sidecars_from_gcs(gcs_base: str, tops_local: Path = TOPS_JSON,
+                                    summaries_path: Path = SUMMARIES_DB):
+        """Download tops.json and the summaries cache stored next to the vector store."""
+        import subprocess
         tops_local.parent.mkdir(parents=True, exist_ok=True)
         r = subprocess.run(
             ["gsutil", "cp", f"{gcs_base}/tops.json", str(tops_local)],
@@ -97,34 +350,119 @@ class Rag:
         else:
             logger.warning("tops.json not in GCS yet — will be created on first update")
 
-        # Download summaries_cache.json
-        cache_local = Path("data/summaries_cache.json")
+        # Download the summaries cache; fall back to the legacy JSON file, which
+        # fast.py imports into the SQLite cache on startup.
         r2 = subprocess.run(
-            ["gsutil", "cp", f"{gcs_base}/summaries_cache.json", str(cache_local)],
+            ["gsutil", "cp", f"{gcs_base}/{SUMMARIES_DB.name}", str(summaries_path)],
             capture_output=True, text=True
         )
         if r2.returncode == 0:
-            logger.info("Downloaded summaries_cache.json from GCS")
+            logger.info(f"Downloaded {SUMMARIES_DB.name} from GCS")
         else:
-            logger.warning("summaries_cache.json not in GCS yet — starting with empty cache")
+            r3 = subprocess.run(
+                ["gsutil", "cp", f"{gcs_base}/{LEGACY_SUMMARIES_JSON.name}", str(LEGACY_SUMMARIES_JSON)],
+                capture_output=True, text=True
+            )
+            if r3.returncode == 0:
+                logger.info(f"Downloaded legacy {LEGACY_SUMMARIES_JSON.name} from GCS")
+            else:
+                logger.warning("Summaries cache not in GCS yet — starting with empty cache")
+
+    @staticmethod
+    def _snapshot_base(gcs_path: str = None) -> str:
+        return f"{(gcs_path or GCS_CHROMA_PATH).rsplit('/', 1)[0]}/snapshots"
+
+    def _restore_latest_snapshot(self, summaries_path: Path = SUMMARIES_DB) -> dict | None:
+        """Stream the latest snapshot into place; None if there is none or it fails to restore."""
+        from practicepreach.snapshot import SnapshotError, latest_snapshot_uri, restore_snapshot
+        snapshot_base = self._snapshot_base()
+        uri = latest_snapshot_uri(snapshot_base)
+        if uri is None:
+            logger.warning(f"No snapshot under {snapshot_base} yet — falling back to a file copy")
+            return None
+        logger.info(f"Restoring snapshot {uri}")
+        try:
+            return restore_snapshot(uri, Path(self.store_dir), self.tops_path, summaries_path)
+        except SnapshotError:
+            logger.exception(f"Restoring {uri} failed — falling back to a file copy")
+            return None
+
+    def upload_snapshot(self, gcs_path: str = None) -> str:
+        """Bundle the local store, tops.json and summaries cache into one snapshot and publish it."""
+        from practicepreach.snapshot import create_snapshot, upload_snapshot
+        if SUMMARIES_DB.exists():
+            SummariesCache(SUMMARIES_DB).checkpoint()
+        extra = {
+            "collection_count": self.get_num_of_vectors(),
+            "embedding_provider": EMBEDDING_PROVIDER,
+            "embedding_dim": EMBEDDING_DIM,
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = Path(tmp) / "snapshot.tar.zst"
+            manifest = create_snapshot(Path(self.store_dir), self.tops_path, SUMMARIES_DB, archive, extra=extra)
+            uri = upload_snapshot(archive, manifest, self._snapshot_base(gcs_path))
+        # Loose copies for prefetch_sidecars(), which runs before the snapshot is restored.
+        self._upload_sidecars_to_gcs((gcs_path or GCS_CHROMA_PATH).rsplit('/', 1)[0], self.tops_path)
+        self.snapshot_manifest = manifest
+        return uri
+
+    @staticmethod
+    def _delta_remote(gcs_path: str = None) -> str:
+        return f"{(gcs_path or GCS_CHROMA_PATH).rsplit('/', 1)[0]}/delta"
+
+    def _pull_delta(self, summaries_path: Path = SUMMARIES_DB, seed_dir: str = None) -> str | None:
+        """Bring the store directory to the latest delta-sync version; None if there is none."""
+        from practicepreach.store_sync import StoreSync, SyncError
+        sync = StoreSync(self._delta_remote())
+        try:
+            stats = sync.pull(Path(self.store_dir), seed_dir=seed_dir and Path(seed_dir))
+        except SyncError:
+            logger.exception("Delta sync failed — falling back to a file copy")
+            return None
+        if stats is None:
+            logger.warning(f"No delta-sync version under {sync.remote} yet — falling back to a file copy")
+            return None
+        self._download_sidecars_from_gcs(GCS_CHROMA_PATH.rsplit('/', 1)[0], self.tops_path, summaries_path)
+        return stats["version"]
+
+    def push_delta(self, gcs_path: str = None) -> dict:
+        """Upload the changed blocks of the local store as a new delta-sync version, plus sidecars."""
+        from practicepreach.store_sync import StoreSync
+        stats = StoreSync(self._delta_remote(gcs_path)).push(Path(self.store_dir))
+        self._upload_sidecars_to_gcs((gcs_path or GCS_CHROMA_PATH).rsplit('/', 1)[0], self.tops_path)
+        self.delta_version = stats["version"]
+        return stats
+
+    def publish_to_gcs(self):
+        """Upload the local store and sidecars using the configured GCS_SYNC_MODE."""
+        if GCS_SYNC_MODE == "snapshot":
+            self.upload_snapshot()
+        elif GCS_SYNC_MODE == "delta":
+            self.push_delta()
+        else:
+            self.upload_to_gcs()
 
     def upload_to_gcs(self, gcs_path: str = None):
         """Upload local Chroma cache + tops.json back to GCS after an update."""
         import subprocess
-        from pathlib import Path
         target = gcs_path or GCS_CHROMA_PATH
 
+        # rsync the directory's contents to the exact target: `cp -r` would
+        # nest it under its own, possibly versioned, basename.
         result = subprocess.run(
-            ["gsutil", "-m", "cp", "-r", GCS_LOCAL_CACHE, os.path.dirname(target)],
+            ["gsutil", "-m", "rsync", "-r", "-d", str(self.store_dir), target],
             capture_output=True, text=True
         )
         if result.returncode != 0:
             raise RuntimeError(f"GCS upload failed: {result.stderr}")
         logger.info(f"Uploaded Chroma store to {target}")
+        self._upload_sidecars_to_gcs(target.rsplit('/', 1)[0], self.tops_path)
 
-        tops_local = Path("data/tops.json")
+    @staticmethod
+    def _upload_sidecars_to_gcs(gcs_base: str, tops_local: Path = TOPS_JSON):
+        """Upload tops.json and the summaries cache next to the vector store."""
+        import subprocess
         if tops_local.exists():
-            gcs_base = target.rsplit('/', 1)[0]
             r = subprocess.run(
                 ["gsutil", "cp", str(tops_local), f"{gcs_base}/tops.json"],
                 capture_output=True, text=True
@@ -134,17 +472,50 @@ class Rag:
             else:
                 logger.warning(f"Failed to upload tops.json: {r.stderr}")
 
-        cache_local = Path("data/summaries_cache.json")
-        if cache_local.exists():
-            gcs_base = target.rsplit('/', 1)[0]
+        if SUMMARIES_DB.exists():
+            SummariesCache(SUMMARIES_DB).checkpoint()
             r2 = subprocess.run(
-                ["gsutil", "cp", str(cache_local), f"{gcs_base}/summaries_cache.json"],
+                ["gsutil", "cp", str(SUMMARIES_DB), f"{gcs_base}/{SUMMARIES_DB.name}"],
                 capture_output=True, text=True
             )
             if r2.returncode == 0:
-                logger.info(f"Uploaded summaries_cache.json to {gcs_base}/summaries_cache.json")
+                logger.info(f"Uploaded {SUMMARIES_DB.name} to {gcs_base}/{SUMMARIES_DB.name}")
             else:
-                logger.warning(f"Failed to upload summaries_cache.json: {r2.stderr}")
+                logger.warning(f"Failed to upload {SUMMARIES_DB.name}: {r2.stderr}")
+
+    def remove_duplicate_chunks(self, dry_run: bool = False) -> int:
+        """
+        Delete chunks that duplicate another chunk's (type, id, party, top_key, text),
+        e.g. left behind by updates that ran twice before IDs were deterministic.
+        Keeps the first copy seen. Returns the number of duplicates found.
+        """
+        collection = self.vector_store._collection
+        seen = set()
+        duplicate_ids = []
+        duplicate_metas = []
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=5000, offset=offset)
+            if not page["ids"]:
+                break
+            for cid, doc, meta in zip(page["ids"], page["documents"], page["metadatas"]):
+                # A digest rather than the text keeps `seen` small on large stores.
+                digest = hashlib.sha256(doc.encode("utf-8")).digest()
+                key = (meta.get("type"), meta.get("id"), meta.get("party"), meta.get("top_key"), digest)
+                if key in seen:
+                    duplicate_ids.append(cid)
+                    duplicate_metas.append(meta)
+                else:
+                    seen.add(key)
+            offset += len(page["ids"])
+
+        logger.info(f"Found {len(duplicate_ids)} duplicate chunks out of {offset}")
+        if duplicate_ids and not dry_run:
+            for i in range(0, len(duplicate_ids), 1000):
+                collection.delete(ids=duplicate_ids[i:i + 1000])
+            self.tops_index.remove(duplicate_metas)
+            logger.info(f"Deleted {len(duplicate_ids)} duplicate chunks")
+        return len(duplicate_ids)
 
     def prune_speeches_before(self, cutoff_date: datetime) -> int:
         """Delete all speech chunks with date < cutoff_date from the vector store.
@@ -154,22 +525,44 @@ class Rag:
         collection = self.vector_store._collection
         result = collection.get(
             where={"$and": [{"type": {"$eq": "speech"}}, {"date": {"$lt": cutoff_int}}]},
-            include=[],
+            include=["metadatas"],
         )
         ids = result.get("ids", [])
         if ids:
             collection.delete(ids=ids)
+            self.tops_index.remove(result["metadatas"])
             logger.info(f"Pruned {len(ids)} speech chunks older than {cutoff_date.date()}")
         else:
             logger.info(f"No speech chunks to prune before {cutoff_date.date()}")
         return len(ids)
 
+    def remove_speeches_since(self, since_date: datetime) -> int:
+        """Delete all speech chunks with date >= since_date from the vector store.
+        Returns the number of chunks deleted.
+        """
+        since_int = int(since_date.strftime("%Y%m%d"))
+        collection = self.vector_store._collection
+        result = collection.get(
+            where={"$and": [{"type": {"$eq": "speech"}}, {"date": {"$gte": since_int}}]},
+            include=["metadatas"],
+        )
+        ids = result.get("ids", [])
+        if ids:
+            collection.delete(ids=ids)
+            self.tops_index.remove(result["metadatas"])
+            logger.info(f"Removed {len(ids)} speech chunks from {since_date.date()} on")
+        return len(ids)
+
     def get_num_of_vectors(self) -> int:
         """Get the number of vectors stored in the vector store."""
         return self.vector_store._collection.count()
 
     def add_to_vector_store(self, data_source):
-        """Add new documents to the vector store from CSV file"""
+        """Add new documents to the vector store from CSV file. Returns (stored, failed) chunk counts."""
+        # Ingestion-only dependencies; the API never loads them.
+        from langchain_community.document_loaders.csv_loader import CSVLoader
+        from langchain_text_splitters import NLTKTextSplitter
+
         logger.info(f'Processing file: {data_source}')
         loader = CSVLoader(file_path=data_source, metadata_columns=['date','id','party','type','top_key'])
         data = loader.load()
@@ -182,8 +575,9 @@ class Rag:
             chunk_size=500,
             chunk_overlap=200
         )
-        num_of_chunks = self.embed_and_store(data, text_splitter)
-        return num_of_chunks
+        stored, failed = self.embed_and_store(data, text_splitter)
+        self.embeddings.log_stats()
+        return stored, failed
 
     def convert_date_eu_to_int(self,date_str: str) -> int:
         """Convert 'DD.MM.YYYY' → 20251127."""
@@ -191,31 +585,161 @@ class Rag:
         return int(dt.strftime("%Y%m%d"))
 
 
-    def embed_and_store(self, doc, text_splitter, batch_size=100):
-        """Split documents into chunks and store them in a vector store."""
+    def _existing_ids(self, ids: list[str]) -> set[str]:
+        """Subset of ids already present in the collection."""
+        collection = self.vector_store._collection
+        existing = set()
+        for i in range(0, len(ids), 1000):
+            existing.update(collection.get(ids=ids[i:i + 1000], include=[])["ids"])
+        return existing
+
+    def _embed_batch(self, batch: list, max_attempts: int = 3) -> list[list[float]]:
+        """Embed one batch of (id, chunk) pairs, retrying transient failures (API quota errors are retried by embed_limiter on cache misses)."""
+        texts = [d.page_content for _, d in batch]
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as exc:
+                if attempt == max_attempts:
+                    raise
+                logger.warning(f"Embedding batch failed (attempt {attempt}/{max_attempts}): {exc}")
+                time.sleep(2 * attempt)
+
+    def embed_and_store(self, doc, text_splitter, batch_size=100, concurrency=EMBED_CONCURRENCY):
+        """
+        Split documents into chunks and store them in a vector store.
+
+        Chunks get deterministic IDs (see chunk_id) and are upserted; chunks
+        whose ID is already in the store are skipped, so re-running an update
+        over the same dates only embeds the difference. Up to `concurrency` batches are embedded at once on a thread pool while
+        this thread writes finished batches to the collection, so store writes
+        never wait on the embedding API and vice versa. A batch that still
+        fails after its retries is logged and skipped. Returns (stored, failed)
+        chunk counts; failed chunks are not in the store, so re-running over
+        the same dates picks them up.
+        """
         all_splits = text_splitter.split_documents(doc)
-        num_of_splits = len(all_splits)
-        logger.info(f"Total chunks to embed: {num_of_splits}")
+        ids = assign_chunk_ids(all_splits)
+        existing = self._existing_ids(ids)
+        todo = [(cid, d) for cid, d in zip(ids, all_splits) if cid not in existing]
+        num_of_splits = len(todo)
+        logger.info(f"Total chunks to embed: {num_of_splits} ({len(existing)} already in store)")
 
-        for i in range(0, num_of_splits, batch_size):
-            batch = all_splits[i:i + batch_size]
-            self.vector_store.add_documents(documents=batch)
-            logger.info(f"Embedded {min(i + batch_size, num_of_splits)}/{num_of_splits} chunks")
-            time.sleep(2)
+        batches = iter(todo[i:i + batch_size] for i in range(0, num_of_splits, batch_size))
+        collection = self.vector_store._collection
+        stored = 0
+        failed = 0
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed") as pool:
+            # Keep a bounded window of batches in flight so memory stays flat.
+            in_flight = {}
+            for batch in itertools.islice(batches, concurrency * 2):
+                in_flight[pool.submit(self._embed_batch, batch)] = batch
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch = in_flight.pop(future)
+                    next_batch = next(batches, None)
+                    if next_batch is not None:
+                        in_flight[pool.submit(self._embed_batch, next_batch)] = next_batch
+                    try:
+                        embeddings = future.result()
+                    except Exception as exc:
+                        failed += len(batch)
+                        logger.error(f"Giving up on a batch of {len(batch)} chunks: {exc}")
+                        continue
+                    collection.upsert(
+                        ids=[cid for cid, _ in batch],
+                        embeddings=embeddings,
+                        documents=[d.page_content for _, d in batch],
+                        metadatas=[d.metadata for _, d in batch],
+                    )
+                    self.tops_index.add([d.metadata for _, d in batch])
+                    stored += len(batch)
+                    elapsed = time.monotonic() - started
+                    logger.info(
+                        f"Embedded {stored + failed}/{num_of_splits} chunks "
+                        f"({stored / elapsed:.1f} chunks/s)"
+                    )
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Stored {stored}/{num_of_splits} chunks in {elapsed:.1f}s "
+            f"({stored / elapsed if elapsed else 0:.1f} chunks/s, {failed} failed)"
+        )
+        return stored, failed
 
-        return num_of_splits
+    def similarity_search(self, query: str, k: int = 10, where: dict = None,
+                          rerank: bool = True) -> list[tuple[Document, float]]:
+        """
+        Top-k chunks for a query as (Document, cosine similarity), best first.
 
-    def _get_context(self, top_key: str, party: str) -> str | None:
-        """Return deduplicated context string for top_key + party, or None if no chunks."""
-        col = self.vector_store._collection
-        results = col.get(
-            where={"$and": [
-                {"type": {"$eq": "speech"}},
-                {"top_key": {"$eq": top_key}},
-                {"party": {"$eq": party}},
-            ]},
-            include=["documents", "metadatas"],
+        With EMBEDDING_DIM set the store only holds truncated vectors; in that
+        case RERANK_OVERSAMPLE * k candidates are fetched and re-scored with
+        their full-precision vectors from the embedding cache. Re-ranking never
+        embeds documents: if any candidate is missing from the cache (it was
+        embedded on another machine), the candidates keep their store scores.
+        """
+        reduced = isinstance(self.embeddings, MatryoshkaEmbeddings)
+        rerank = rerank and reduced
+        n_results = k * RERANK_OVERSAMPLE if rerank else k
+        if reduced:
+            q_full = self.embeddings.full.embed_query(query)
+            q = truncate_and_normalize(q_full, self.embeddings.dim)
+        else:
+            q = self.embeddings.embed_query(query)
+        results = self.vector_store._collection.query(
+            query_embeddings=[q],
+            n_results=n_results,
+            where=where,
+            include=["documents", "metadatas", "distances"],
         )
+        docs = results["documents"][0]
+        metas = results["metadatas"][0]
+        # Chroma's default space is squared L2; for unit vectors that is 2 - 2 * cos.
+        scores = [1.0 - d / 2 for d in results["distances"][0]]
+        if rerank:
+            vectors = self.embeddings.full.cached_vectors(docs)
+            if all(v is not None for v in vectors):
+                scores = [sum(a * b for a, b in zip(q_full, v)) for v in vectors]
+            else:
+                logger.debug(f"Skipping re-rank: {vectors.count(None)}/{len(docs)} candidates not in the embedding cache")
+        ranked = sorted(zip(docs, metas, scores), key=lambda r: r[2], reverse=True)[:k]
+        return [(Document(page_content=doc, metadata=meta), score) for doc, meta, score in ranked]
+
+    @staticmethod
+    def _party_where(top_key: str, party: str) -> dict:
+        return {"$and": [
+            {"type": {"$eq": "speech"}},
+            {"top_key": {"$eq": top_key}},
+            {"party": {"$eq": party}},
+        ]}
+
+    @staticmethod
+    def _top_where(top_key: str) -> dict:
+        return {"$and": [
+            {"type": {"$eq": "speech"}},
+            {"top_key": {"$eq": top_key}},
+        ]}
+
+    async def _aget_chunks(self, where: dict) -> dict:
+        """Async counterpart of collection.get(); native in USE_EXTERNAL_CHROMA mode."""
+        if USE_EXTERNAL_CHROMA:
+            if self._async_collection is None:
+                async with self._async_collection_lock:
+                    if self._async_collection is None:
+                        client = await chromadb.AsyncHttpClient(host=CHROMADB_HOST, port=int(CHROMADB_PORT))
+                        self._async_collection = await client.get_collection("political_collection")
+            return await self._async_collection.get(where=where, include=["documents", "metadatas"])
+        # Embedded Chroma has no async API; keep the blocking read off the event loop.
+        return await asyncio.to_thread(
+            self.vector_store._collection.get, where=where, include=["documents", "metadatas"]
+        )
+
+    @staticmethod
+    def _format_context(results: dict) -> str | None:
+        """Deduplicated context string from a collection.get() result, or None if no chunks."""
         if not results["documents"]:
             return None
         seen_docs = set()
@@ -229,12 +753,17 @@ class Rag:
             for doc, meta in unique_chunks
         )
 
-    def summarize_by_top_key(self, top_key: str, party: str, general_context: str = "") -> str | None:
-        """Fetch all speech chunks for a TOP + party and generate a summary."""
-        context = self._get_context(top_key, party)
-        if context is None:
-            return None
+    def _get_context(self, top_key: str, party: str) -> str | None:
+        """Return deduplicated context string for top_key + party, or None if no chunks."""
+        col = self.vector_store._collection
+        results = col.get(
+            where=self._party_where(top_key, party),
+            include=["documents", "metadatas"],
+        )
+        return self._format_context(results)
 
+    @staticmethod
+    def _party_prompt(context: str, general_context: str = ""):
         general_hint = (
             f"\n\nAllgemeine Einleitung zum Tagesordnungspunkt (bereits bekannt): \"{general_context}\"\n"
             "Wiederhole diese Informationen nicht. Fokussiere ausschließlich auf die Position dieser Partei."
@@ -253,20 +782,10 @@ Formatiere deine Antwort genau so:
 ..."""),
             ("human", "Kontext: {context}"),
         ])
-        prompt = prompt_template.invoke({"context": context})
-        answer = self.model.invoke(prompt)
-        return answer.content
+        return prompt_template.invoke({"context": context})
 
-    def summarize_topic_general(self, top_key: str, subtitle: str = "") -> str | None:
-        """Generate a neutral, party-independent 2–3 sentence summary of a TOP."""
-        col = self.vector_store._collection
-        results = col.get(
-            where={"$and": [
-                {"type": {"$eq": "speech"}},
-                {"top_key": {"$eq": top_key}},
-            ]},
-            include=["documents", "metadatas"],
-        )
+    @staticmethod
+    def _general_prompt(results: dict, subtitle: str = "") -> str | None:
         if not results["documents"]:
             return None
 
@@ -283,7 +802,7 @@ Formatiere deine Antwort genau so:
         context = "\n\n".join(unique_chunks)
         procedural = f"\nProzeduraler Kontext: {subtitle}" if subtitle else ""
 
-        response = self.model.invoke(
+        return (
             "Du bist ein neutraler politischer Analyst. "
             "Analysiere den folgenden Tagesordnungspunkt und antworte AUSSCHLIESSLICH in diesem Format – keine Abweichungen:\n\n"
             "**Eingebracht von:** [Verwende ausschließlich einen oder mehrere dieser Namen (kommagetrennt): 'SPD', 'CDU/CSU', 'AfD', 'Bündnis 90/Die Grünen', 'Die Linke', 'Bundesregierung' – oder 'nicht erkennbar']\n\n"
@@ -295,14 +814,9 @@ Formatiere deine Antwort genau so:
             f"{procedural}\n\n"
             f"Kontext (Auszüge aus Plenardebatten):\n{context}"
         )
-        return response.content.strip()
-
-    def regenerate_kernposition(self, top_key: str, party: str) -> str | None:
-        """Re-generate only the Kernposition line from the same chunks."""
-        context = self._get_context(top_key, party)
-        if context is None:
-            return None
 
+    @staticmethod
+    def _kernposition_prompt(context: str):
         prompt_template = ChatPromptTemplate.from_messages([
             ("system", """Du bist ein politischer Analyst. Fasse in einem Satz zusammen, was die Partei zu diesem Tagesordnungspunkt gesagt hat.
 Antworte AUSSCHLIESSLICH auf Basis des bereitgestellten Kontexts. Verwende kein Vorwissen.
@@ -310,8 +824,69 @@ Antworte NUR mit dieser einen Zeile:
 **Kernposition:** [ein Satz]"""),
             ("human", "Kontext: {context}"),
         ])
-        prompt = prompt_template.invoke({"context": context})
-        answer = self.model.invoke(prompt)
+        return prompt_template.invoke({"context": context})
+
+    def summarize_by_top_key(self, top_key: str, party: str, general_context: str = "") -> str | None:
+        """Fetch all speech chunks for a TOP + party and generate a summary."""
+        context = self._get_context(top_key, party)
+        if context is None:
+            return None
+        prompt = self._party_prompt(context, general_context)
+        with llm_executor.slot(CHAT_MODEL):
+            answer = chat_limiter.call(self.model.invoke, prompt)
+        return answer.content
+
+    async def asummarize_by_top_key(self, top_key: str, party: str, general_context: str = "") -> str | None:
+        """Async counterpart of summarize_by_top_key."""
+        context = self._format_context(await self._aget_chunks(self._party_where(top_key, party)))
+        if context is None:
+            return None
+        prompt = self._party_prompt(context, general_context)
+        async with llm_executor.aslot(CHAT_MODEL):
+            answer = await chat_limiter.acall(self.model.ainvoke, prompt)
+        return answer.content
+
+    def summarize_topic_general(self, top_key: str, subtitle: str = "") -> str | None:
+        """Generate a neutral, party-independent 2–3 sentence summary of a TOP."""
+        col = self.vector_store._collection
+        results = col.get(
+            where=self._top_where(top_key),
+            include=["documents", "metadatas"],
+        )
+        prompt = self._general_prompt(results, subtitle)
+        if prompt is None:
+            return None
+        with llm_executor.slot(CHAT_MODEL):
+            response = chat_limiter.call(self.model.invoke, prompt)
+        return response.content.strip()
+
+    async def asummarize_topic_general(self, top_key: str, subtitle: str = "") -> str | None:
+        """Async counterpart of summarize_topic_general."""
+        prompt = self._general_prompt(await self._aget_chunks(self._top_where(top_key)), subtitle)
+        if prompt is None:
+            return None
+        async with llm_executor.aslot(CHAT_MODEL):
+            response = await chat_limiter.acall(self.model.ainvoke, prompt)
+        return response.content.strip()
+
+    def regenerate_kernposition(self, top_key: str, party: str) -> str | None:
+        """Re-generate only the Kernposition line from the same chunks."""
+        context = self._get_context(top_key, party)
+        if context is None:
+            return None
+        prompt = self._kernposition_prompt(context)
+        with llm_executor.slot(CHAT_MODEL):
+            answer = chat_limiter.call(self.model.invoke, prompt)
+        return answer.content.strip()
+
+    async def aregenerate_kernposition(self, top_key: str, party: str) -> str | None:
+        """Async counterpart of regenerate_kernposition."""
+        context = self._format_context(await self._aget_chunks(self._party_where(top_key, party)))
+        if context is None:
+            return None
+        prompt = self._kernposition_prompt(context)
+        async with llm_executor.aslot(CHAT_MODEL):
+            answer = await chat_limiter.acall(self.model.ainvoke, prompt)
         return answer.content.strip()
 
     def shutdown(self):
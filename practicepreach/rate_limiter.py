@@ -0,0 +1,172 @@
+"""
+Adaptive, quota-aware rate limiting for Gemini calls.
+
+A token bucket whose refill rate follows AIMD: every successful call raises
+the rate a little (additive increase) up to a ceiling, every 429/quota error
+halves it (multiplicative decrease) and the call is retried after a jittered
+exponential backoff. One limiter per API (chat, embeddings) is shared by Rag,
+the update pipeline and the bin scripts, so all of them settle just below the
+actual quota instead of sleeping a fixed worst-case pace.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from practicepreach.params import (
+    GEMINI_CHAT_RPS, GEMINI_CHAT_MAX_RPS, GEMINI_EMBED_RPS, GEMINI_EMBED_MAX_RPS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _quota_exception_types() -> tuple:
+    try:
+        from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+    except ImportError:
+        return ()
+    return ResourceExhausted, TooManyRequests
+
+
+def _status_code(exc: BaseException) -> int | None:
+    """HTTP status carried by an exception (google-api-core, google-genai, httpx/requests), if any."""
+    for value in (getattr(exc, "status_code", None), getattr(exc, "code", None),
+                  getattr(getattr(exc, "response", None), "status_code", None)):
+        if isinstance(value, int):
+            return int(value)
+    if getattr(exc, "status", None) == "RESOURCE_EXHAUSTED":
+        return 429
+    return None
+
+
+def is_quota_error(exc: Exception) -> bool:
+    """
+    True for 429 / RESOURCE_EXHAUSTED errors raised by the Gemini clients, also
+    when wrapped: langchain re-raises them from its own error types. Decided by
+    exception type and status code; the message is only matched when no
+    exception in the chain carries a status.
+    """
+    quota_types = _quota_exception_types()
+    chain, current = [], exc
+    while current is not None and current not in chain:
+        chain.append(current)
+        current = current.__cause__ or current.__context__
+
+    statuses = [_status_code(e) for e in chain]
+    if any(isinstance(e, quota_types) for e in chain) or 429 in statuses:
+        return True
+    if any(status is not None for status in statuses):
+        return False
+    # Fallback for clients that only describe the error in the message.
+    msg = " ".join(str(e) for e in chain).lower()
+    return "429" in msg or "quota" in msg or "rate limit" in msg or "resource_exhausted" in msg
+
+
+class RateLimitExhausted(RuntimeError):
+    """Raised when a call is still throttled after all retries."""
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, name: str, rate: float, max_rate: float, min_rate: float = 0.05,
+                 increase: float = None, decrease: float = 0.5, retries: int = 6,
+                 backoff_base: float = 2.0, backoff_max: float = 120.0):
+        self.name = name
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        # Reach the ceiling from the starting rate in roughly 100 successful calls.
+        self.increase = increase if increase is not None else max((max_rate - rate) / 100, 0.01)
+        self.decrease = decrease
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._calls = 0
+        self._throttled = 0
+
+    def _reserve(self) -> float:
+        """Take a token (possibly on credit) and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._calls += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Drop any burst credit so callers queued behind us slow down as well.
+            self._tokens = min(self._tokens, 0.0)
+        logger.warning(f"[{self.name}] quota hit, rate lowered to {self.rate:.2f}/s")
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def call(self, fn, *args, **kwargs):
+        """Call fn under the limiter, retrying quota errors with jittered backoff."""
+        for attempt in range(self.retries):
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                if not is_quota_error(exc):
+                    raise
+                self.on_throttle()
+                wait = self._backoff(attempt)
+                logger.warning(f"[{self.name}] retry {attempt + 1}/{self.retries} in {wait:.1f}s")
+                time.sleep(wait)
+                continue
+            self.on_success()
+            return result
+        raise RateLimitExhausted(f"[{self.name}] still throttled after {self.retries} retries")
+
+    async def acall(self, coro_fn, *args, **kwargs):
+        """Async counterpart of call()."""
+        for attempt in range(self.retries):
+            await self.aacquire()
+            try:
+                result = await coro_fn(*args, **kwargs)
+            except Exception as exc:
+                if not is_quota_error(exc):
+                    raise
+                self.on_throttle()
+                wait = self._backoff(attempt)
+                logger.warning(f"[{self.name}] retry {attempt + 1}/{self.retries} in {wait:.1f}s")
+                await asyncio.sleep(wait)
+                continue
+            self.on_success()
+            return result
+        raise RateLimitExhausted(f"[{self.name}] still throttled after {self.retries} retries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate_per_s": round(self.rate, 3),
+                "max_rate_per_s": self.max_rate,
+                "calls": self._calls,
+                "throttled": self._throttled,
+            }
+
+
+chat_limiter = AdaptiveRateLimiter("gemini-chat", GEMINI_CHAT_RPS, GEMINI_CHAT_MAX_RPS)
+embed_limiter = AdaptiveRateLimiter("gemini-embed", GEMINI_EMBED_RPS, GEMINI_EMBED_MAX_RPS)
@@ -0,0 +1,232 @@
+"""
+Single-file, zstd-compressed snapshots of the serving data.
+
+A snapshot is a tar stream compressed with zstd. It holds the Chroma store
+directory, tops.json and the summaries cache, and it starts with a
+manifest.json that lists every file's size and SHA-256. Snapshots are
+uploaded under <GCS base>/snapshots/ with a UTC timestamp as version. The
+LATEST object names the current one, so a snapshot only becomes visible once
+it has been uploaded completely.
+
+Restoring streams `gsutil cat` through the decompressor and tar reader in one
+pass. Nothing is written to disk except the extracted files, and each file is
+checked against the manifest as it is extracted.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import zstandard
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+LATEST_NAME = "LATEST"
+STORE_PREFIX = "store"
+TOPS_NAME = "tops.json"
+SUMMARIES_NAME = "summaries_cache.db"
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotError(RuntimeError):
+    """Raised when a snapshot cannot be found, read or verified."""
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _snapshot_files(store_dir: Path, tops_path: Path, summaries_path: Path) -> dict[str, Path]:
+    """Archive name -> local path for everything that goes into a snapshot."""
+    files = {
+        f"{STORE_PREFIX}/{p.relative_to(store_dir).as_posix()}": p
+        for p in sorted(store_dir.rglob("*")) if p.is_file()
+    }
+    if not files:
+        raise SnapshotError(f"Chroma store {store_dir} is empty")
+    for name, path in ((TOPS_NAME, tops_path), (SUMMARIES_NAME, summaries_path)):
+        if path.exists():
+            files[name] = path
+    return files
+
+
+def create_snapshot(store_dir: Path, tops_path: Path, summaries_path: Path, out_path: Path,
+                    extra: dict = None, level: int = 10) -> dict:
+    """Write a snapshot archive to out_path and return its manifest."""
+    files = _snapshot_files(Path(store_dir), Path(tops_path), Path(summaries_path))
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        **(extra or {}),
+        "files": {
+            name: {"size": path.stat().st_size, "sha256": _sha256(path)}
+            for name, path in files.items()
+        },
+    }
+    manifest_bytes = json.dumps(manifest, indent=2).encode("utf-8")
+
+    cctx = zstandard.ZstdCompressor(level=level, threads=-1)
+    with open(out_path, "wb") as raw, cctx.stream_writer(raw) as zout:
+        with tarfile.open(fileobj=zout, mode="w|") as tar:
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(manifest_bytes)
+            tar.addfile(info, io.BytesIO(manifest_bytes))
+            for name, path in files.items():
+                tar.add(path, arcname=name, recursive=False)
+
+    raw_size = sum(f["size"] for f in manifest["files"].values())
+    logger.info(
+        f"Created snapshot {manifest['version']}: {len(files)} files, "
+        f"{raw_size / 1e6:.1f} MB -> {Path(out_path).stat().st_size / 1e6:.1f} MB"
+    )
+    return manifest
+
+
+def extract_snapshot(stream, dest_dir: Path) -> dict:
+    """
+    Extract a snapshot from a readable binary stream into dest_dir, verifying
+    sizes and checksums against the manifest. Returns the manifest. An empty,
+    truncated or corrupt stream raises SnapshotError.
+    """
+    try:
+        return _extract_snapshot(stream, Path(dest_dir))
+    except (tarfile.TarError, zstandard.ZstdError, EOFError, json.JSONDecodeError) as exc:
+        raise SnapshotError(f"Unreadable snapshot: {type(exc).__name__}: {exc}") from exc
+
+
+def _extract_snapshot(stream, dest_dir: Path) -> dict:
+    reader = zstandard.ZstdDecompressor().stream_reader(stream)
+    manifest = None
+    seen = set()
+    with tarfile.open(fileobj=reader, mode="r|") as tar:
+        for member in tar:
+            if manifest is None:
+                if member.name != MANIFEST_NAME:
+                    raise SnapshotError(f"Snapshot does not start with {MANIFEST_NAME}")
+                manifest = json.loads(tar.extractfile(member).read())
+                if manifest.get("format") != SNAPSHOT_FORMAT:
+                    raise SnapshotError(f"Unsupported snapshot format {manifest.get('format')!r}")
+                continue
+
+            expected = manifest["files"].get(member.name)
+            target = (dest_dir / member.name).resolve()
+            if expected is None or not member.isfile() or not target.is_relative_to(dest_dir.resolve()):
+                raise SnapshotError(f"Unexpected snapshot member {member.name!r}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            h = hashlib.sha256()
+            source = tar.extractfile(member)
+            with open(target, "wb") as out:
+                for block in iter(lambda: source.read(1 << 20), b""):
+                    h.update(block)
+                    out.write(block)
+            if member.size != expected["size"] or h.hexdigest() != expected["sha256"]:
+                raise SnapshotError(f"Checksum mismatch for {member.name}")
+            seen.add(member.name)
+
+    if manifest is None:
+        raise SnapshotError("Empty snapshot")
+    missing = set(manifest["files"]) - seen
+    if missing:
+        raise SnapshotError(f"Snapshot is missing {len(missing)} files, e.g. {sorted(missing)[0]}")
+    return manifest
+
+
+def _gsutil(*args, input: bytes = None) -> subprocess.CompletedProcess:
+    return subprocess.run(["gsutil", *args], capture_output=True, input=input)
+
+
+def snapshot_uri(snapshot_base: str, version: str) -> str:
+    return f"{snapshot_base}/store-{version}.tar.zst"
+
+
+def publish_latest(snapshot_base: str, uri: str) -> None:
+    """Point LATEST at an uploaded snapshot."""
+    r = _gsutil("cp", "-", f"{snapshot_base}/{LATEST_NAME}", input=uri.encode("utf-8"))
+    if r.returncode != 0:
+        raise SnapshotError(f"Updating {LATEST_NAME} failed: {r.stderr.decode(errors='replace')}")
+
+
+def upload_snapshot(archive: Path, manifest: dict, snapshot_base: str) -> str:
+    """Upload an archive and point LATEST at it. Returns the snapshot URI."""
+    uri = snapshot_uri(snapshot_base, manifest["version"])
+    r = _gsutil("cp", str(archive), uri)
+    if r.returncode != 0:
+        raise SnapshotError(f"Snapshot upload failed: {r.stderr.decode(errors='replace')}")
+    publish_latest(snapshot_base, uri)
+    logger.info(f"Uploaded snapshot {uri}")
+    return uri
+
+
+def latest_snapshot_uri(snapshot_base: str) -> str | None:
+    """URI of the current snapshot, or None if none has been published yet."""
+    r = _gsutil("cat", f"{snapshot_base}/{LATEST_NAME}")
+    if r.returncode != 0:
+        return None
+    return r.stdout.decode("utf-8").strip() or None
+
+
+def snapshot_version(uri: str) -> str:
+    """Version encoded in a snapshot URI (store-<version>.tar.zst)."""
+    return uri.rsplit("/", 1)[-1].removeprefix("store-").removesuffix(".tar.zst")
+
+
+def restore_snapshot(uri: str, store_dir: Path, tops_path: Path, summaries_path: Path) -> dict:
+    """
+    Stream a snapshot from GCS and install its files. The store is extracted
+    into a scratch directory next to store_dir and only moved into place once
+    every checksum has matched. Returns the manifest.
+    """
+    store_dir = Path(store_dir)
+    store_dir.parent.mkdir(parents=True, exist_ok=True)
+    scratch = Path(tempfile.mkdtemp(prefix=".snapshot-", dir=store_dir.parent))
+    try:
+        proc = subprocess.Popen(["gsutil", "cat", uri], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            manifest = extract_snapshot(proc.stdout, scratch)
+        except Exception as exc:
+            # A failed download cuts the stream short; report that rather than
+            # the extraction error it causes. gsutil still running means the
+            # data itself was bad.
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise exc
+            _, stderr = proc.communicate()
+            if proc.returncode != 0:
+                raise SnapshotError(f"Snapshot download failed: {stderr.decode(errors='replace')}") from exc
+            raise
+        except BaseException:
+            proc.kill()
+            proc.communicate()
+            raise
+        _, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise SnapshotError(f"Snapshot download failed: {stderr.decode(errors='replace')}")
+
+        if store_dir.exists():
+            shutil.rmtree(store_dir)
+        os.replace(scratch / STORE_PREFIX, store_dir)
+        for name, path in ((TOPS_NAME, Path(tops_path)), (SUMMARIES_NAME, Path(summaries_path))):
+            if (scratch / name).exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(scratch / name, path)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    logger.info(f"Restored snapshot {manifest['version']} from {uri}")
+    return manifest
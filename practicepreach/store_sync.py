@@ -0,0 +1,279 @@
+"""
+Content-addressed delta sync of the Chroma store directory.
+
+Every file is cut into fixed-size blocks, and each block is stored once
+under its SHA-256:
+
+    <remote>/blobs/ab/abcdef...       block contents
+    <remote>/manifests/<version>.json {path: {size, blocks: [sha256, ...]}}
+    <remote>/LATEST                   current version
+
+Chroma's SQLite file and HNSW segments change in place and mostly at the
+end, so after a weekly update most blocks keep their hash. push uploads only
+blocks the remote does not have. pull reuses every block already present in
+the local directory, from any file and at any offset, and downloads the
+rest. An instance that holds the previous version therefore fetches roughly
+the delta.
+
+The remote is any fsspec URL: gs://bucket/path in production, or a plain
+local directory for tests.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import fsspec
+
+SYNC_FORMAT = 1
+BLOCK_SIZE = 4 * 1024 * 1024
+LOCAL_MANIFEST = ".sync-manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+class SyncError(RuntimeError):
+    """Raised when the remote is missing data or a block fails verification."""
+
+
+def _blocks(path: Path, block_size: int):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            yield block
+
+
+def scan_dir(local_dir: Path, block_size: int = BLOCK_SIZE) -> dict:
+    """{relative path: {size, blocks}} for every file under local_dir."""
+    local_dir = Path(local_dir)
+    files = {}
+    if not local_dir.exists():
+        return files
+    for path in sorted(local_dir.rglob("*")):
+        if not path.is_file() or path.name == LOCAL_MANIFEST:
+            continue
+        files[path.relative_to(local_dir).as_posix()] = {
+            "size": path.stat().st_size,
+            "blocks": [hashlib.sha256(b).hexdigest() for b in _blocks(path, block_size)],
+        }
+    return files
+
+
+class StoreSync:
+    def __init__(self, remote: str, block_size: int = BLOCK_SIZE, workers: int = 8):
+        self.remote = remote
+        self.fs, self.root = fsspec.core.url_to_fs(remote)
+        self.block_size = block_size
+        self.workers = workers
+
+    def _path(self, *parts: str) -> str:
+        return "/".join([self.root.rstrip("/"), *parts])
+
+    def _blob_path(self, digest: str) -> str:
+        return self._path("blobs", digest[:2], digest)
+
+    def latest_version(self) -> str | None:
+        try:
+            return self.fs.cat_file(self._path("LATEST")).decode("utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_latest(self, version: str) -> None:
+        """Publish an uploaded version, or roll back to an older one."""
+        self.read_manifest(version)
+        self.fs.pipe_file(self._path("LATEST"), version.encode())
+
+    def read_manifest(self, version: str) -> dict:
+        try:
+            return json.loads(self.fs.cat_file(self._path("manifests", f"{version}.json")))
+        except FileNotFoundError:
+            raise SyncError(f"No manifest for version {version} in {self.remote}") from None
+
+    @staticmethod
+    def local_version(local_dir: Path) -> str | None:
+        """Version the local directory was last pushed or pulled as."""
+        path = Path(local_dir) / LOCAL_MANIFEST
+        return json.loads(path.read_text())["version"] if path.exists() else None
+
+    def push(self, local_dir: Path, version: str = None) -> dict:
+        """Upload the blocks the remote is missing, then publish a new version."""
+        local_dir = Path(local_dir)
+        files = scan_dir(local_dir, self.block_size)
+        if not files:
+            raise SyncError(f"{local_dir} is empty")
+
+        latest = self.latest_version()
+        known = set()
+        if latest:
+            previous = self.read_manifest(latest)
+            if previous.get("block_size") == self.block_size:
+                known = {h for info in previous["files"].values() for h in info["blocks"]}
+
+        todo = {}
+        for rel, info in files.items():
+            for i, digest in enumerate(info["blocks"]):
+                if digest not in known and digest not in todo:
+                    todo[digest] = (local_dir / rel, i * self.block_size)
+
+        def upload(item) -> int:
+            digest, (path, offset) = item
+            blob = self._blob_path(digest)
+            # Blocks dropped from the latest manifest may still exist from older versions.
+            if self.fs.exists(blob):
+                return 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(self.block_size)
+            self.fs.makedirs(blob.rsplit("/", 1)[0], exist_ok=True)
+            self.fs.pipe_file(blob, data)
+            return len(data)
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            uploaded = list(pool.map(upload, todo.items()))
+
+        manifest = {
+            "format": SYNC_FORMAT,
+            "version": version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+            "block_size": self.block_size,
+            "files": files,
+        }
+        self.fs.makedirs(self._path("manifests"), exist_ok=True)
+        self.fs.pipe_file(self._path("manifests", f"{manifest['version']}.json"), json.dumps(manifest).encode())
+        # Publish last, so readers never see a version whose blocks are not all uploaded.
+        self.set_latest(manifest["version"])
+        (local_dir / LOCAL_MANIFEST).write_text(json.dumps({"version": manifest["version"]}))
+
+        total = sum(info["size"] for info in files.values())
+        stats = {
+            "version": manifest["version"],
+            "files": len(files),
+            "uploaded_blocks": sum(1 for n in uploaded if n),
+            "uploaded_bytes": sum(uploaded),
+            "total_bytes": total,
+        }
+        logger.info(
+            f"Pushed {local_dir} as {stats['version']}: {stats['uploaded_bytes'] / 1e6:.1f} of "
+            f"{total / 1e6:.1f} MB uploaded ({stats['uploaded_blocks']} new blocks)"
+        )
+        return stats
+
+    def pull(self, local_dir: Path, version: str = None, seed_dir: Path = None) -> dict | None:
+        """
+        Bring local_dir to `version` (default: LATEST), downloading only
+        blocks not already present locally. Blocks are also taken from
+        seed_dir, e.g. the previous version when pulling into a fresh
+        directory. Changed files are assembled in a staging directory and
+        then moved into place. Returns None if the remote has no versions yet.
+        """
+        version = version or self.latest_version()
+        if version is None:
+            return None
+        manifest = self.read_manifest(version)
+        if manifest.get("format") != SYNC_FORMAT:
+            raise SyncError(f"Unsupported sync format {manifest.get('format')!r}")
+        block_size = manifest["block_size"]
+
+        local_dir = Path(local_dir)
+        local_files = scan_dir(local_dir, block_size)
+        available = {}
+        sources = [(local_dir, local_files)]
+        if seed_dir is not None and Path(seed_dir) != local_dir:
+            sources.append((Path(seed_dir), scan_dir(seed_dir, block_size)))
+        for source_dir, files in sources:
+            for rel, info in files.items():
+                for i, digest in enumerate(info["blocks"]):
+                    available.setdefault(digest, (source_dir / rel, i * block_size))
+
+        changed = [rel for rel, info in manifest["files"].items() if local_files.get(rel) != info]
+        needed = {
+            digest for rel in changed for digest in manifest["files"][rel]["blocks"]
+            if digest not in available
+        }
+
+        staging = local_dir.parent / f".{local_dir.name}.sync-tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        blob_dir = staging / ".blobs"
+        blob_dir.mkdir(parents=True)
+
+        def download(digest: str) -> int:
+            try:
+                data = self.fs.cat_file(self._blob_path(digest))
+            except FileNotFoundError:
+                raise SyncError(f"Block {digest} missing from {self.remote}") from None
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise SyncError(f"Block {digest} failed verification")
+            (blob_dir / digest).write_bytes(data)
+            return len(data)
+
+        try:
+            with ThreadPoolExecutor(self.workers) as pool:
+                downloaded = sum(pool.map(download, needed))
+
+            reused = 0
+            for rel in changed:
+                target = staging / rel
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with open(target, "wb") as out:
+                    for digest in manifest["files"][rel]["blocks"]:
+                        if digest in available:
+                            path, offset = available[digest]
+                            with open(path, "rb") as f:
+                                f.seek(offset)
+                                block = f.read(block_size)
+                            reused += len(block)
+                        else:
+                            block = (blob_dir / digest).read_bytes()
+                        out.write(block)
+                if target.stat().st_size != manifest["files"][rel]["size"]:
+                    raise SyncError(f"Size mismatch assembling {rel}")
+
+            # All reads from the old files are done; swap the changed files in.
+            for rel in changed:
+                (local_dir / rel).parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staging / rel, local_dir / rel)
+            for rel in set(local_files) - set(manifest["files"]):
+                (local_dir / rel).unlink()
+            (local_dir / LOCAL_MANIFEST).write_text(json.dumps({"version": version}))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        stats = {
+            "version": version,
+            "files": len(manifest["files"]),
+            "changed_files": len(changed),
+            "downloaded_blocks": len(needed),
+            "downloaded_bytes": downloaded,
+            "reused_bytes": reused,
+        }
+        logger.info(
+            f"Pulled {version} into {local_dir}: {len(changed)} files changed, "
+            f"{downloaded / 1e6:.1f} MB downloaded, {reused / 1e6:.1f} MB reused locally"
+        )
+        return stats
+
+    def gc(self, keep: int = 3) -> int:
+        """Delete all but the newest `keep` versions and blocks no kept version references."""
+        manifests = sorted(self.fs.glob(self._path("manifests", "*.json")))
+        latest = self.latest_version()
+        kept = manifests[-keep:] if keep else []
+        kept_versions = {p.rsplit("/", 1)[-1].removesuffix(".json") for p in kept}
+        if latest and latest not in kept_versions:
+            kept.append(self._path("manifests", f"{latest}.json"))
+        referenced = set()
+        for path in kept:
+            files = json.loads(self.fs.cat_file(path))["files"]
+            referenced.update(h for info in files.values() for h in info["blocks"])
+
+        dropped = [path for path in manifests if path not in kept]
+        for path in dropped:
+            self.fs.rm_file(path)
+        removed = 0
+        for blob in self.fs.glob(self._path("blobs", "*", "*")):
+            if blob.rsplit("/", 1)[-1] not in referenced:
+                self.fs.rm_file(blob)
+                removed += 1
+        logger.info(f"Removed {len(dropped)} old versions and {removed} unreferenced blocks")
+        return removed
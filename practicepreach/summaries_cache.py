@@ -0,0 +1,147 @@
+"""
+SQLite-backed store for generated TOP summaries, keyed by (top_key, party).
+
+Replaces the whole-file rewrite of data/summaries_cache.json: every read and
+write touches a single row, and WAL mode lets readers continue while a new
+summary is being written. Entries are stored exactly as they were produced
+(including legacy shapes), so callers keep normalizing them on read.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+SUMMARIES_DB = Path("data/summaries_cache.db")
+LEGACY_SUMMARIES_JSON = Path("data/summaries_cache.json")
+
+logger = logging.getLogger(__name__)
+
+
+class SummariesCache:
+    def __init__(self, path: Path = SUMMARIES_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # sqlite3 connections must not be shared across threads; FastAPI runs
+        # sync handlers and executor jobs on many threads, so keep one per thread.
+        self._local = threading.local()
+        # In-process change counters used for HTTP ETags: bumped on every write
+        # to a TOP, and globally on bulk imports.
+        self._versions_lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._generation = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " top_key TEXT NOT NULL,"
+                " party TEXT NOT NULL,"
+                " entry TEXT NOT NULL,"
+                " PRIMARY KEY (top_key, party))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, top_key: str) -> dict:
+        """Return all cached entries for a TOP as {party: entry}."""
+        rows = self._conn().execute(
+            "SELECT party, entry FROM summaries WHERE top_key = ?", (top_key,)
+        ).fetchall()
+        return {party: json.loads(entry) for party, entry in rows}
+
+    def get_many(self, top_keys: list[str]) -> dict:
+        """Return cached entries for many TOPs in one pass as {top_key: {party: entry}}."""
+        result = {top_key: {} for top_key in top_keys}
+        keys = list(result)
+        conn = self._conn()
+        # Stay well below SQLite's bound-parameter limit.
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT top_key, party, entry FROM summaries"
+                f" WHERE top_key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for top_key, party, entry in rows:
+                result[top_key][party] = json.loads(entry)
+        return result
+
+    def get_entry(self, top_key: str, party: str):
+        """Return the cached entry for (top_key, party), or None."""
+        row = self._conn().execute(
+            "SELECT entry FROM summaries WHERE top_key = ? AND party = ?", (top_key, party)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, top_key: str, party: str, entry) -> None:
+        """Insert or replace the entry for (top_key, party)."""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (top_key, party, entry) VALUES (?, ?, ?)",
+                (top_key, party, json.dumps(entry, ensure_ascii=False)),
+            )
+        with self._versions_lock:
+            self._versions[top_key] = self._versions.get(top_key, 0) + 1
+
+    def version(self, top_key: str) -> tuple[int, int]:
+        """Change counter for a TOP's entries within this process."""
+        return self._generation, self._versions.get(top_key, 0)
+
+    def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM summaries LIMIT 1").fetchone() is None
+
+    def import_json(self, json_path: Path = LEGACY_SUMMARIES_JSON, overwrite: bool = False) -> int:
+        """One-shot import of a legacy summaries_cache.json. Returns the number of rows written.
+
+        Existing rows are kept unless overwrite=True, so the import is safe to re-run.
+        """
+        data = json.loads(Path(json_path).read_text())
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        rows = [
+            (top_key, party, json.dumps(entry, ensure_ascii=False))
+            for top_key, parties in data.items()
+            for party, entry in parties.items()
+        ]
+        with self._conn() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"{verb} INTO summaries (top_key, party, entry) VALUES (?, ?, ?)", rows
+            )
+            written = conn.total_changes - before
+        with self._versions_lock:
+            self._generation += 1
+        logger.info(f"Imported {written}/{len(rows)} summary entries from {json_path}")
+        return written
+
+    def import_db(self, db_path: Path, overwrite: bool = False) -> int:
+        """Merge the entries of another summaries database, e.g. one fetched with a new store version.
+
+        Existing rows are kept unless overwrite=True. Returns the number of rows written.
+        """
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        conn = self._conn()
+        conn.execute("ATTACH DATABASE ? AS incoming", (str(db_path),))
+        try:
+            with conn:
+                before = conn.total_changes
+                conn.execute(
+                    f"{verb} INTO summaries (top_key, party, entry)"
+                    f" SELECT top_key, party, entry FROM incoming.summaries"
+                )
+                written = conn.total_changes - before
+        finally:
+            conn.execute("DETACH DATABASE incoming")
+        with self._versions_lock:
+            self._generation += 1
+        logger.info(f"Imported {written} summary entries from {db_path}")
+        return written
+
+    def checkpoint(self) -> None:
+        """Fold the WAL into the main database file, e.g. before uploading it."""
+        self._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
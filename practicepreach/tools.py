@@ -1,76 +1,362 @@
+import io
+import multiprocessing
 import re
 import requests, os, time, csv, sys
-import BundestagsAPy
 import pandas as pd
-import xmltodict
 import xml.etree.ElementTree as ET
 import time
-from practicepreach.rag import Rag
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterable, Iterator
 
 from practicepreach.params import *
 from practicepreach.constants import *
+from practicepreach.parse_cache import PARSE_CACHE_DIR, ParseCache
 
 SPEECHES_XML_DIR = os.environ.get("SPEECHES_XML_DIR")
 
 BASE = "https://search.dip.bundestag.de/api/v1"
 
-def process_bundestag_xml(url: str, df: pd.DataFrame):
+SPEECH_COLUMNS = ['type', 'date', 'id', 'party', 'top_key', 'text']
+# Bump whenever the rows or TOP records iter_protocol produces change; invalidates the parse cache.
+PARSER_VERSION = 1
+
+_DIGIT_RE = re.compile(r'\d')
+_TOP_ANNOUNCE_RE = re.compile(r'(Tagesordnungspunkt|Zusatzpunkt)[\s\xa0]+(\d+)')
+# Pattern A subtopic: T_NaS starts with "a)" / "18 a)"
+_SUBTOPIC_NAS_RE = re.compile(r'^\s*(?:\d+\s+)?([a-z])\)')
+# Pattern B subtopic: J element announces "Tagesordnungspunkt 19a:"
+_SUBTOPIC_J_RE = re.compile(r'Tagesordnungspunkt[\s\xa0]*\d+([a-z]):')
+_DRUCKSACHE_RE = re.compile(r'(\d+/\d+)')
+_TITLE_PREFIX_RE = re.compile(r'^[\s\t–\-]*(?:ZP\s*\d+\s*)?')
+# Procedural-only subtitles that carry no content value
+_PROCEDURAL_RE = re.compile(
+    r'^(Vereinbarte Debatte:?|Aktuelle Stunde|Fragestunde|Befragung der Bundesregierung)$',
+    re.IGNORECASE
+)
+# "Entwurf(s) eines [optional ordinal adjective] Gesetzes ..." — ordinals like
+# "Ersten", "Zweiten", "Dritten" etc. are common in German parliamentary bill titles.
+# [\w\.]+ also matches "..." (ellipsis) used in abbreviated XML titles
+_NAS_BILL_RE = re.compile(r'(Entwurfs? eines (?:[\w\.]+\s+)*Gesetzes\s.+)', re.DOTALL)
+_ENTWURFS_RE = re.compile(r'^Entwurfs\b')
+
+
+def iter_sitzungsverlauf(source) -> Iterator[tuple[dict, ET.Element]]:
     """
-    Process speeches xml file and store data to pandas DataFrame.
-    Stores top_id as metadata; use build_tops_lookup for title resolution.
+    Parse a plenary protocol incrementally and yield (header, element) for
+    each direct child of <sitzungsverlauf>, mostly <tagesordnungspunkt>, as
+    soon as its end tag has been read. header holds the root attributes
+    (sitzung-datum, sitzung-nr, ...).
+
+    An element is only valid until the next iteration. After that it is
+    cleared, as is everything outside sitzungsverlauf, so memory is bounded
+    by the largest single TOP rather than the whole protocol. source is a
+    path or a binary file object.
     """
-    tree = ET.parse(url)
-    root = tree.getroot()
+    header = None
+    root = verlauf = None
+    open_tags = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+                header = dict(elem.attrib)
+            elif len(open_tags) == 1 and elem.tag == "sitzungsverlauf":
+                verlauf = elem
+            open_tags.append(elem.tag)
+            continue
+
+        open_tags.pop()
+        if len(open_tags) == 2 and open_tags[1] == "sitzungsverlauf":
+            yield header, elem
+            verlauf.clear()
+        elif len(open_tags) == 1:
+            # vorspann, anlagen, ... and sitzungsverlauf itself once it is done
+            root.clear()
 
-    a_date = root.attrib['sitzung-datum']
-    session_id = root.attrib.get('sitzung-nr', '')
 
+def iter_protocol(source, with_speeches: bool = True) -> Iterator[tuple[dict | None, list[dict]]]:
+    """
+    Walk a plenary protocol XML once and yield (TOP record, speech rows) per
+    tagesordnungspunkt. The TOP record is None for points without a top-id;
+    speech rows have the keys in SPEECH_COLUMNS and are left empty when
+    with_speeches is False. Streams with bounded memory, see iter_sitzungsverlauf.
+    """
     # path: <dbtplenarprotokoll>/<sitzungsverlauf>/<tagesordnungspunkt>/<rede>
-    for punkt in root.findall("./sitzungsverlauf/tagesordnungspunkt"):
-        top_id = punkt.get("top-id", "").replace('\xa0', ' ')
-        if top_id and not re.search(r'\d', top_id):
-            for p in punkt.findall("./p[@klasse='J']"):
-                text = ''.join(p.itertext()).strip()
-                m = re.search(r'(Tagesordnungspunkt|Zusatzpunkt)[\s\xa0]+(\d+)', text)
+    for header, punkt in iter_sitzungsverlauf(source):
+        if punkt.tag == "tagesordnungspunkt":
+            yield _parse_punkt(punkt, header.get('sitzung-nr', ''), header['sitzung-datum'], with_speeches)
+
+
+def _parse_punkt(punkt, session_id: str, a_date: str, with_speeches: bool = True) -> tuple[dict | None, list[dict]]:
+    # (tag, klasse, text, element) per child; <p> texts are extracted once for every pass below.
+    children = [
+        (child.tag, child.get('klasse', ''), ''.join(child.itertext()).strip() if child.tag == 'p' else '', child)
+        for child in punkt
+    ]
+
+    top_id = punkt.get("top-id", "").replace('\xa0', ' ')
+    if top_id and not _DIGIT_RE.search(top_id):
+        for tag, klasse, text, _ in children:
+            if tag == 'p' and klasse == 'J':
+                m = _TOP_ANNOUNCE_RE.search(text)
                 if m:
                     top_id = f"{m.group(1)} {m.group(2)}"
                     break
-        # Unique key per TOP across sessions: e.g. "21063_Tagesordnungspunkt 20"
-        top_key = f"{session_id}_{top_id}" if session_id else top_id
-
-        for rede in punkt.findall("./rede"):
-            rede_id = rede.get("id")
-
-            fraktion = rede.find(".//p[@klasse='redner']//fraktion")
-            if fraktion is not None:
-                main_text_nodes = rede.findall(".//p[@klasse='J_1']")
-                if not main_text_nodes:
-                    continue
-
-                df.loc[len(df)] = {'type': 'speech',
-                        'date': a_date,
-                        'id': rede_id,
-                        'party': fraktion.text,
-                        'top_key': top_key,
-                        'text': main_text_nodes[0].text}
-
-                for node in rede.findall(".//p[@klasse='J']"):
-                    df.loc[len(df)] = {'type': 'speech',
-                          'date': a_date,
-                          'id': rede_id,
-                          'party': fraktion.text,
-                          'top_key': top_key,
-                          'text': node.text}
+    # Unique key per TOP across sessions: e.g. "21063_Tagesordnungspunkt 20"
+    top_key = f"{session_id}_{top_id}" if session_id else top_id
+
+    top = _top_record(children, top_id, top_key, session_id, a_date) if top_id else None
+    rows = list(_speech_rows(children, a_date, top_key)) if with_speeches else []
+    return top, rows
+
+
+def _speech_rows(children: list, a_date: str, top_key: str) -> Iterator[dict]:
+    for tag, _, _, rede in children:
+        if tag != 'rede':
+            continue
+        rede_id = rede.get("id")
+
+        fraktion = rede.find(".//p[@klasse='redner']//fraktion")
+        if fraktion is not None:
+            main_text_nodes = rede.findall(".//p[@klasse='J_1']")
+            if not main_text_nodes:
+                continue
+
+            yield {'type': 'speech',
+                   'date': a_date,
+                   'id': rede_id,
+                   'party': fraktion.text,
+                   'top_key': top_key,
+                   'text': main_text_nodes[0].text}
+
+            for node in rede.findall(".//p[@klasse='J']"):
+                yield {'type': 'speech',
+                       'date': a_date,
+                       'id': rede_id,
+                       'party': fraktion.text,
+                       'top_key': top_key,
+                       'text': node.text}
+
+
+def _clean_title(node) -> str:
+    if node is None or not node.text:
+        return ""
+    return _TITLE_PREFIX_RE.sub('', node.text, count=1).strip()
+
+
+def _top_record(children: list, top_id: str, top_key: str, session_id: str, a_date: str) -> dict:
+    # Collect T_fett / T_NaS only until the first subtopic NaS (a), b), ...) is reached.
+    # T_fett/T_NaS that belong to a subtopic must not become the TOP-level title.
+    t_fett = None
+    t_nas = None
+    for tag, klasse, text, child in children:
+        if tag != 'p':
+            continue
+        if klasse in ('T_NaS', 'T_ZP_NaS'):
+            if _SUBTOPIC_NAS_RE.match(text):
+                break  # Pattern A subtopic — stop
+            if t_nas is None:
+                t_nas = child
+        elif klasse == 'T_fett':
+            t_fett = child
+        elif klasse == 'J':
+            if _SUBTOPIC_J_RE.search(text):
+                break  # Pattern B subtopic — stop
+
+    title = t_fett.text.strip() if t_fett is not None and t_fett.text else _clean_title(t_nas)
+    subtitle = _clean_title(t_nas)
+    if _PROCEDURAL_RE.match(subtitle):
+        subtitle = ""
+
+    # Parse subtopics (a, b, c...) with Drucksache references.
+    # Pattern A: T_NaS starts with "a)" / "18 a)" (shared debate, e.g. TOP 18)
+    # Pattern B: J element announces "Tagesordnungspunkt 19a:" (sequential items, e.g. TOP 19)
+    subtopics = []
+    pending = None
+    top_drucksache = ''
+    top_drucksache_url = ''
+    for tag, klasse, text, _ in children:
+        if tag == 'rede':
+            break
+        if tag != 'p':
+            continue
+        if klasse in ('T_NaS', 'T_ZP_NaS'):
+            m = _SUBTOPIC_NAS_RE.match(text)
+            if m:
+                letter = m.group(1)
+                if pending is not None and pending['key'] == letter and not pending['nas']:
+                    # Pattern B already opened this subtopic — fill in the NaS instead of duplicating
+                    pending['nas'] = text
+                else:
+                    # Pattern A: new subtopic
+                    if pending is not None:
+                        subtopics.append(pending)
+                    pending = {'key': letter, 'nas': text, 'title': '', 'drucksache': '', 'drucksache_url': ''}
+            elif pending is not None and not pending['nas']:
+                pending['nas'] = text
+        elif klasse == 'J':
+            # Pattern B: "Tagesordnungspunkt 19a:" announces a subtopic
+            m = _SUBTOPIC_J_RE.search(text)
+            if m:
+                if pending is not None:
+                    subtopics.append(pending)
+                pending = {'key': m.group(1), 'nas': '', 'title': '', 'drucksache': '', 'drucksache_url': ''}
+        elif klasse == 'T_fett' and pending is not None:
+            if not pending['title']:
+                pending['title'] = text
+        elif klasse == 'T_Drs':
+            dr_m = _DRUCKSACHE_RE.search(text)
+            if dr_m:
+                nr = dr_m.group(1)
+                if pending is not None:
+                    pending['drucksache'] = nr
+                    pending['drucksache_url'] = _drucksache_pdf_url(nr)
+                elif not top_drucksache:
+                    top_drucksache = nr
+                    top_drucksache_url = _drucksache_pdf_url(nr)
+    if pending is not None:
+        subtopics.append(pending)
+
+    for s in subtopics:
+        if not s['title'] and s['nas']:
+            s['title'] = _extract_nas_title(s['nas'])
+
+    return {
+        "top_key": top_key,
+        "top_id": top_id,
+        "title": title,
+        "subtitle": subtitle,
+        "session": session_id,
+        "date": a_date,
+        "drucksache": top_drucksache,
+        "drucksache_url": top_drucksache_url,
+        "subtopics": subtopics,
+    }
+
+
+def _parse_file(path: str, with_speeches: bool, cache: ParseCache | None = None,
+                digest: str | None = None) -> tuple[list[dict], dict]:
+    # A cached entry always holds the speeches, so it serves TOP-only callers too.
+    rows, tops = [], {}
+    for top, top_rows in iter_protocol(path, with_speeches or cache is not None):
+        if top is not None:
+            tops[top["top_key"]] = top
+        rows.extend(top_rows)
+    if cache is not None and digest is not None:
+        cache.put(digest, rows, tops)
+    return (rows if with_speeches else []), tops
+
+
+def parse_protocol(url: str) -> tuple[list[dict], dict]:
+    """Speech rows and TOP records ({top_key: record}) of one protocol, from a single pass."""
+    return _parse_file(url, True)
+
+
+def parse_protocols(xml_files: Iterable, workers: int = XML_PARSE_WORKERS, with_speeches: bool = True,
+                    cache_dir: Path | None = PARSE_CACHE_DIR,
+                    ) -> Iterator[tuple[str, tuple[list[dict], dict] | None, str | None]]:
+    """
+    Parse many protocols on a process pool and yield (file, (rows, tops), None)
+    per file, in input order whatever order the workers finish in. A file that
+    fails to parse yields (file, None, error) instead of stopping the run.
+    workers=0 uses every core; with one worker or one file everything runs
+    in this process.
+
+    Files whose content was parsed before by the same PARSER_VERSION are loaded
+    from the parse cache in cache_dir (see parse_cache.py) and never reach the
+    pool. cache_dir=None disables the cache.
+    """
+    files = [str(f) for f in xml_files]
+    cache = ParseCache(PARSER_VERSION, SPEECH_COLUMNS, cache_dir) if cache_dir is not None else None
+    digests, hits = cache.lookup(files, with_speeches) if cache is not None else ({}, {})
+    todo = [path for path in files if path not in hits]
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+
+    with ExitStack() as stack:
+        futures = {}
+        if workers > 1:
+            # spawn rather than fork: run_update calls this from a thread of the API process.
+            pool = stack.enter_context(
+                ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")))
+            futures = {path: pool.submit(_parse_file, path, with_speeches, cache, digests.get(path))
+                       for path in todo}
+        for path in files:
+            try:
+                if path in hits:
+                    result = hits[path]
+                elif path in futures:
+                    result = futures[path].result()
+                else:
+                    result = _parse_file(path, with_speeches, cache, digests.get(path))
+            except Exception as exc:
+                yield path, None, f"{type(exc).__name__}: {exc}"
+                continue
+            yield path, result, None
+
+
+def collect_protocols(xml_files: Iterable, workers: int = XML_PARSE_WORKERS, with_speeches: bool = True,
+                      cache_dir: Path | None = PARSE_CACHE_DIR) -> tuple[list[dict], dict, dict]:
+    """
+    Parse many protocols in parallel and merge the results in input order.
+    Returns (speech rows, TOP records by top_key, {file: error} for files that failed).
+    """
+    rows, tops, failures = [], {}, {}
+    for path, result, error in parse_protocols(xml_files, workers, with_speeches, cache_dir):
+        if error is not None:
+            failures[path] = error
+            continue
+        rows.extend(result[0])
+        tops.update(result[1])
+    return rows, tops, failures
+
+
+def iter_speech_rows(url: str) -> Iterator[dict]:
+    """
+    Yield one record per speech paragraph of a plenary protocol XML, with the
+    keys in SPEECH_COLUMNS. Stores top_id as metadata; use build_tops_lookup
+    for title resolution. Collect the records with speech_rows_to_df, stream
+    them to disk with write_speech_rows_csv, or consume them directly.
+    """
+    for _, rows in iter_protocol(url):
+        yield from rows
+
+
+def build_tops_lookup(url: str) -> dict:
+    """
+    Extract TOP metadata from an XML file.
+    Returns dict: {top_key: {top_id, title, session, date}}
+    """
+    return {top["top_key"]: top for top, _ in iter_protocol(url, with_speeches=False) if top is not None}
+
+
+def speech_rows_to_df(rows: Iterable[dict]) -> pd.DataFrame:
+    """Collect speech records column by column and build the DataFrame once."""
+    columns = {c: [] for c in SPEECH_COLUMNS}
+    for row in rows:
+        for c in SPEECH_COLUMNS:
+            columns[c].append(row[c])
+    return pd.DataFrame(columns, columns=SPEECH_COLUMNS)
+
+
+def write_speech_rows_csv(rows: Iterable[dict], path: str) -> int:
+    """Stream speech records to a CSV file (no index column). Returns the number of rows."""
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SPEECH_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            n += 1
+    return n
 
 
 def _extract_nas_title(nas: str) -> str:
     """Extract bill/motion title from a procedural NaS string when no T_fett is present."""
-    # Match "Entwurf(s) eines [optional ordinal adjective] Gesetzes ..." — ordinals like
-    # "Ersten", "Zweiten", "Dritten" etc. are common in German parliamentary bill titles.
-    # [\w\.]+ also matches "..." (ellipsis) used in abbreviated XML titles
-    m = re.search(r'(Entwurfs? eines (?:[\w\.]+\s+)*Gesetzes\s.+)', nas, re.DOTALL)
+    m = _NAS_BILL_RE.search(nas)
     if m:
-        return re.sub(r'^Entwurfs\b', 'Entwurf', m.group(1)).strip()
+        return _ENTWURFS_RE.sub('Entwurf', m.group(1)).strip()
     return ''
 
 
@@ -83,289 +369,101 @@ def _drucksache_pdf_url(nr: str) -> str:
     except Exception:
         return ""
 
-
-def build_tops_lookup(url: str) -> dict:
+def fetch_xml(url: str, store_it_to: str = None):
     """
-    Extract TOP metadata from an XML file.
-    Returns dict: {top_key: {top_id, title, session, date}}
-    """
-    tree = ET.parse(url)
-    root = tree.getroot()
-
-    a_date = root.attrib['sitzung-datum']
-    session_id = root.attrib.get('sitzung-nr', '')
-
-    tops = {}
-    for punkt in root.findall("./sitzungsverlauf/tagesordnungspunkt"):
-        top_id = punkt.get("top-id", "").replace('\xa0', ' ')
-        if not top_id:
-            continue
-        if not re.search(r'\d', top_id):
-            for p in punkt.findall("./p[@klasse='J']"):
-                text = ''.join(p.itertext()).strip()
-                m = re.search(r'(Tagesordnungspunkt|Zusatzpunkt)[\s\xa0]+(\d+)', text)
-                if m:
-                    top_id = f"{m.group(1)} {m.group(2)}"
-                    break
-        top_key = f"{session_id}_{top_id}" if session_id else top_id
-        def _clean(node):
-            if node is None or not node.text:
-                return ""
-            return re.sub(r'^[\s\t–\-]*(?:ZP\s*\d+\s*)?', '', node.text).strip()
-
-        # Collect T_fett / T_NaS only until the first subtopic NaS (a), b), ...) is reached.
-        # T_fett/T_NaS that belong to a subtopic must not become the TOP-level title.
-        t_fett = None
-        t_nas = None
-        for child in list(punkt):
-            if child.tag != 'p':
-                continue
-            klasse = child.get('klasse', '')
-            text = ''.join(child.itertext()).strip()
-            if klasse in ('T_NaS', 'T_ZP_NaS'):
-                if re.match(r'^\s*(?:\d+\s+)?[a-z]\)', text):
-                    break  # Pattern A subtopic — stop
-                if t_nas is None:
-                    t_nas = child
-            elif klasse == 'T_fett':
-                t_fett = child
-            elif klasse == 'J':
-                if re.search(r'Tagesordnungspunkt[\s\xa0]*\d+[a-z]:', text):
-                    break  # Pattern B subtopic — stop
-
-        title = t_fett.text.strip() if t_fett is not None and t_fett.text else _clean(t_nas)
-        subtitle = _clean(t_nas)
-        # Strip procedural-only subtitles that carry no content value
-        _procedural = re.compile(
-            r'^(Vereinbarte Debatte:?|Aktuelle Stunde|Fragestunde|Befragung der Bundesregierung)$',
-            re.IGNORECASE
-        )
-        if _procedural.match(subtitle):
-            subtitle = ""
-
-        # Parse subtopics (a, b, c...) with Drucksache references.
-        # Pattern A: T_NaS starts with "a)" / "18 a)" (shared debate, e.g. TOP 18)
-        # Pattern B: J element announces "Tagesordnungspunkt 19a:" (sequential items, e.g. TOP 19)
-        subtopics = []
-        pending = None
-        top_drucksache = ''
-        top_drucksache_url = ''
-        for child in list(punkt):
-            if child.tag == 'rede':
-                break
-            if child.tag != 'p':
-                continue
-            klasse = child.get('klasse', '')
-            text = ''.join(child.itertext()).strip()
-            if klasse in ('T_NaS', 'T_ZP_NaS'):
-                m = re.match(r'^\s*(?:\d+\s+)?([a-z])\)', text)
-                if m:
-                    letter = m.group(1)
-                    if pending is not None and pending['key'] == letter and not pending['nas']:
-                        # Pattern B already opened this subtopic — fill in the NaS instead of duplicating
-                        pending['nas'] = text
-                    else:
-                        # Pattern A: new subtopic
-                        if pending is not None:
-                            subtopics.append(pending)
-                        pending = {'key': letter, 'nas': text, 'title': '', 'drucksache': '', 'drucksache_url': ''}
-                elif pending is not None and not pending['nas']:
-                    pending['nas'] = text
-            elif klasse == 'J':
-                # Pattern B: "Tagesordnungspunkt 19a:" announces a subtopic
-                m = re.search(r'Tagesordnungspunkt[\s\xa0]*\d+([a-z]):', text)
-                if m:
-                    if pending is not None:
-                        subtopics.append(pending)
-                    pending = {'key': m.group(1), 'nas': '', 'title': '', 'drucksache': '', 'drucksache_url': ''}
-            elif klasse == 'T_fett' and pending is not None:
-                if not pending['title']:
-                    pending['title'] = text
-            elif klasse == 'T_Drs':
-                dr_m = re.search(r'(\d+/\d+)', text)
-                if dr_m:
-                    nr = dr_m.group(1)
-                    if pending is not None:
-                        pending['drucksache'] = nr
-                        pending['drucksache_url'] = _drucksache_pdf_url(nr)
-                    elif not top_drucksache:
-                        top_drucksache = nr
-                        top_drucksache_url = _drucksache_pdf_url(nr)
-        if pending is not None:
-            subtopics.append(pending)
-
-        for s in subtopics:
-            if not s['title'] and s['nas']:
-                s['title'] = _extract_nas_title(s['nas'])
-
-        tops[top_key] = {
-            "top_key": top_key,
-            "top_id": top_id,
-            "title": title,
-            "subtitle": subtitle,
-            "session": session_id,
-            "date": a_date,
-            "drucksache": top_drucksache,
-            "drucksache_url": top_drucksache_url,
-            "subtopics": subtopics,
-        }
-
-    return tops
-
-def fetch_and_parse_xml(url: str, store_it_to: str = None) -> dict:
-    """
-    Fetch XML from URL and parse it into a dictionary using xmltodict.
-    Args:
-        url: URL of the XML file
-    Returns:
-        Dictionary representation of the XML
+    Download a protocol XML. With store_it_to, the response is streamed into a
+    file in that directory and its path returned; otherwise a file object over
+    the response body. Either can be passed to iter_protocol or iter_speeches.
     """
     print(f"Fetching XML from {url}...")
-    response = requests.get(url)
+    response = requests.get(url, stream=store_it_to is not None)
     response.raise_for_status()
+    if store_it_to is None:
+        return io.BytesIO(response.content)
 
-    print("Parsing XML with xmltodict...")
-    xml_dict = xmltodict.parse(response.content)
-    if store_it_to is not None:
-        os.makedirs(store_it_to, exist_ok=True)
-        filename = url.split("/")[-1]
-        filepath = os.path.join(store_it_to, filename)
-        print(f"Storing XML to {filepath}...")
-        with open(filepath, "wb") as f:
-            f.write(response.content)
-    return xml_dict
-
-def get_speeches_by_fraktion(xml_data: dict, fraktion: str) -> list:
-    """
-    Retrieve all speeches by speakers from a specific party (fraktion).
-    Args:
-        xml_data: The parsed XML dictionary
-        fraktion: The party name (e.g., "AfD", "SPD", "CDU/CSU", "BÜNDNIS 90/DIE GRÜNEN", "Die Linke")
-    Returns:
-        List of speech dictionaries from speakers of the specified party
-    """
-    speeches = []
-
-    def find_speeches_recursive(obj):
-        """Recursively find all rede (speech) elements."""
-        if isinstance(obj, dict):
-            # Check if this is a rede element
-            if '@id' in obj and obj.get('@id', '').startswith('ID'):
-                # This looks like a speech element
-                # Check if it has a speaker with the matching fraktion
-                if 'p' in obj:
-                    paragraphs = obj['p'] if isinstance(obj['p'], list) else [obj['p']]
-                    for para in paragraphs:
-                        if isinstance(para, dict) and 'redner' in para:
-                            redner = para['redner']
-                            if isinstance(redner, dict) and 'name' in redner:
-                                name_info = redner['name']
-                                if isinstance(name_info, dict) and name_info.get('fraktion') == fraktion:
-                                    speeches.append(obj)
-                                    break
-
-            # Recursively search all values
-            for value in obj.values():
-                find_speeches_recursive(value)
-
-        elif isinstance(obj, list):
-            for item in obj:
-                find_speeches_recursive(item)
-
-    find_speeches_recursive(xml_data)
-    return speeches
-
-
-def extract_speech_text(speech_dict: dict) -> str:
-    """
-    Extract ONLY the actual speech text content (#text fields) from paragraphs.
-    Excludes speaker info, XML structure markers, and metadata.
-    This is what gets embedded - metadata is stored separately for filtering.
-    Args:
-        speech_dict: Dictionary containing speech data
-    Returns:
-        String containing only the speech text content (no metadata)
-    """
-    # Only extract #text from paragraphs, excluding speaker introductions
-    text_parts = []
+    os.makedirs(store_it_to, exist_ok=True)
+    filename = url.split("/")[-1]
+    filepath = os.path.join(store_it_to, filename)
+    print(f"Storing XML to {filepath}...")
+    with open(filepath, "wb") as f:
+        for chunk in response.iter_content(chunk_size=1 << 20):
+            f.write(chunk)
+    return filepath
 
-    if 'p' in speech_dict:
-        paragraphs = speech_dict['p'] if isinstance(speech_dict['p'], list) else [speech_dict['p']]
 
-        for para in paragraphs:
-            if isinstance(para, dict):
-                # Skip paragraphs that contain speaker info (redner key)
-                if 'redner' in para:
-                    continue
+def _speaker_info(rede) -> dict:
+    """Speaker of a <rede> (titel, vorname, nachname, fraktion), or {} if it names none."""
+    name = rede.find("./p/redner/name")
+    if name is None:
+        return {}
+    return {field: name.findtext(field, '') for field in ('titel', 'vorname', 'nachname', 'fraktion')}
 
-                # Only extract #text content
-                if '#text' in para:
-                    text = para['#text'].strip()
-                    # Filter out empty text and XML class markers
-                    if text and len(text) > 0:
-                        text_parts.append(text)
 
-    # Join all text parts with spaces
+def _speech_text(rede) -> str:
+    """
+    Only the spoken text of a <rede>: the direct text of its paragraphs,
+    without the speaker line or inline markup. This is what gets embedded;
+    metadata is stored separately for filtering.
+    """
+    text_parts = []
+    for p in rede.findall("./p"):
+        if p.find("redner") is not None:
+            continue
+        text = ''.join([p.text or '', *(child.tail or '' for child in p)]).strip()
+        if text:
+            text_parts.append(text)
     return ' '.join(text_parts)
 
 
-def get_speaker_info(speech_dict: dict) -> dict:
+def iter_speeches(source) -> Iterator[dict]:
+    """
+    One record per speech of a protocol: {id, date, speaker, text}, with
+    speaker as returned by _speaker_info. Streams with bounded memory, see
+    iter_sitzungsverlauf.
     """
-    Extract speaker information from a speech.
+    for header, elem in iter_sitzungsverlauf(source):
+        for rede in elem.iter("rede"):
+            rede_id = rede.get("id", "")
+            if not rede_id.startswith("ID"):
+                continue
+            yield {
+                'id': rede_id,
+                'date': header.get('sitzung-datum', ''),
+                'speaker': _speaker_info(rede),
+                'text': _speech_text(rede),
+            }
 
-    Args:
-        speech_dict: Dictionary containing speech data
 
+def get_speeches_by_fraktion(source, fraktion: str) -> list:
+    """
+    Retrieve all speeches by speakers from a specific party (fraktion).
+    Args:
+        source: Path or binary file object of a protocol XML
+        fraktion: The party name (e.g., "AfD", "SPD", "CDU/CSU", "BÜNDNIS 90/DIE GRÜNEN", "Die Linke")
     Returns:
-        Dictionary with speaker information (name, fraktion, etc.)
+        List of speech records (see iter_speeches) from speakers of the specified party
     """
-    if 'p' in speech_dict:
-        paragraphs = speech_dict['p'] if isinstance(speech_dict['p'], list) else [speech_dict['p']]
-        for para in paragraphs:
-            if isinstance(para, dict) and 'redner' in para:
-                redner = para['redner']
-                if isinstance(redner, dict) and 'name' in redner:
-                    name_info = redner['name']
-                    return {
-                        'titel': name_info.get('titel', ''),
-                        'vorname': name_info.get('vorname', ''),
-                        'nachname': name_info.get('nachname', ''),
-                        'fraktion': name_info.get('fraktion', '')
-                    }
-    return {}
+    return [speech for speech in iter_speeches(source) if speech['speaker'].get('fraktion') == fraktion]
+
 
 def get_speeches(speeches_urls: str, speeches_csv: str):
     require_env("SPEECHES_XML_DIR")
 
-    df = pd.DataFrame({
-        'type': pd.Series(dtype='object'),
-        'date': pd.Series(dtype='object'),
-        'id': pd.Series(dtype='object'),
-        'party': pd.Series(dtype='object'),
-        'text': pd.Series(dtype='object')
-    })
-
-    all_urls = pd.read_csv(urls).iloc[:,0]
-
-    for url in all_urls:
-        xml_data = fetch_and_parse_xml(speeches_urls, SPEECHES_XML_DIR)
-        data = xml_data["dbtplenarprotokoll"]["@sitzung-datum"]
-
-        for party in PARTIES_LIST:
-            sp_list = get_speeches_by_fraktion(xml_data, party)
-
-            for speech in sp_list:
-                text = extract_speech_text(speech)
-                speaker_info = get_speaker_info(speech)
-                df = pd.concat([df, pd.DataFrame([{
-                    'type':'speech',
-                    'date': data,
-                    'id': speech.get('@id', ''),
-                    'party': speaker_info.get('fraktion', ''),
-                    'text': text
-                }])], ignore_index=True)
-
-    df.to_csv(speeches_csv)
+    rows = []
+    for url in pd.read_csv(speeches_urls).iloc[:, 0]:
+        source = fetch_xml(url, SPEECHES_XML_DIR)
+        for speech in iter_speeches(source):
+            party = speech['speaker'].get('fraktion', '')
+            if party in PARTIES_LIST:
+                rows.append({
+                    'type': 'speech',
+                    'date': speech['date'],
+                    'id': speech['id'],
+                    'party': party,
+                    'text': speech['text'],
+                })
+
+    pd.DataFrame(rows, columns=['type', 'date', 'id', 'party', 'text']).to_csv(speeches_csv)
 
 if __name__ == "__main__":
     if len(sys.argv) > 2 and (os.path.isfile(sys.argv[2]) or os.path.isdir(sys.argv[2])):
@@ -376,11 +474,12 @@ if __name__ == "__main__":
             file_to_process = sys.argv[2]
             print(f"Vectorizing {file_to_process}...")
             time.sleep(2)
+            from practicepreach.rag import Rag
             rag = Rag()
             print(f'{rag.get_num_of_vectors()} vectors currently in the vector store.')
             time.sleep(2)
-            num_of_chunks = rag.add_to_vector_store(data_source=file_to_process)
-            print(f"Embedded {num_of_chunks} chunks into the vector store.")
+            num_of_chunks, num_failed = rag.add_to_vector_store(data_source=file_to_process)
+            print(f"Embedded {num_of_chunks} chunks into the vector store ({num_failed} failed).")
             print(f'{rag.get_num_of_vectors()} vectors currently in the vector store.')
         elif sys.argv[1] == "xml":
             dir_to_process = sys.argv[2]
@@ -389,8 +488,12 @@ if __name__ == "__main__":
             entries = os.listdir(dir_to_process)
             files = [os.path.join(dir_to_process, f) \
                     for f in entries if os.path.isfile(os.path.join(dir_to_process, f))]
-            df = pd.DataFrame(columns = ['date','id','party','text'])
-            for file in files:
-                print(f'Processing {file}')
-                process_bundestag_xml(file, df)
-            df.to_csv(save_to_cvs)
+            def rows():
+                for file, result, error in parse_protocols(sorted(files)):
+                    if error is not None:
+                        print(f'Failed to parse {file}: {error}')
+                        continue
+                    print(f'Processed {file}')
+                    yield from result[0]
+            n_rows = write_speech_rows_csv(rows(), save_to_cvs)
+            print(f'Wrote {n_rows} rows from {len(files)} files to {save_to_cvs}')
@@ -0,0 +1,89 @@
+"""
+In-memory index of which TOPs have speech chunks in the vector store.
+
+Built once from a scan of the speech metadata and then kept up to date by
+Rag.embed_and_store and Rag.prune_speeches_before, so /topics and /all_topics
+do not have to pull every chunk's metadata out of Chroma per request.
+"""
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+SCAN_PAGE_SIZE = 5000
+
+
+def _session_pdf(speech_id: str) -> tuple[str, str] | None:
+    """Derive (session, PDF URL) from a speech ID (format: ID{wp}{session_padded}...)."""
+    if speech_id.startswith("ID") and len(speech_id) >= 8:
+        wp = speech_id[2:4]
+        session = speech_id[4:6].zfill(3)
+        return speech_id[4:6], f"https://dserver.bundestag.de/btp/{wp}/{wp}{session}.pdf"
+    return None
+
+
+class TopsIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chunk_counts: Counter = Counter()   # (top_key, party) -> speech chunks
+        self._session_counts: Counter = Counter()  # session -> speech chunks
+        self._session_urls: dict[str, str] = {}
+        # Immutable snapshots, replaced wholesale on every change so readers
+        # never need the lock.
+        self.active_keys: frozenset[str] = frozenset()
+        self.session_pdf_urls: dict[str, str] = {}
+        self.version = 0
+
+    @classmethod
+    def build(cls, collection) -> "TopsIndex":
+        """Scan all speech chunk metadata of a Chroma collection, page by page."""
+        index = cls()
+        offset = 0
+        while True:
+            page = collection.get(
+                where={"type": {"$eq": "speech"}},
+                include=["metadatas"],
+                limit=SCAN_PAGE_SIZE,
+                offset=offset,
+            )
+            metadatas = page["metadatas"]
+            if not metadatas:
+                break
+            index.add(metadatas)
+            offset += len(metadatas)
+        logger.info(f"TOPs index built: {len(index.active_keys)} active TOPs from {offset} speech chunks")
+        return index
+
+    def add(self, metadatas: list[dict]) -> None:
+        self._apply(metadatas, +1)
+
+    def remove(self, metadatas: list[dict]) -> None:
+        self._apply(metadatas, -1)
+
+    def chunk_count(self, top_key: str, party: str) -> int:
+        return self._chunk_counts.get((top_key, party), 0)
+
+    def _apply(self, metadatas: list[dict], sign: int) -> None:
+        speeches = [m for m in metadatas if m and m.get("type") == "speech"]
+        if not speeches:
+            return
+        with self._lock:
+            for m in speeches:
+                if m.get("top_key"):
+                    key = (m["top_key"], m.get("party", ""))
+                    self._chunk_counts[key] += sign
+                    if self._chunk_counts[key] <= 0:
+                        del self._chunk_counts[key]
+                pdf = _session_pdf(m.get("id", ""))
+                if pdf:
+                    session, url = pdf
+                    self._session_counts[session] += sign
+                    if self._session_counts[session] <= 0:
+                        del self._session_counts[session]
+                        self._session_urls.pop(session, None)
+                    elif sign > 0:
+                        self._session_urls[session] = url
+            self.active_keys = frozenset(top_key for top_key, _ in self._chunk_counts)
+            self.session_pdf_urls = dict(self._session_urls)
+            self.version += 1
@@ -2,6 +2,10 @@
 Speech update pipeline: fetch new Bundestag plenary speeches, embed into ChromaDB,
 prune speeches older than `prune_weeks` weeks, and rebuild tops.json.
 
+run_update works on the live store in place. run_shadow_update runs the same
+pipeline against a staged copy, validates the result and only then promotes
+it, so readers never see a half-finished update.
+
 Can be called from the CLI (bin/update_speeches.py) or the API (/admin/update).
 """
 import json
@@ -15,8 +19,9 @@ import pandas as pd
 import requests
 from requests.exceptions import ChunkedEncodingError, ConnectionError
 
-from practicepreach.tools import process_bundestag_xml, build_tops_lookup
-from practicepreach.params import BUNDESTAG_API_KEY, USE_GCS_CHROMA
+from practicepreach.tools import parse_protocols, speech_rows_to_df
+from practicepreach.params import BUNDESTAG_API_KEY, USE_GCS_CHROMA, SHADOW_MAX_SHRINK
+from practicepreach.rate_limiter import chat_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -109,12 +114,28 @@ def download_xmls(session_urls: list[tuple[str, str]], xml_dir: Path) -> list[Pa
     return local_files
 
 
-def parse_xmls_to_df(xml_files: list[Path]) -> pd.DataFrame:
-    df = pd.DataFrame(columns=['type', 'date', 'id', 'party', 'top_key', 'text'])
-    for xml_file in xml_files:
-        logger.info(f"Parsing {xml_file.name}...")
-        process_bundestag_xml(str(xml_file), df)
-    return df.reset_index(drop=True)
+def parse_xmls(xml_files: list[Path]) -> tuple[pd.DataFrame, dict, dict]:
+    """
+    Speech rows and TOP records ({top_key: record}) of all files, parsed on
+    XML_PARSE_WORKERS processes and merged in file order. Files that fail to
+    parse are logged and returned as {file name: error} instead of aborting.
+    """
+    tops, failures = {}, {}
+
+    def rows():
+        for xml_file, result, error in parse_protocols(xml_files):
+            name = Path(xml_file).name
+            if error is not None:
+                logger.error(f"Failed to parse {name}: {error}")
+                failures[name] = error
+                continue
+            logger.info(f"Parsed {name}")
+            file_rows, file_tops = result
+            tops.update(file_tops)
+            yield from file_rows
+
+    df = speech_rows_to_df(rows())
+    return df, tops, failures
 
 
 def normalize_parties(df: pd.DataFrame) -> pd.DataFrame:
@@ -139,17 +160,16 @@ def get_last_embedded_date(rag) -> str:
     return (dt + timedelta(days=1)).strftime("%Y-%m-%d")
 
 
-def _update_tops_json(xml_files: list[Path], model) -> None:
-    """Merge new TOPs from xml_files into tops.json, classifying new keys with Gemini."""
-    TOPS_JSON.parent.mkdir(parents=True, exist_ok=True)
+_GENERIC_TOPIC_RE = re.compile(r'^(Tagesordnungspunkt|Zusatzpunkt|TOP|ZP)\s*\d+', re.IGNORECASE)
 
-    existing = {}
-    if TOPS_JSON.exists():
-        existing = json.loads(TOPS_JSON.read_text())
 
-    new_tops = {}
-    for xml_file in xml_files:
-        new_tops.update(build_tops_lookup(str(xml_file)))
+def _update_tops_json(new_tops: dict, model, tops_path: Path = TOPS_JSON) -> None:
+    """Merge new TOP records ({top_key: record}) into tops.json, classifying new keys with Gemini."""
+    tops_path.parent.mkdir(parents=True, exist_ok=True)
+
+    existing = {}
+    if tops_path.exists():
+        existing = json.loads(tops_path.read_text())
 
     to_classify = {k: v for k, v in new_tops.items()
                    if (k not in existing or not existing[k].get("topic"))
@@ -169,7 +189,8 @@ def _update_tops_json(xml_files: list[Path], model) -> None:
             for k, v in to_classify.items()
         )
         try:
-            response = model.invoke(
+            response = chat_limiter.call(
+                model.invoke,
                 "Du bekommst eine Liste von Bundestagstagesordnungspunkten.\n"
                 "Weise jedem ein kurzes, konsistentes Thema zu (2–4 Wörter auf Deutsch).\n"
                 "Wenn ein Punkt mehrere Themen umfasst, trenne sie mit Komma (z.B. 'Wahlalter, Grundgesetz').\n"
@@ -187,12 +208,11 @@ def _update_tops_json(xml_files: list[Path], model) -> None:
             logger.warning(f"Gemini TOP classification failed: {exc}")
 
     # Fallback: replace missing or generic-sounding Gemini topics with the actual title
-    _generic = re.compile(r'^(Tagesordnungspunkt|Zusatzpunkt|TOP|ZP)\s*\d+', re.IGNORECASE)
     for key, v in to_classify.items():
         current = new_tops[key].get("topic", "")
-        if not current or _generic.match(current):
+        if not current or _GENERIC_TOPIC_RE.match(current):
             fallback = (v.get("title") or v.get("subtitle") or "").strip()
-            if fallback and not _generic.match(fallback):
+            if fallback and not _GENERIC_TOPIC_RE.match(fallback):
                 new_tops[key]["topic"] = fallback[:80]
                 logger.warning(f"Used title as fallback topic for {key}: {fallback[:80]}")
 
@@ -200,43 +220,64 @@ def _update_tops_json(xml_files: list[Path], model) -> None:
         if key in existing and not new_val.get("topic") and existing[key].get("topic"):
             new_val["topic"] = existing[key]["topic"]
     existing.update(new_tops)
-    TOPS_JSON.write_text(json.dumps(existing, ensure_ascii=False, indent=2))
+    tops_path.write_text(json.dumps(existing, ensure_ascii=False, indent=2))
     logger.info(f"tops.json updated: {len(existing)} total TOPs, {len(new_tops)} from this batch")
 
 
-def run_update(rag, since_date: str = None, prune_weeks: int = 4) -> dict:
+def run_update(rag, since_date: str = None, prune_weeks: int = 4, publish: bool = True) -> dict:
     """
     Full weekly update pipeline:
     1. Fetch new session XMLs since `since_date` (defaults to day after last embedded speech)
     2. Parse, normalize, and embed new speeches into ChromaDB
     3. Prune speeches older than `prune_weeks` weeks from ChromaDB
     4. Rebuild tops.json with newly classified TOPs
-    5. Upload vector store + tops.json to GCS (when GCS_CHROMA_PATH is configured)
+    5. Upload vector store + tops.json to GCS (when GCS_CHROMA_PATH is configured
+       and `publish`), as a snapshot archive or block delta depending on GCS_SYNC_MODE
 
-    Returns a summary dict: {new_sessions, embedded, pruned}.
+    Returns a summary dict: {new_sessions, embedded, failed_chunks, pruned, failed_files}.
+    Protocols that fail to parse are skipped and listed in failed_files. If
+    any chunk fails to embed, the speeches added by this run are removed
+    again and nothing is pruned or published, so the next run retries them.
     """
     since_date = since_date or get_last_embedded_date(rag)
     logger.info(f"Running update pipeline since {since_date} (prune >{prune_weeks}w)")
 
     session_urls = fetch_session_xml_urls(since_date)
     xml_files = []
-    n_embedded = 0
+    new_tops, failed = {}, {}
+    n_embedded = n_failed = 0
 
     if session_urls:
         xml_files = download_xmls(session_urls, XML_DIR)
-        df = parse_xmls_to_df(xml_files)
-        logger.info(f"Parsed {len(df)} speech rows across {len(xml_files)} sessions")
+        df, new_tops, failed = parse_xmls(xml_files)
+        logger.info(f"Parsed {len(df)} speech rows across {len(xml_files) - len(failed)} sessions"
+                    + (f", {len(failed)} failed" if failed else ""))
 
         if not df.empty:
             df = normalize_parties(df)
             Path("data").mkdir(parents=True, exist_ok=True)
             staging_csv = f"data/speeches_update_{since_date}.csv"
             df.to_csv(staging_csv, index=False)
-            n_embedded = rag.add_to_vector_store(staging_csv)
+            n_embedded, n_failed = rag.add_to_vector_store(staging_csv)
             logger.info(f"Embedded {n_embedded} chunks. Total: {rag.get_num_of_vectors()}")
     else:
         logger.info("No new sessions found.")
 
+    if n_failed:
+        # Take this run's speeches out again so get_last_embedded_date does not
+        # move past the chunks that failed; the next run re-embeds them (mostly
+        # from the embedding cache). Nothing is pruned or published.
+        logger.error(f"{n_failed} chunks failed to embed — rolling back speeches since {since_date}, "
+                     f"skipping prune and publish")
+        rag.remove_speeches_since(datetime.strptime(since_date, "%Y-%m-%d"))
+        return {
+            "new_sessions": len(session_urls),
+            "embedded": 0,
+            "failed_chunks": n_failed,
+            "pruned": 0,
+            "failed_files": failed,
+        }
+
     # Only prune if new data was successfully embedded
     pruned = 0
     if n_embedded > 0:
@@ -247,15 +288,85 @@ def run_update(rag, since_date: str = None, prune_weeks: int = 4) -> dict:
 
     # Update tops.json with newly parsed TOPs
     if xml_files:
-        _update_tops_json(xml_files, rag.model)
+        _update_tops_json(new_tops, rag.model, rag.tops_path)
 
     # Persist to GCS so next cold start picks up the fresh data
-    if USE_GCS_CHROMA:
+    if USE_GCS_CHROMA and publish:
         logger.info("Uploading updated store to GCS...")
-        rag.upload_to_gcs()
+        rag.publish_to_gcs()
 
     return {
         "new_sessions": len(session_urls),
         "embedded": n_embedded,
+        "failed_chunks": 0,
         "pruned": pruned,
+        "failed_files": failed,
     }
+
+
+class UpdateValidationError(RuntimeError):
+    """Raised when a staged update fails validation; the live store is left untouched."""
+
+
+def validate_update(staged, live, sample_size: int = 5) -> None:
+    """
+    Sanity-check a staged store against the live one before promoting it:
+    it must not be empty or shrink by more than SHADOW_MAX_SHRINK, must not
+    have more TOPs without a title in tops.json than before, and sample
+    TOPs must return chunks from metadata and similarity queries.
+    """
+    problems = []
+    staged_count, live_count = staged.get_num_of_vectors(), live.get_num_of_vectors()
+    if staged_count == 0:
+        problems.append("staged store is empty")
+    elif staged_count < live_count * (1 - SHADOW_MAX_SHRINK):
+        problems.append(f"store shrank from {live_count} to {staged_count} chunks")
+
+    def untitled(rag) -> list[str]:
+        tops = json.loads(rag.tops_path.read_text()) if rag.tops_path.exists() else {}
+        return [k for k in rag.tops_index.active_keys if not tops.get(k, {}).get("title")]
+
+    staged_untitled, live_untitled = untitled(staged), untitled(live)
+    if len(staged_untitled) > len(live_untitled):
+        problems.append(
+            f"{len(staged_untitled)} active TOPs without a title (was {len(live_untitled)}), "
+            f"e.g. {sorted(set(staged_untitled) - set(live_untitled))[:3]}"
+        )
+
+    collection = staged.vector_store._collection
+    for top_key in sorted(staged.tops_index.active_keys)[-sample_size:]:
+        chunks = collection.get(where=staged._top_where(top_key), limit=1, include=["documents"])
+        if not chunks["documents"]:
+            problems.append(f"no chunks for active TOP {top_key}")
+            continue
+        if not staged.similarity_search(chunks["documents"][0], k=1, where=staged._top_where(top_key)):
+            problems.append(f"similarity search returned nothing for TOP {top_key}")
+
+    if problems:
+        raise UpdateValidationError("; ".join(problems))
+    logger.info(f"Staged store validated: {staged_count} chunks (live: {live_count})")
+
+
+def run_shadow_update(rag, since_date: str = None, prune_weeks: int = 4):
+    """
+    Run the update pipeline against a staged copy of the store and tops.json,
+    validate it and promote it. Returns (staged Rag, summary dict); the caller
+    swaps it in and keeps `rag` for rollback. On failure the staged copy is
+    deleted and `rag` is unaffected.
+    """
+    import shutil
+    staged = rag.stage()
+    try:
+        result = run_update(staged, since_date=since_date, prune_weeks=prune_weeks, publish=False)
+        if result["failed_chunks"]:
+            raise UpdateValidationError(f"{result['failed_chunks']} chunks failed to embed")
+        validate_update(staged, rag)
+    except Exception:
+        logger.error(f"Shadow update failed — discarding {staged.store_dir}")
+        shutil.rmtree(staged.store_dir, ignore_errors=True)
+        staged.tops_path.unlink(missing_ok=True)
+        raise
+    staged.promote()
+    # Keep the previous version for rollback; anything older goes.
+    staged.remove_stale_stores(keep=[rag.store_dir])
+    return staged, {**result, "version": staged.store_version}
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from practicepreach import fast
+from practicepreach.llm_executor import LlmQueueFull
+from practicepreach.summaries_cache import SummariesCache
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # No lifespan: the store is replaced by a placeholder and generation is patched.
+    fast.app.state.rag = object()
+    fast.app.state.rag_error = None
+    fast.app.state.summaries = SummariesCache(tmp_path / "summaries.db")
+    yield TestClient(fast.app)
+    fast.app.state.rag = None
+
+
+def build_with(failures: dict):
+    async def build(rag, top_key, raw_cache):
+        if top_key in failures:
+            raise failures[top_key]
+        return {"general": {"summary": top_key}}, True
+    return build
+
+
+def test_batch_returns_503_when_llm_queue_is_full(client, monkeypatch):
+    monkeypatch.setattr(fast, "_build_summaries", build_with({"b": LlmQueueFull(retry_after=7)}))
+    r = client.post("/summaries/batch", json={"top_keys": ["a", "b"]})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "7"
+
+
+def test_batch_reports_other_failures_per_key(client, monkeypatch):
+    monkeypatch.setattr(fast, "_build_summaries", build_with({"b": RuntimeError("boom")}))
+    r = client.post("/summaries/batch", json={"top_keys": ["a", "b"]})
+    assert r.status_code == 200
+    assert r.json()["a"] == {"general": {"summary": "a"}}
+    assert "error" in r.json()["b"]
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+from practicepreach.rag import Rag
+
+SPEECH = {"type": "speech", "id": "s1", "party": "SPD", "top_key": "20-1-TOP1"}
+
+
+class FakeCollection:
+    def __init__(self, rows: list[tuple[str, str, dict]]):
+        self.rows = rows
+
+    def get(self, include, limit, offset):
+        page = self.rows[offset:offset + limit]
+        return {"ids": [r[0] for r in page], "documents": [r[1] for r in page], "metadatas": [r[2] for r in page]}
+
+    def delete(self, ids):
+        self.rows = [r for r in self.rows if r[0] not in ids]
+
+
+def test_remove_duplicate_chunks_keeps_first_copy():
+    collection = FakeCollection([
+        ("a", "same text", SPEECH),
+        ("b", "same text", SPEECH),
+        ("c", "other text", SPEECH),
+        ("d", "same text", {**SPEECH, "party": "FDP"}),
+    ])
+    removed = []
+    rag = SimpleNamespace(vector_store=SimpleNamespace(_collection=collection),
+                          tops_index=SimpleNamespace(remove=removed.extend))
+    assert Rag.remove_duplicate_chunks(rag, dry_run=True) == 1
+    assert len(collection.rows) == 4
+    assert Rag.remove_duplicate_chunks(rag) == 1
+    assert [r[0] for r in collection.rows] == ["a", "c", "d"]
+    assert removed == [SPEECH]
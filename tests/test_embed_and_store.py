@@ -0,0 +1,92 @@
+import chromadb
+import pandas as pd
+import pytest
+from chromadb.api.client import SharedSystemClient
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from practicepreach import rag as rag_module
+from practicepreach import updater
+from practicepreach.rag import Rag
+
+
+class FlakyEmbeddings(Embeddings):
+    """Embeds everything except texts containing "boom"."""
+
+    def embed_documents(self, texts):
+        if any("boom" in t for t in texts):
+            raise RuntimeError("embedding API down")
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [1.0, float(len(text)), 0.0]
+
+
+class NoSplit:
+    def split_documents(self, docs):
+        return docs
+
+
+OLD = {"type": "speech", "top_key": "20-1-TOP1", "party": "SPD", "date": 20260101, "id": "old"}
+
+
+def speech(speech_id: str, text: str, date: int = 20260301) -> Document:
+    return Document(page_content=text, metadata={**OLD, "id": speech_id, "date": date})
+
+
+def documents(rag: Rag) -> list[str]:
+    return sorted(rag.vector_store._collection.get(include=["documents"])["documents"])
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    persist_dir = tmp_path / "chroma_store"
+    client = chromadb.PersistentClient(path=str(persist_dir))
+    collection = client.create_collection("political_collection")
+    collection.add(ids=["old"], documents=["old speech"], embeddings=[[1.0, 10.0, 0.0]], metadatas=[OLD])
+    SharedSystemClient.clear_system_cache()
+
+    for name, value in {
+        "PERSIST_DIR": str(persist_dir), "USE_GCS_CHROMA": False, "USE_EXTERNAL_CHROMA": False,
+        "TOPS_JSON": tmp_path / "tops.json", "EMBEDDING_PROVIDER": "huggingface",
+        "validate_config": lambda: None, "get_embeddings": lambda provider: FlakyEmbeddings(),
+        "init_chat_model": lambda *a, **k: None,
+    }.items():
+        monkeypatch.setattr(rag_module, name, value)
+    monkeypatch.setattr(rag_module.time, "sleep", lambda seconds: None)
+    (tmp_path / "tops.json").write_text("{}")
+    yield Rag(versioned=False)
+    SharedSystemClient.clear_system_cache()
+
+
+def test_failed_batches_are_counted_and_not_stored(rag):
+    docs = [speech("a", "first speech"), speech("b", "boom speech"), speech("c", "third speech")]
+    stored, failed = rag.embed_and_store(docs, NoSplit(), batch_size=1, concurrency=2)
+    assert (stored, failed) == (2, 1)
+    assert documents(rag) == ["first speech", "old speech", "third speech"]
+
+    # A re-run only embeds what is missing.
+    docs[1] = speech("b", "second speech")
+    assert rag.embed_and_store(docs, NoSplit(), batch_size=1) == (1, 0)
+
+
+def test_run_update_rolls_back_and_skips_prune_on_failed_chunks(rag, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(updater, "fetch_session_xml_urls", lambda since: [("2026-03-01", "url")])
+    monkeypatch.setattr(updater, "download_xmls", lambda urls, xml_dir: ["protocol.xml"])
+    monkeypatch.setattr(updater, "parse_xmls", lambda files: (pd.DataFrame([{"party": "SPD"}]), {}, {}))
+    monkeypatch.setattr(updater, "normalize_parties", lambda df: df)
+    monkeypatch.setattr(updater, "_update_tops_json", lambda *a: pytest.fail("tops.json updated"))
+    monkeypatch.setattr(rag, "prune_speeches_before", lambda cutoff: pytest.fail("pruned"))
+
+    def add_to_vector_store(csv):
+        return rag.embed_and_store([speech("a", "new speech"), speech("b", "boom speech")], NoSplit(), batch_size=1)
+
+    monkeypatch.setattr(rag, "add_to_vector_store", add_to_vector_store)
+
+    result = updater.run_update(rag, since_date="2026-02-01")
+    assert result["failed_chunks"] == 1
+    assert result["embedded"] == 0
+    # The partly embedded session is gone again, so the next run starts from the same date.
+    assert documents(rag) == ["old speech"]
+    assert updater.get_last_embedded_date(rag) == "2026-01-02"
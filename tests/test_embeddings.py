@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from practicepreach.embedding_cache import CachedEmbeddings
+from practicepreach.embeddings import MatryoshkaEmbeddings, RateLimitedEmbeddings, get_embeddings
+from practicepreach.rag import Rag
+from practicepreach.rate_limiter import AdaptiveRateLimiter
+
+VECTORS = {
+    "query": [1.0, 0.0, 0.0, 0.0],
+    # "far" beats "near" on the first two dimensions only.
+    "near": [0.8, 0.6, 0.0, 0.0],
+    "far": [0.5, 0.0, 0.0, 0.866],
+}
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self):
+        self.documents_embedded = 0
+
+    def embed_documents(self, texts):
+        self.documents_embedded += len(texts)
+        return [VECTORS[t] for t in texts]
+
+    def embed_query(self, text):
+        return VECTORS[text]
+
+
+class FakeCollection:
+    def __init__(self, embeddings: MatryoshkaEmbeddings):
+        self.stored = {t: embeddings.embed_query(t) for t in ("near", "far")}
+
+    def query(self, query_embeddings, n_results, where, include):
+        q = query_embeddings[0]
+        dist = {t: sum((a - b) ** 2 for a, b in zip(q, v)) for t, v in self.stored.items()}
+        docs = sorted(dist, key=dist.get)[:n_results]
+        return {"documents": [docs], "metadatas": [[{} for _ in docs]], "distances": [[dist[d] for d in docs]]}
+
+
+@pytest.fixture
+def search(tmp_path):
+    base = FakeEmbeddings()
+    embeddings = MatryoshkaEmbeddings(CachedEmbeddings(base, "fake", tmp_path / "cache.db"), dim=2)
+    rag = SimpleNamespace(embeddings=embeddings, vector_store=SimpleNamespace(_collection=FakeCollection(embeddings)))
+    return base, embeddings, lambda: [d.page_content for d, _ in Rag.similarity_search(rag, "query", k=2)]
+
+
+def test_rerank_uses_cached_full_vectors(search):
+    base, embeddings, run = search
+    embeddings.embed_documents(["near", "far"])  # ingestion fills the cache
+    base.documents_embedded = 0
+    assert run() == ["near", "far"]
+    assert base.documents_embedded == 0
+
+
+def test_rerank_skipped_on_cache_miss(search):
+    base, _, run = search
+    assert run() == ["far", "near"]  # store order, truncated scores
+    assert base.documents_embedded == 0
+
+
+def test_dim_requires_google():
+    with pytest.raises(ValueError):
+        get_embeddings("onnx", dim=256)
+
+
+def test_cache_hits_bypass_the_rate_limiter(tmp_path):
+    limiter = AdaptiveRateLimiter("test", rate=100, max_rate=100)
+    cached = CachedEmbeddings(RateLimitedEmbeddings(FakeEmbeddings(), limiter), "fake", tmp_path / "cache.db")
+    cached.embed_documents(["near", "far"])
+    assert limiter.stats()["calls"] == 1
+    cached.embed_documents(["near", "far"])
+    cached.embed_documents(["far"])
+    assert limiter.stats()["calls"] == 1
@@ -0,0 +1,24 @@
+import subprocess
+from pathlib import Path
+
+from practicepreach.rag import Rag
+
+
+def test_upload_copies_store_contents_to_exact_target(tmp_path, monkeypatch):
+    commands = []
+
+    def fake_run(cmd, **kwargs):
+        commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr(Rag, "_upload_sidecars_to_gcs", staticmethod(lambda *args: None))
+    rag = Rag.__new__(Rag)
+    rag.store_dir = str(tmp_path / "chroma_store_gemini-20260101T000000Z")
+    rag.tops_path = Path(f"{rag.store_dir}.tops.json")
+
+    rag.upload_to_gcs("gs://bucket/data/chroma_store_gemini")
+
+    assert commands == [[
+        "gsutil", "-m", "rsync", "-r", "-d", rag.store_dir, "gs://bucket/data/chroma_store_gemini",
+    ]]
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from practicepreach.llm_executor import LlmExecutor, LlmQueueFull
+
+
+def test_run_and_arun_share_the_in_flight_limit():
+    executor = LlmExecutor(max_in_flight=2, max_queue=10)
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def enter():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+
+    def leave():
+        nonlocal running
+        with lock:
+            running -= 1
+
+    def blocking():
+        enter()
+        time.sleep(0.05)
+        leave()
+
+    async def coroutine():
+        enter()
+        await asyncio.sleep(0.05)
+        leave()
+
+    async def main():
+        await asyncio.gather(*[executor.run(blocking) for _ in range(4)],
+                             *[executor.arun(coroutine) for _ in range(4)])
+
+    asyncio.run(main())
+    assert peak == 2
+    assert executor.stats()["submitted"] == 8
+
+
+def test_admission_counts_run_and_arun_together():
+    executor = LlmExecutor(max_in_flight=1, max_queue=1, retry_after=3)
+
+    async def main():
+        release = asyncio.Event()
+        first = asyncio.create_task(executor.run(time.sleep, 0.05))
+        second = asyncio.create_task(executor.arun(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(LlmQueueFull) as exc:
+            await executor.arun(release.wait)
+        assert exc.value.retry_after == 3
+        release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(main())
+    assert executor.stats()["rejected"] == 1
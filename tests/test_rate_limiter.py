@@ -0,0 +1,54 @@
+import pytest
+from google.api_core.exceptions import InternalServerError, ResourceExhausted
+
+from practicepreach.rate_limiter import AdaptiveRateLimiter, is_quota_error
+
+
+class StatusError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def wrapped(cause: Exception) -> Exception:
+    try:
+        raise cause
+    except Exception as e:
+        try:
+            raise RuntimeError("Error embedding content") from e
+        except RuntimeError as outer:
+            return outer
+
+
+@pytest.mark.parametrize("exc", [
+    ResourceExhausted("anything"),
+    StatusError("Too busy", 429),
+    wrapped(ResourceExhausted("anything")),
+    Exception("429 Too Many Requests"),  # no status anywhere: message fallback
+])
+def test_quota_errors(exc):
+    assert is_quota_error(exc)
+
+
+@pytest.mark.parametrize("exc", [
+    ValueError("bad input"),
+    InternalServerError("quota service unavailable"),
+    StatusError("rate limit config missing", 500),
+])
+def test_other_errors(exc):
+    assert not is_quota_error(exc)
+
+
+def test_call_backs_off_on_resource_exhausted():
+    limiter = AdaptiveRateLimiter("test", rate=100, max_rate=100, backoff_base=0, backoff_max=0)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ResourceExhausted("try later")
+        return "ok"
+
+    assert limiter.call(fn) == "ok"
+    assert len(calls) == 2
+    assert limiter.rate < 51
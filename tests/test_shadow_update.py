@@ -0,0 +1,69 @@
+import chromadb
+import pytest
+from chromadb.api.client import SharedSystemClient
+from langchain_core.embeddings import Embeddings
+
+from practicepreach import rag as rag_module
+from practicepreach.rag import Rag
+
+
+class FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [1.0, float(len(text)), 0.0]
+
+
+SPEECH = {"type": "speech", "top_key": "20-1-TOP1", "party": "SPD", "date": 20260101}
+
+
+def documents(rag: Rag) -> list[str]:
+    return sorted(rag.vector_store._collection.get(include=["documents"])["documents"])
+
+
+@pytest.fixture
+def persist_dir(tmp_path, monkeypatch):
+    persist_dir = tmp_path / "chroma_store"
+    client = chromadb.PersistentClient(path=str(persist_dir))
+    collection = client.create_collection("political_collection")
+    collection.add(ids=["old"], documents=["old speech"], embeddings=[[1.0, 10.0, 0.0]],
+                   metadatas=[SPEECH])
+    SharedSystemClient.clear_system_cache()
+
+    for name, value in {
+        "PERSIST_DIR": str(persist_dir), "USE_GCS_CHROMA": False, "USE_EXTERNAL_CHROMA": False,
+        "TOPS_JSON": tmp_path / "tops.json", "validate_config": lambda: None,
+        "get_embeddings": lambda provider: FakeEmbeddings(), "init_chat_model": lambda *a, **k: None,
+    }.items():
+        monkeypatch.setattr(rag_module, name, value)
+    (tmp_path / "tops.json").write_text("{}")
+    yield persist_dir
+    SharedSystemClient.clear_system_cache()
+
+
+def test_rollback_serves_the_old_store(persist_dir):
+    live = Rag(versioned=True)
+    assert persist_dir.is_symlink()
+    assert live.store_dir == str(persist_dir.resolve())
+
+    # Shadow update: the staged copy replaces the speech, then gets promoted.
+    staged = live.stage()
+    staged.vector_store._collection.delete(ids=["old"])
+    staged.vector_store._collection.add(ids=["new"], documents=["new speech"], embeddings=[[1.0, 10.0, 0.0]],
+                                        metadatas=[SPEECH])
+    staged.promote(publish=False)
+    assert str(persist_dir.resolve()) == staged.store_dir
+    # The previous instance is unaffected by the flipped symlink.
+    assert documents(live) == ["old speech"]
+    assert documents(staged) == ["new speech"]
+
+    # Rollback: the old instance, on its own directory, serves again.
+    live.promote(publish=False)
+    assert documents(live) == ["old speech"]
+    assert [d.page_content for d, _ in live.similarity_search("speech", k=1)] == ["old speech"]
+    assert str(persist_dir.resolve()) == live.store_dir
+
+    # A cold start after the rollback opens the old version too.
+    SharedSystemClient.clear_system_cache()
+    assert documents(Rag(versioned=True)) == ["old speech"]
@@ -0,0 +1,46 @@
+import io
+import subprocess
+
+import pytest
+
+from practicepreach import snapshot
+from practicepreach.snapshot import SnapshotError, create_snapshot, extract_snapshot, restore_snapshot
+
+
+@pytest.fixture
+def archive(tmp_path):
+    store = tmp_path / "store"
+    store.mkdir()
+    (store / "chroma.sqlite3").write_bytes(bytes(range(256)) * 4096)
+    (tmp_path / "tops.json").write_text("{}")
+    out = tmp_path / "snap.tar.zst"
+    create_snapshot(store, tmp_path / "tops.json", tmp_path / "missing.db", out)
+    return out.read_bytes()
+
+
+def test_extract_roundtrip(archive, tmp_path):
+    manifest = extract_snapshot(io.BytesIO(archive), tmp_path / "out")
+    assert (tmp_path / "out" / "store" / "chroma.sqlite3").stat().st_size == manifest["files"]["store/chroma.sqlite3"]["size"]
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"not a snapshot at all",
+    pytest.param("truncated", id="truncated"),
+])
+def test_unreadable_stream_raises_snapshot_error(archive, tmp_path, data):
+    if data == "truncated":
+        data = archive[:len(archive) // 2]
+    with pytest.raises(SnapshotError):
+        extract_snapshot(io.BytesIO(data), tmp_path / "out")
+
+
+def test_failed_download_is_reported(tmp_path, monkeypatch):
+    popen = subprocess.Popen
+
+    def fake_gsutil(cmd, **kwargs):
+        return popen(["sh", "-c", "echo AccessDeniedException >&2; exit 1"], **kwargs)
+
+    monkeypatch.setattr(snapshot.subprocess, "Popen", fake_gsutil)
+    with pytest.raises(SnapshotError, match="download failed.*AccessDeniedException"):
+        restore_snapshot("gs://bucket/snap.tar.zst", tmp_path / "store", tmp_path / "tops.json", tmp_path / "s.db")
@@ -0,0 +1,101 @@
+import hashlib
+
+import pytest
+
+from practicepreach.store_sync import StoreSync
+
+BLOCK = 1024
+
+
+def sha256(path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def checksums(directory) -> dict:
+    return {
+        p.relative_to(directory).as_posix(): sha256(p)
+        for p in sorted(directory.rglob("*")) if p.is_file() and p.name != ".sync-manifest.json"
+    }
+
+
+def blobs(remote) -> set[str]:
+    return {p.name for p in (remote / "blobs").rglob("*") if p.is_file()}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = tmp_path / "store"
+    (store / "segment").mkdir(parents=True)
+    # 4 distinct blocks, and 3 blocks of which the first two are identical.
+    (store / "chroma.sqlite3").write_bytes(b"".join(hashlib.sha256(bytes([i])).digest() for i in range(128)))
+    (store / "segment" / "data_level0.bin").write_bytes(b"\x01" * 3000)
+    return store
+
+
+@pytest.fixture
+def sync(tmp_path):
+    return StoreSync(str(tmp_path / "bucket"), block_size=BLOCK)
+
+
+def test_first_push_uploads_every_block(store, sync, tmp_path):
+    stats = sync.push(store, version="v1")
+    assert sync.latest_version() == "v1"
+    assert stats["uploaded_blocks"] == len(blobs(tmp_path / "bucket")) == 6
+    assert stats["uploaded_bytes"] == stats["total_bytes"] - BLOCK  # the repeated block is stored once
+
+
+def test_push_after_change_uploads_only_the_changed_block(store, sync, tmp_path):
+    sync.push(store, version="v1")
+    before = blobs(tmp_path / "bucket")
+    data = bytearray((store / "chroma.sqlite3").read_bytes())
+    data[BLOCK + 5] ^= 0xFF
+    (store / "chroma.sqlite3").write_bytes(bytes(data))
+
+    stats = sync.push(store, version="v2")
+
+    new = blobs(tmp_path / "bucket") - before
+    assert stats["uploaded_blocks"] == len(new) == 1
+    assert new == {hashlib.sha256(bytes(data[BLOCK:2 * BLOCK])).hexdigest()}
+    assert sync.latest_version() == "v2"
+
+
+def test_pull_into_empty_dir(store, sync, tmp_path):
+    sync.push(store, version="v1")
+    target = tmp_path / "copy"
+    stats = sync.pull(target)
+    assert stats["version"] == "v1"
+    assert checksums(target) == checksums(store)
+    assert StoreSync.local_version(target) == "v1"
+
+
+def test_pull_reuses_blocks_from_seed_dir(store, sync, tmp_path):
+    sync.push(store, version="v1")
+    seed = tmp_path / "seed"
+    sync.pull(seed)
+    data = bytearray((store / "chroma.sqlite3").read_bytes())
+    data[0] ^= 0xFF
+    (store / "chroma.sqlite3").write_bytes(bytes(data))
+    sync.push(store, version="v2")
+
+    target = tmp_path / "v2"
+    stats = sync.pull(target, seed_dir=seed)
+
+    assert stats["downloaded_blocks"] == 1
+    assert stats["downloaded_bytes"] == BLOCK
+    assert checksums(target) == checksums(store)
+
+
+def test_gc_keeps_blocks_of_kept_versions(store, sync, tmp_path):
+    sync.push(store, version="v1")
+    v1_only = hashlib.sha256((store / "chroma.sqlite3").read_bytes()[:BLOCK]).hexdigest()
+    (store / "chroma.sqlite3").write_bytes(b"\x02" * BLOCK + (store / "chroma.sqlite3").read_bytes()[BLOCK:])
+    sync.push(store, version="v2")
+
+    removed = sync.gc(keep=1)
+
+    assert removed == 1
+    assert v1_only not in blobs(tmp_path / "bucket")
+    assert not (tmp_path / "bucket" / "manifests" / "v1.json").exists()
+    target = tmp_path / "copy"
+    sync.pull(target)
+    assert checksums(target) == checksums(store)
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from practicepreach import fast
+from practicepreach.llm_executor import LlmQueueFull
+from practicepreach.summaries_cache import SummariesCache
+
+
+@pytest.fixture
+def client(tmp_path):
+    fast.app.state.rag = object()
+    fast.app.state.rag_error = None
+    fast.app.state.summaries = SummariesCache(tmp_path / "summaries.db")
+    yield TestClient(fast.app)
+    fast.app.state.rag = None
+
+
+def events(body: str) -> list[str]:
+    return [line.removeprefix("event: ") for line in body.splitlines() if line.startswith("event: ")]
+
+
+@pytest.mark.parametrize("exc", [LlmQueueFull(retry_after=7), RuntimeError("boom")])
+def test_general_failure_ends_stream_with_error(client, monkeypatch, exc):
+    async def fail(rag, top_key):
+        raise exc
+
+    async def party(*args):
+        pytest.fail("party summaries generated without a general summary")
+
+    monkeypatch.setattr(fast, "_generate_general", fail)
+    monkeypatch.setattr(fast, "_generate_party", party)
+    r = client.get("/summaries/stream", params={"top_key": "20-1-TOP1"})
+    assert r.status_code == 200
+    assert events(r.text) == ["error", "done"]
+    assert ('"retry_after": 7' in r.text) == isinstance(exc, LlmQueueFull)